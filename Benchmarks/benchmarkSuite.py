@@ -0,0 +1,453 @@
+"""
+Runs the checks in Tests, then every benchmark, and saves the results as JSON, optionally comparing them against an
+earlier results file.
+Every result is a time in milliseconds, a size in megabytes for memory results or a number of draw calls, so lower
+is always better. Each benchmark runs its code once before timing it so JIT compilation is left out.
+
+    python -m Benchmarks.benchmarkSuite --output results.json
+    python -m Benchmarks.benchmarkSuite --compare baseline.json
+    python -m Benchmarks.benchmarkSuite --compare baseline.json results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import numba
+
+from settings import *
+from Benchmarks.benchmarkUtils import build_world_voxels, time_function
+from Benchmarks.rayCastBenchmark import make_rays
+from HeadlessEngine import HeadlessEngine
+from Meshes.chunkMeshBuilder import build_chunk_mesh
+from Meshes.binaryMeshBuilder import build_chunk_mesh_binary
+from World import World
+from WorldObjects.Chunk import Chunk
+from WorldObjects.ChunkRegistry import ChunkRegistry
+from WorldObjects.HeightmapCache import HeightmapCache
+from Tests import test_meshing, test_network
+
+
+WORLD_WIDTHS = (2, 4, 8)
+CHUNK_SIZES = (16, 32, 64)
+GENERATION_COLUMNS = 4
+RAY_CAST_POSES = 256
+RENDER_FRAMES = 120
+REGRESSION_THRESHOLD = 0.1
+
+# The chunk the meshing benchmarks build, which the terrain surface passes through
+MESH_CHUNK_POS = (1, 0, 1)
+
+# The width and height in voxels of the worlds built for each chunk size, so every size meshes the same terrain
+SWEEP_WORLD_SIZE = 128
+
+# The modules of checks run before the benchmarks, so results are never saved from code that gives wrong answers
+CHECK_MODULES = (test_meshing, test_network)
+
+
+def benchmark_generation() -> dict[str, float]:
+    """
+    Times generating the voxels of whole chunk columns, starting from an empty heightmap cache each time so the
+    noise is sampled once per column like it is when the world loads
+
+    :returns: The time taken per chunk
+    """
+
+    headlessWorld = SimpleNamespace(app=None, heightmapCache=HeightmapCache(), chunkRegistry=ChunkRegistry())
+    columns = [(x, z) for x in range(WORLD_WIDTH) for z in range(WORLD_DEPTH)][:GENERATION_COLUMNS]
+    chunks = [Chunk(headlessWorld, position=(x, y, z)) for x, z in columns for y in range(WORLD_HEIGHT)]
+
+    def build_chunks():
+        headlessWorld.heightmapCache.clear()
+
+        for chunk in chunks:
+            chunk.build_voxels()
+
+    return {"generation.build_voxels": time_function(build_chunks) * 1000 / len(chunks)}
+
+
+def make_mesh_world(chunkVoxels: np.array) -> tuple[np.array, int]:
+    """
+    Creates an otherwise empty world containing one chunk of voxels, for meshing the chunk on its own
+
+    :param np.array chunkVoxels: The voxels of the chunk
+
+    :returns: The world voxels and the index of the chunk in them
+    """
+
+    worldVoxels = np.zeros([WORLD_VOLUME, CHUNK_VOLUME], dtype='uint8')
+    chunkX, chunkY, chunkZ = MESH_CHUNK_POS
+    chunkIndex = chunkX + WORLD_WIDTH * chunkZ + WORLD_AREA * chunkY
+    worldVoxels[chunkIndex] = chunkVoxels
+
+    return worldVoxels, chunkIndex
+
+
+def benchmark_meshing() -> dict[str, float]:
+    """
+    Times meshing a worst case checkerboard chunk, where every voxel shows all six faces, a chunk of typical terrain
+    and an empty chunk, with both the original and the binary mesher
+
+    :returns: The time taken per chunk for each kind of chunk and mesher
+    """
+
+    x, y, z = np.meshgrid(np.arange(CHUNK_SIZE), np.arange(CHUNK_SIZE), np.arange(CHUNK_SIZE), indexing='ij')
+    checkerboard = np.zeros(CHUNK_VOLUME, dtype='uint8')
+    checkerboard[(x + CHUNK_SIZE * z + CHUNK_AREA * y).ravel()] = ((x + y + z) % 2 == 0).ravel()
+
+    typicalWorld = build_world_voxels()
+    typicalIndex = MESH_CHUNK_POS[0] + WORLD_WIDTH * MESH_CHUNK_POS[2] + WORLD_AREA * MESH_CHUNK_POS[1]
+
+    checkerboardWorld, checkerboardIndex = make_mesh_world(checkerboard)
+    emptyWorld, emptyIndex = make_mesh_world(np.zeros(CHUNK_VOLUME, dtype='uint8'))
+
+    # Full sky light everywhere, as the light values don't change how much work meshing does
+    worldLight = np.full([WORLD_VOLUME, CHUNK_VOLUME], MAX_LIGHT << 4, dtype='uint8')
+
+    results = {}
+
+    for name, worldVoxels, chunkIndex in (("checkerboard", checkerboardWorld, checkerboardIndex),
+                                          ("typical", typicalWorld, typicalIndex),
+                                          ("empty", emptyWorld, emptyIndex)):
+        for prefix, buildMesh in (("", build_chunk_mesh), ("binary_", build_chunk_mesh_binary)):
+            bestTime = time_function(buildMesh, worldVoxels[chunkIndex], 2, MESH_CHUNK_POS, worldVoxels, worldLight)
+            results[f"meshing.{prefix}{name}"] = bestTime * 1000
+
+    return results
+
+
+def benchmark_ray_cast(engine: HeadlessEngine) -> dict[str, float]:
+    """
+    Times the player's ray cast from poses scattered over the world, along with a batch of rays through the world's
+    batched ray caster
+
+    :param HeadlessEngine engine: The engine whose world and player are used
+
+    :returns: The time taken per player ray cast and per batch of 10,000 rays
+    """
+
+    world = engine.scene.world
+    player = engine.player
+    origins, directions = make_rays(RAY_CAST_POSES)
+
+    def cast_player_rays():
+        for origin, direction in zip(origins, directions):
+            player.pos = glm.vec3(*origin)
+            player.forward = glm.normalize(glm.vec3(*direction))
+            world.voxelHandler.ray_cast()
+
+    batchOrigins, batchDirections = make_rays(10_000)
+
+    return {
+        "ray_cast.voxel_handler": time_function(cast_player_rays) * 1000 / RAY_CAST_POSES,
+        "ray_cast.batch_10000": time_function(world.ray_cast, batchOrigins, batchDirections) * 1000,
+    }
+
+
+def benchmark_rendering(engine: HeadlessEngine) -> dict[str, float]:
+    """
+    Times rendering headless frames of the whole world along the default camera path
+
+    :param HeadlessEngine engine: The engine to render with
+
+    :returns: The mean, median and 95th percentile frame times
+    """
+
+    # A few frames are rendered first so shader compilation and buffer uploads are not timed
+    engine.run_frames(10)
+    engine.frameTimes = []
+    stats = engine.run_frames(RENDER_FRAMES)
+
+    return {"rendering.mean": stats["mean"], "rendering.p50": stats["p50"], "rendering.p95": stats["p95"]}
+
+
+def benchmark_memory(engine: HeadlessEngine) -> dict[str, float]:
+    """
+    Measures the memory held by the fully loaded world in each category the memory tracker records
+
+    :param HeadlessEngine engine: The engine whose memory is measured
+
+    :returns: The megabytes held in each category
+    """
+
+    totals = engine.memoryTracker.get_totals()
+
+    return {f"memory.{category.lower().replace(' ', '_')}": byteCount / 2 ** 20 for category, byteCount in totals.items()}
+
+
+def time_world_construction() -> float:
+    """
+    Times building a whole world, including generating, lighting and meshing every chunk. A world is built once
+    beforehand so JIT compilation is not included
+
+    :returns: The time taken in milliseconds
+    """
+
+    engine = HeadlessEngine()
+    if engine.kernelWarmup:
+        engine.kernelWarmup.wait()
+
+    engine.scene.world.chunkLoader.load_all()
+
+    startTime = time.perf_counter()
+    world = World(engine)
+    world.chunkLoader.load_all()
+
+    return (time.perf_counter() - startTime) * 1000
+
+
+def benchmark_world_construction() -> dict[str, float]:
+    """
+    Times building worlds of several widths. The world size is baked into the kernels when they compile, so each
+    width is built in its own process
+
+    :returns: The time taken to build the world at each width
+    """
+
+    results = {}
+
+    for width in WORLD_WIDTHS:
+        process = subprocess.run(
+            [sys.executable, "-m", "Benchmarks.benchmarkSuite", "--world-construction"],
+            env={**os.environ, "WORLD_WIDTH": str(width)}, capture_output=True, text=True, check=True)
+
+        # The time is printed on the last line, after anything printed while the world loads
+        results[f"world.construction_width_{width}"] = float(process.stdout.strip().splitlines()[-1])
+
+    return results
+
+
+def measure_chunk_size() -> dict[str, float]:
+    """
+    Measures the trade-off made by the current chunk size, where larger chunks need fewer draw calls but each edit
+    rebuilds a larger mesh
+
+    :returns: The draw calls and time per frame, and the time to rebuild the mesh of a chunk on the terrain surface
+    """
+
+    engine = HeadlessEngine()
+    if engine.kernelWarmup:
+        engine.kernelWarmup.wait()
+
+    world = engine.scene.world
+    world.chunkLoader.load_all()
+
+    engine.run_frames(10)
+    engine.frameTimes = []
+    stats = engine.run_frames(RENDER_FRAMES)
+
+    chunkX, chunkY, chunkZ = WORLD_WIDTH // 2, min(TERRAIN_BASE_HEIGHT // CHUNK_SIZE, WORLD_HEIGHT - 1), WORLD_DEPTH // 2
+    surfaceChunk = world.chunks[chunkX + WORLD_WIDTH * chunkZ + WORLD_AREA * chunkY]
+
+    return {
+        "draw_calls": stats["drawCalls"],
+        "frame": stats["mean"],
+        "remesh": time_function(surfaceChunk.mesh.rebuild_mesh) * 1000,
+    }
+
+
+def benchmark_chunk_sizes() -> dict[str, float]:
+    """
+    Sweeps the chunk size over worlds of the same size in voxels. The chunk size is baked into the kernels when they
+    compile, so each size is measured in its own process
+
+    :returns: The draw calls, frame time and remesh time at each chunk size
+    """
+
+    results = {}
+
+    for chunkSize in CHUNK_SIZES:
+        worldChunks = str(SWEEP_WORLD_SIZE // chunkSize)
+
+        process = subprocess.run(
+            [sys.executable, "-m", "Benchmarks.benchmarkSuite", "--chunk-size"],
+            env={**os.environ, "CHUNK_SIZE": str(chunkSize), "WORLD_WIDTH": worldChunks, "WORLD_HEIGHT": worldChunks},
+            capture_output=True, text=True, check=True)
+
+        # The results are printed on the last line as JSON, after anything printed while the world loads
+        for name, value in json.loads(process.stdout.strip().splitlines()[-1]).items():
+            results[f"chunk_size_{chunkSize}.{name}"] = value
+
+    return results
+
+
+def run_checks() -> None:
+    """
+    Runs every check in CHECK_MODULES, which are the module's functions whose names start with test_
+
+    :raises: AssertionError when a check fails
+    """
+
+    for module in CHECK_MODULES:
+        for name, check in vars(module).items():
+            if name.startswith("test_") and callable(check):
+                check()
+
+    print("Every check passed")
+
+
+def run_benchmarks() -> dict:
+    """
+    Runs every benchmark
+
+    :returns: The results along with details of the machine they were run on
+    """
+
+    run_checks()
+
+    results = {}
+    results.update(benchmark_generation())
+    results.update(benchmark_meshing())
+
+    engine = HeadlessEngine()
+    if engine.kernelWarmup:
+        engine.kernelWarmup.wait()
+
+    engine.scene.world.chunkLoader.load_all()
+
+    results.update(benchmark_ray_cast(engine))
+    results.update(benchmark_rendering(engine))
+    results.update(benchmark_memory(engine))
+    results.update(benchmark_world_construction())
+    results.update(benchmark_chunk_sizes())
+
+    return {
+        "metadata": {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "numba": numba.__version__,
+            "platform": platform.platform(),
+            "renderer": engine.context.info["GL_RENDERER"],
+            "settings": get_settings_hash(),
+        },
+        "results": results,
+    }
+
+
+def get_unit(name: str) -> str:
+    """
+    Gets the unit of a result
+
+    :param str name: The name of the result
+
+    :returns: The unit the result is measured in
+    """
+
+    if name.startswith("memory."):
+        return "MB"
+
+    if name.endswith(".draw_calls"):
+        return "calls"
+
+    return "ms"
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = REGRESSION_THRESHOLD) -> bool:
+    """
+    Prints how each result has changed since the baseline and flags any that are slower by more than the threshold.
+    Results in the baseline that are missing from the new results count as regressions, as the benchmark that made
+    them has stopped reporting
+
+    :param dict baseline: The earlier results
+    :param dict current: The new results
+    :param float threshold: The fraction a result can slow down by before it counts as a regression
+
+    :returns: True if any result regressed or is missing, otherwise False
+    """
+
+    hasRegressed = False
+
+    for name, currentTime in current["results"].items():
+        baselineTime = baseline["results"].get(name)
+
+        if baselineTime is None:
+            print(f"{name:<32}{'':>12}{currentTime:12.3f} {get_unit(name)}  (new)")
+            continue
+
+        # A result that took no time in the baseline has regressed by any amount of time at all
+        if baselineTime:
+            change = currentTime / baselineTime - 1
+        else:
+            change = math.inf if currentTime > 0 else 0
+
+        isRegression = change > threshold
+        hasRegressed |= isRegression
+
+        print(f"{name:<32}{baselineTime:12.3f}{currentTime:12.3f} {get_unit(name)}  {change:+7.1%}{'  REGRESSION' if isRegression else ''}")
+
+    for name, baselineTime in baseline["results"].items():
+        if name not in current["results"]:
+            print(f"{name:<32}{baselineTime:12.3f}{'':>12} {get_unit(name)}  (missing)")
+            hasRegressed = True
+
+    return hasRegressed
+
+
+def print_results(results: dict) -> None:
+    """
+    Prints a results table
+
+    :param dict results: The results to print
+    """
+
+    for name, resultTime in results["results"].items():
+        print(f"{name:<32}{resultTime:12.3f} {get_unit(name)}")
+
+
+def load_results(filePath: str) -> dict:
+    """
+    Loads a results file
+
+    :param str filePath: The path of the results file
+
+    :returns: The results
+    """
+
+    with open(filePath) as resultsFile:
+        return json.load(resultsFile)
+
+
+def main() -> None:
+    "Runs the benchmarks from the command line"
+
+    parser = argparse.ArgumentParser(description="Runs the benchmark suite")
+    parser.add_argument("--output", help="file to save the results to as JSON")
+    parser.add_argument("--compare", nargs="+", metavar="RESULTS",
+                        help="baseline results to compare against, and optionally results to compare instead of running the benchmarks")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="fraction slower that counts as a regression")
+    parser.add_argument("--world-construction", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--chunk-size", action="store_true", help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.world_construction:
+        print(time_world_construction())
+        return
+
+    if arguments.chunk_size:
+        print(json.dumps(measure_chunk_size()))
+        return
+
+    if arguments.compare and len(arguments.compare) > 2:
+        parser.error("--compare takes a baseline and at most one results file")
+
+    results = load_results(arguments.compare[1]) if arguments.compare and len(arguments.compare) == 2 else run_benchmarks()
+
+    if arguments.output:
+        with open(arguments.output, "w") as resultsFile:
+            json.dump(results, resultsFile, indent=4)
+
+    if arguments.compare:
+        if compare_results(load_results(arguments.compare[0]), results, arguments.threshold):
+            sys.exit(1)
+
+    else:
+        print_results(results)
+
+
+if __name__ == "__main__":
+    main()
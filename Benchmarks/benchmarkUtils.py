@@ -0,0 +1,51 @@
+import time
+from types import SimpleNamespace
+
+from settings import *
+import Engine  # Imported before any world objects so the Engine -> Scene -> World import cycle resolves
+from WorldObjects.Chunk import Chunk
+from WorldObjects.ChunkRegistry import ChunkRegistry
+from WorldObjects.HeightmapCache import HeightmapCache
+
+
+def build_world_voxels() -> np.array:
+    """
+    Generates the voxels for the whole world without needing an OpenGL context
+
+    :returns: A numpy array laid out the same way as World.voxels
+    """
+
+    # Chunks only use the app when building meshes, so no engine is needed to generate voxels
+    headlessWorld = SimpleNamespace(app=None, heightmapCache=HeightmapCache(), chunkRegistry=ChunkRegistry())
+    worldVoxels = np.empty([WORLD_VOLUME, CHUNK_VOLUME], dtype='uint8')
+
+    for x in range(WORLD_WIDTH):
+        for y in range(WORLD_HEIGHT):
+            for z in range(WORLD_DEPTH):
+                chunk = Chunk(headlessWorld, position=(x, y, z))
+                worldVoxels[x + WORLD_WIDTH * z + WORLD_AREA * y] = chunk.build_voxels()
+
+    return worldVoxels
+
+
+def time_function(function, *args, repeats: int = 5) -> float:
+    """
+    Times a function, returning the best time out of a number of repeats. The function is called once
+    beforehand so that JIT compilation is not included in the timings
+
+    :param function: The function to time
+    :param *args: The arguments passed to the function
+    :param int repeats: The number of times the function is timed
+
+    :returns: The fastest time taken in seconds
+    """
+
+    function(*args)
+
+    bestTime = float('inf')
+    for _ in range(repeats):
+        startTime = time.perf_counter()
+        function(*args)
+        bestTime = min(bestTime, time.perf_counter() - startTime)
+
+    return bestTime
@@ -0,0 +1,46 @@
+from settings import *
+from Benchmarks.benchmarkUtils import build_world_voxels, time_function
+from Physics.SolidityGrid import SolidityGrid
+
+
+BODY_COUNTS = (100, 1_000, 10_000)
+TICK_TIME = 50
+
+
+def make_bodies(bodyCount: int, seed: int = 0) -> tuple[np.array, np.array, np.array, np.array]:
+    """
+    Creates player sized bodies scattered across the world, walking in random directions
+
+    :param int bodyCount: The number of bodies to create
+    :param int seed: The seed for the random number generator
+
+    :returns: positions, velocities, halfExtents, onGround
+    """
+
+    rng = np.random.default_rng(seed)
+
+    positions = rng.uniform(0, 1, (bodyCount, 3))
+    positions *= np.array([WORLD_WIDTH, WORLD_HEIGHT, WORLD_DEPTH]) * CHUNK_SIZE
+
+    velocities = rng.uniform(-PLAYER_SPEED, PLAYER_SPEED, (bodyCount, 3))
+    halfExtents = np.tile(np.array(PLAYER_SIZE / 2, dtype='float64'), (bodyCount, 1))
+    onGround = np.zeros(bodyCount, dtype='bool')
+
+    return positions, velocities, halfExtents, onGround
+
+
+def run() -> None:
+    "Prints how long one physics tick takes for a range of body counts"
+
+    solidityGrid = SolidityGrid(build_world_voxels())
+
+    for bodyCount in BODY_COUNTS:
+        bodies = make_bodies(bodyCount)
+
+        bestTime = time_function(solidityGrid.move_bodies, *bodies, TICK_TIME)
+
+        print(f"{bodyCount:>8} bodies: {bestTime * 1000:8.3f} ms per tick  {bodyCount / bestTime:12,.0f} bodies/s")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,42 @@
+from settings import *
+from Benchmarks.benchmarkUtils import build_world_voxels, time_function
+from Meshes.chunkMeshBuilder import build_chunk_mesh
+from Meshes.binaryMeshBuilder import build_chunk_mesh_binary
+from Tests.test_meshing import check_meshes
+
+
+NOISE_CHUNKS = 16
+
+
+def run() -> None:
+    "Checks the binary mesher against the original one, then prints how long each takes to mesh a chunk"
+
+    rng = np.random.default_rng(0)
+
+    worldVoxels = build_world_voxels()
+    worldLight = rng.integers(0, 256, worldVoxels.shape, dtype='uint8')
+
+    # Random voxels give every combination of neighbours, and so of ambient occlusion values
+    noiseVoxels = rng.integers(1, 256, worldVoxels.shape, dtype='uint8') * (rng.random(worldVoxels.shape) < 0.5)
+    noiseVoxels = noiseVoxels.astype('uint8')
+
+    check_meshes(worldVoxels, worldLight, range(WORLD_VOLUME))
+    check_meshes(noiseVoxels, worldLight, range(0, WORLD_VOLUME, WORLD_VOLUME // NOISE_CHUNKS))
+    print("Binary meshes match for every chunk checked")
+
+    for name, voxels in (("Terrain", worldVoxels), ("Noise", noiseVoxels)):
+        totalTime = totalBinaryTime = 0
+
+        for chunkIndex in range(0, WORLD_VOLUME, WORLD_VOLUME // NOISE_CHUNKS):
+            chunkPos = (chunkIndex % WORLD_WIDTH, chunkIndex // WORLD_AREA, chunkIndex // WORLD_WIDTH % WORLD_DEPTH)
+            args = (voxels[chunkIndex], 2, chunkPos, voxels, worldLight)
+
+            totalTime += time_function(build_chunk_mesh, *args)
+            totalBinaryTime += time_function(build_chunk_mesh_binary, *args)
+
+        print(f"{name:>8}: {totalTime * 1000 / NOISE_CHUNKS:8.3f} ms per chunk  "
+              f"binary {totalBinaryTime * 1000 / NOISE_CHUNKS:8.3f} ms per chunk  {totalTime / totalBinaryTime:6.1f}x")
+
+
+if __name__ == "__main__":
+    run()
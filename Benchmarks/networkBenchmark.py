@@ -0,0 +1,143 @@
+import asyncio
+import time
+
+from settings import *
+from Network.WorldServer import WorldServer
+from Network.WorldClient import WorldClient
+
+
+CLIENT_COUNTS = (1, 10, 50)
+EDITS_PER_RUN = 50
+EDIT_TIMEOUT = 5
+
+# Edits are made in the top layer of voxels, which the terrain never reaches, so every edit changes a voxel
+EDIT_Y = WORLD_HEIGHT * CHUNK_SIZE - 1
+
+
+def make_edit_positions(editCount: int, seed: int = 0) -> np.array:
+    """
+    Picks distinct positions in the top layer of the world to place voxels at
+
+    :param int editCount: The number of positions to pick
+    :param int seed: The seed for the random number generator
+
+    :returns: An (N, 3) array of world voxel positions
+    """
+
+    rng = np.random.default_rng(seed)
+    columns = rng.choice(WORLD_WIDTH * WORLD_DEPTH * CHUNK_AREA, editCount, replace=False)
+    worldWidth = WORLD_WIDTH * CHUNK_SIZE
+
+    return np.stack([columns % worldWidth, np.full(editCount, EDIT_Y), columns // worldWidth], axis=1).astype('int32')
+
+
+async def wait_until(condition, timeout: float = EDIT_TIMEOUT) -> None:
+    """
+    Waits on the event loop until a condition is met
+
+    :param condition: A function that returns True once the condition is met
+    :param float timeout: How long to wait in seconds
+
+    :raises: Exception when the condition is not met in time
+    """
+
+    deadline = time.perf_counter() + timeout
+
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise Exception("Timed out waiting for the world server")
+
+        await asyncio.sleep(0.0005)
+
+
+async def run_clients(server: WorldServer, clientCount: int, editPositions: np.array, seed: int = 0) -> dict[str, float]:
+    """
+    Connects simulated clients that each subscribe to the whole world, times how long it takes to send every client
+    every chunk, then has the clients take turns placing voxels and times how long each edit takes to come back.
+    Edits are sent at random points between ticks, as they would be by players
+
+    :param WorldServer server: The running server
+    :param int clientCount: The number of clients
+    :param np.array editPositions: The positions of the voxels to place
+    :param int seed: The seed for the random number generator
+
+    :returns: The chunks and megabytes sent per second, and the mean, median and 95th percentile edit latency
+    """
+
+    rng = np.random.default_rng(seed)
+
+    # Chunks are encoded once per version and shared between clients, so each run starts from nothing encoded
+    server.encodedChunks.clear()
+
+    clients = [WorldClient("127.0.0.1", server.port, viewDistance=max(WORLD_WIDTH, WORLD_DEPTH), keepReceived=False)
+               for _ in range(clientCount)]
+
+    startTime = time.perf_counter()
+    tasks = [asyncio.create_task(client.run()) for client in clients]
+    await wait_until(lambda: all(client.receivedChunkCount >= WORLD_VOLUME for client in clients), timeout=60)
+    loadTime = time.perf_counter() - startTime
+
+    for editIndex, position in enumerate(editPositions):
+        client = clients[editIndex % clientCount]
+        await asyncio.sleep(rng.uniform(0, SERVER_TICK_TIME * 0.001))
+        client.send_edits(position.reshape(1, 3), np.array([1], dtype='uint8'))
+        await wait_until(lambda: not client.pendingEdits)
+
+    for client, task in zip(clients, tasks):
+        client.writer.close()
+        task.cancel()
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await wait_until(lambda: not server.sessions)
+
+    latencies = np.concatenate([client.editLatencies for client in clients])
+
+    return {
+        "chunksPerSecond": clientCount * WORLD_VOLUME / loadTime,
+        "megabytesPerSecond": sum(client.receivedByteCount for client in clients) / loadTime / 2 ** 20,
+        "editLatencyMean": float(latencies.mean()),
+        "editLatencyP50": float(np.percentile(latencies, 50)),
+        "editLatencyP95": float(np.percentile(latencies, 95)),
+    }
+
+
+async def run_benchmark(server: WorldServer) -> None:
+    """
+    Runs the benchmark for each client count against a server on the same event loop
+
+    :param WorldServer server: The server, which is started here
+    """
+
+    editPositions = make_edit_positions(EDITS_PER_RUN * len(CLIENT_COUNTS) + 1)
+
+    # The first edit loads the kernels that edits run, so it is made before anything is timed
+    server.world.set_voxels(editPositions[-1], 1)
+    server.world.editLog.clear()
+
+    await server.start()
+    editPositions = editPositions[:-1].reshape(len(CLIENT_COUNTS), EDITS_PER_RUN, 3)
+
+    for clientCount, positions in zip(CLIENT_COUNTS, editPositions):
+        results = await run_clients(server, clientCount, positions)
+
+        print(f"{clientCount:>8} clients: {results['chunksPerSecond']:10,.0f} chunks/s  {results['megabytesPerSecond']:8.2f} MB/s  "
+              f"edit latency mean {results['editLatencyMean']:6.2f} ms  p50 {results['editLatencyP50']:6.2f} ms  "
+              f"p95 {results['editLatencyP95']:6.2f} ms")
+
+    print(f"Server ticks took {server.totalTickTime / max(server.tick, 1):.3f} ms on average, "
+          f"{server.encodedChunkCount} chunks were encoded with {CHUNK_COMPRESSION}")
+
+    await server.stop()
+
+
+def run() -> None:
+    """
+    Prints how fast a world server on the loopback interface sends chunks to a range of client counts, and how long
+    edits take to reach the clients, with the server and every client on one event loop
+    """
+
+    asyncio.run(run_benchmark(WorldServer("127.0.0.1", 0)))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,51 @@
+from settings import *
+from Benchmarks.benchmarkUtils import build_world_voxels, time_function
+from WorldObjects.rayCaster import ray_cast_batch
+
+
+RAY_COUNTS = (1_000, 10_000, 100_000)
+
+
+def make_rays(rayCount: int, seed: int = 0) -> tuple[np.array, np.array]:
+    """
+    Creates random rays starting above the terrain and pointing in random directions
+
+    :param int rayCount: The number of rays to create
+    :param int seed: The seed for the random number generator
+
+    :returns: origins, directions
+    """
+
+    rng = np.random.default_rng(seed)
+
+    origins = rng.uniform(0, 1, (rayCount, 3)).astype('float32')
+    origins *= np.array([WORLD_WIDTH, WORLD_HEIGHT, WORLD_DEPTH], dtype='float32') * CHUNK_SIZE
+
+    directions = rng.normal(size=(rayCount, 3)).astype('float32')
+
+    return origins, directions
+
+
+def run(maxDistance: float = 64.0) -> None:
+    "Prints the throughput of the batched raycaster for a range of batch sizes"
+
+    worldVoxels = build_world_voxels()
+
+    for rayCount in RAY_COUNTS:
+        origins, directions = make_rays(rayCount)
+
+        hitPositions = np.empty((rayCount, 3), dtype='int32')
+        hitNormals = np.empty((rayCount, 3), dtype='int8')
+        voxelIDs = np.empty(rayCount, dtype='uint8')
+        distances = np.empty(rayCount, dtype='float32')
+
+        bestTime = time_function(
+            ray_cast_batch, origins, directions, maxDistance, worldVoxels,
+            hitPositions, hitNormals, voxelIDs, distances)
+
+        hitRate = np.count_nonzero(voxelIDs) / rayCount
+        print(f"{rayCount:>8} rays: {bestTime * 1000:8.2f} ms  {rayCount / bestTime:12,.0f} rays/s  ({hitRate:.0%} hit)")
+
+
+if __name__ == "__main__":
+    run()
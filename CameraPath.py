@@ -0,0 +1,90 @@
+import json
+
+from settings import *
+
+
+class CameraPath:
+    def __init__(self, keyframes: list[tuple[float, glm.vec3, float, float]]) -> None:
+        """
+        Class that stores a scripted camera path, used to drive the camera instead of player input. The camera
+        moves in straight lines between keyframes
+
+        :param list keyframes: A list of (time, position, yaw, pitch) tuples sorted by time, with the time in
+        milliseconds and the yaw and pitch in degrees
+        """
+
+        if not keyframes:
+            raise Exception("A camera path needs at least one keyframe")
+
+        self.keyframes = keyframes
+        self.times = np.array([keyframe[0] for keyframe in keyframes], dtype='float64')
+        self.duration = self.times[-1]
+
+
+    @classmethod
+    def load(cls, filePath: str) -> 'CameraPath':
+        """
+        Loads a camera path from a JSON file containing a list of keyframes, each written as
+        {"time": 0, "position": [x, y, z], "yaw": -90, "pitch": 0}
+
+        :param str filePath: The path of the JSON file
+
+        :returns: The loaded camera path
+        """
+
+        with open(filePath) as pathFile:
+            keyframes = json.load(pathFile)
+
+        return cls([(keyframe["time"], glm.vec3(keyframe["position"]), keyframe["yaw"], keyframe["pitch"])
+                    for keyframe in keyframes])
+
+
+    @classmethod
+    def orbit(cls, duration: float = HEADLESS_FRAMES * HEADLESS_FRAME_TIME, radius: float = CENTRE_XZ,
+              height: float = WORLD_SIZE_Y, pitch: float = -30, steps: int = 64) -> 'CameraPath':
+        """
+        Creates a camera path that circles the centre of the world once while looking inwards
+
+        :param float duration: The time taken to go round once in milliseconds
+        :param float radius: The distance from the centre of the world
+        :param float height: The height of the camera
+        :param float pitch: The pitch of the camera in degrees
+        :param int steps: The number of keyframes around the circle
+
+        :returns: The orbiting camera path
+        """
+
+        keyframes = []
+
+        for step in range(steps + 1):
+            angle = 2 * math.pi * step / steps
+            position = glm.vec3(CENTRE_XZ + radius * math.cos(angle), height, CENTRE_XZ + radius * math.sin(angle))
+
+            # Facing back towards the centre of the world
+            keyframes.append((duration * step / steps, position, math.degrees(angle) + 180, pitch))
+
+        return cls(keyframes)
+
+
+    def get_pose(self, time: float) -> tuple[glm.vec3, float, float]:
+        """
+        Gets where the camera is at a point along the path. Times past the end of the path hold the last keyframe
+
+        :param float time: The time along the path in milliseconds
+
+        :returns: The position, yaw and pitch of the camera, with the yaw and pitch in degrees
+        """
+
+        index = int(np.searchsorted(self.times, time, side='right'))
+
+        if index == 0:
+            return self.keyframes[0][1:]
+
+        if index == len(self.keyframes):
+            return self.keyframes[-1][1:]
+
+        startTime, startPos, startYaw, startPitch = self.keyframes[index - 1]
+        endTime, endPos, endYaw, endPitch = self.keyframes[index]
+        amount = (time - startTime) / (endTime - startTime)
+
+        return glm.mix(startPos, endPos, amount), glm.mix(startYaw, endYaw, amount), glm.mix(startPitch, endPitch, amount)
@@ -1,76 +1,266 @@
 import moderngl as mgl
 import pygame
 import sys
+import time
+import random
 
 from settings import *
-from ShaderProgram import ShaderProgram
+from ShaderProgram import ShaderProgram, read_shader_sources
 from Scene import Scene
 from Player import Player
 from Textures import Textures
+from KernelWarmup import KernelWarmup
+from StartupPipeline import StartupPipeline
+from Profiling.StartupProfiler import StartupProfiler
+from Profiling.Tracer import Tracer
+from Profiling.PerformanceOverlay import PerformanceOverlay
+from Profiling.MemoryTracker import MemoryTracker
+from QualityController import QualityController
+from Replay.ReplayRecorder import ReplayRecorder
+from Network.WorldClient import WorldClient
 
 pygame.init()
 
 
 class Engine:
-    def __init__(self) -> None:
-        "Engine Class that runs the main game"
+    def __init__(self, startupProfiler: StartupProfiler = None, seed: int = None, serverAddress: tuple[str, int] = None) -> None:
+        """
+        Engine Class that runs the main game
 
-        # Initialise OpenGL Context
-        try:
-            pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MAJOR_VERSION, 3)
-            pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MINOR_VERSION, 3)
-            pygame.display.gl_set_attribute(pygame.GL_CONTEXT_PROFILE_MASK, pygame.GL_CONTEXT_PROFILE_CORE)
-            pygame.display.gl_set_attribute(pygame.GL_DEPTH_SIZE, 24)
-
-            pygame.display.set_mode(WINDOW_RES, flags=pygame.OPENGL | pygame.DOUBLEBUF)
-            pygame.display.set_caption("MinecraftPython")
-            
-            self.context = mgl.create_context()
-            self.context.enable(flags=mgl.DEPTH_TEST | mgl.CULL_FACE | mgl.BLEND)
-            self.context.gc_mode = "auto"
+        :param StartupProfiler startupProfiler: The profiler timing startup, which is created here if not provided
+        :param int seed: The seed for world generation and random ticks, which are unseeded if not provided
+        :param tuple serverAddress: The (host, port) of a world server to play on, or None to play a local world
+        """
 
-        except Exception as e:
-            print(f"Error initialising OpenGL Context: {e}")
-            sys.exit()
+        self.startupProfiler = startupProfiler or StartupProfiler()
+        self.timeToFirstFrame: float = None
+        self.tracer = Tracer()
+        self.memoryTracker = MemoryTracker(self)
+        self.qualityController = QualityController(self)
+
+        # World generation picks random block types, so it is seeded to make runs repeatable
+        self.seed = seed
+        if seed is not None:
+            random.seed(seed)
+
+        self.replayRecorder: ReplayRecorder = None
+
+        # When playing on a server, the world is received from it instead of being generated
+        self.worldClient: WorldClient = None
+        if serverAddress:
+            self.worldClient = WorldClient(*serverAddress)
+            self.worldClient.start()
+
+        # Kernels compile in the background while the window opens
+        self.kernelWarmup: KernelWarmup = None
+        if WARM_UP_KERNELS:
+            self.kernelWarmup = KernelWarmup(self.startupProfiler)
+            self.kernelWarmup.start()
 
         # Initialise Engine variables
         self.clock = pygame.time.Clock()
-        self.deltaTime = 0
+        self.deltaTime = SIMULATION_TICK_TIME
         self.time = 0
 
+        # Fixed tick loop state and timings shown in the caption
+        self.tickAccumulator = 0
+        self.interpolation = 0
+        self.ticksThisFrame = 0
+        self.simulationTime = 0
+        self.loadingTime = 0
+        self.renderTime = 0
+
         #pygame.event.set_grab(True)
         #pygame.mouse.set_visible(False)
 
         self.isRunning = True
+        self.startupPipeline = StartupPipeline(self.startupProfiler)
         self.on_init()
 
 
+    def init_context(self) -> None:
+        "Opens the window and sets up the OpenGL context, exiting if that fails"
+
+        try:
+            with self.startupProfiler.phase("Window and OpenGL"):
+                self.create_context()
+                self.context.enable(flags=mgl.DEPTH_TEST | mgl.CULL_FACE | mgl.BLEND)
+                self.context.gc_mode = "auto"
+
+        except Exception as e:
+            print(f"Error initialising OpenGL Context: {e}")
+            sys.exit()
+
+
+    def create_context(self) -> None:
+        "Opens the window and creates the OpenGL context that renders to it"
+
+        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MAJOR_VERSION, 3)
+        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_MINOR_VERSION, 3)
+        pygame.display.gl_set_attribute(pygame.GL_CONTEXT_PROFILE_MASK, pygame.GL_CONTEXT_PROFILE_CORE)
+        pygame.display.gl_set_attribute(pygame.GL_DEPTH_SIZE, 24)
+
+        self.create_window()
+        pygame.display.set_caption("MinecraftPython")
+
+        self.context = mgl.create_context()
+
+
+    def create_window(self) -> None:
+        "Opens the OpenGL window, turning on vsync if it is enabled and supported"
+
+        flags = pygame.OPENGL | pygame.DOUBLEBUF
+
+        if VSYNC:
+            try:
+                pygame.display.set_mode(WINDOW_RES, flags=flags, vsync=1)
+                return
+
+            except pygame.error as e:
+                print(f"Vsync unavailable, continuing without it: {e}")
+
+        pygame.display.set_mode(WINDOW_RES, flags=flags)
+
+
     def on_init(self) -> None:
-        "Handles further logic executes during the __init__ method"
-        
-        self.textures = Textures(self)
-        self.player = Player(self)
-        self.shaderProgram = ShaderProgram(self)
-        self.scene = Scene(self)
+        """
+        Handles further logic executes during the __init__ method. Startup runs as a graph of tasks, where reading
+        files and generating the world run on a thread pool while the main thread opens the window, and only the
+        tasks that use the OpenGL context run on the main thread
+        """
+
+        pipeline = self.startupPipeline
+
+        def create_player() -> None:
+            self.player = Player(self)
+
+        def create_scene() -> None:
+            self.scene = Scene(self)
+
+        def create_textures() -> None:
+            self.textures = Textures(self, pipeline.tasks["Texture data"].result)
+
+        def create_shaders() -> None:
+            self.shaderProgram = ShaderProgram(self, pipeline.tasks["Shader sources"].result)
+
+        def create_overlay() -> None:
+            self.overlay = PerformanceOverlay(self)
+
+        pipeline.add("Window and OpenGL", self.init_context, onMainThread=True)
+        pipeline.add("Shader sources", read_shader_sources)
+        pipeline.add("Texture data", lambda: Textures.load_texture_data(BLOCK_TEXTURES))
+        pipeline.add("Player", create_player)
+        pipeline.add("World generation", create_scene)
+        pipeline.add("Textures", create_textures, ("Window and OpenGL", "Texture data"), onMainThread=True)
+        pipeline.add("Shaders", create_shaders, ("Window and OpenGL", "Shader sources", "Player"), onMainThread=True)
+        pipeline.add("Overlay", create_overlay, ("Window and OpenGL", "Shaders"), onMainThread=True)
+        pipeline.add("Initial meshes", lambda: self.scene.world.chunkLoader.load_initial(),
+                     ("World generation", "Shaders"), onMainThread=True)
+
+        pipeline.run()
 
 
     def update(self) -> None:
-        "Updates information for the engine"
+        "Advances the simulation by one fixed length tick"
 
-        self.shaderProgram.update()
         self.scene.update()
         self.player.update()
 
-        self.deltaTime = self.clock.tick()
+        if self.replayRecorder:
+            self.replayRecorder.record_tick()
+
+
+    def update_frame(self) -> None:
+        "Waits for the frame rate cap and runs every simulation tick that is due before the next frame"
+
+        frameTime = self.clock.tick(MAX_FPS)
         self.time = pygame.time.get_ticks() * 0.001
-        pygame.display.set_caption(f'FPS: {self.clock.get_fps():.0f}')
+
+        self.run_ticks(frameTime)
+
+        pygame.display.set_caption(f'FPS: {self.clock.get_fps():.0f} | Sim: {self.simulationTime:.1f} ms | Render: {self.renderTime:.1f} ms')
+
+
+    def run_ticks(self, frameTime: float) -> None:
+        """
+        Runs every simulation tick that is due after a frame, then the once per frame updates
+
+        :param float frameTime: The time since the last frame in milliseconds
+        """
+
+        # Long stalls are clamped so the simulation never has to catch up on more than MAX_FRAME_TIME
+        self.tickAccumulator += min(frameTime, MAX_FRAME_TIME)
+
+        startTime = time.perf_counter()
+        self.ticksThisFrame = 0
+
+        with self.tracer.span("Simulation"):
+            while self.tickAccumulator >= SIMULATION_TICK_TIME:
+                with self.tracer.span("Tick"):
+                    self.update()
+
+                self.tickAccumulator -= SIMULATION_TICK_TIME
+                self.ticksThisFrame += 1
+
+        self.interpolation = self.tickAccumulator / SIMULATION_TICK_TIME
+        self.simulationTime = (time.perf_counter() - startTime) * 1000
+        self.tracer.counter("Ticks", self.ticksThisFrame)
+
+        startTime = time.perf_counter()
+        self.scene.update_frame()
+        self.loadingTime = (time.perf_counter() - startTime) * 1000
 
 
     def render(self) -> None:
         "Function that renders the engine"
 
+        startTime = time.perf_counter()
+
+        self.update_camera()
+        self.shaderProgram.update()
+
         self.context.clear(color=BG_COLOUR)
-        self.scene.render()
+
+        with self.overlay.gpuTimer:
+            self.scene.render()
+
+        self.overlay.render()
+
+        with self.tracer.span("Present"):
+            self.present()
+
+        self.renderTime = (time.perf_counter() - startTime) * 1000
+        self.tracer.counter("Draw calls", self.scene.world.drawCallCount)
+        self.overlay.update()
+        self.qualityController.update(self.simulationTime + self.loadingTime + self.renderTime, self.loadingTime)
+
+        if self.timeToFirstFrame is None:
+            self.timeToFirstFrame = time.perf_counter() - self.startupProfiler.startTime
+            self.startupProfiler.report("First frame shown")
+            self.startupPipeline.report()
+
+
+    def start_recording(self, filePath: str) -> None:
+        """
+        Starts recording every tick to a replay file, which is saved when the engine closes. The world is fully loaded
+        first so the recording starts from the same state a replay does
+
+        :param str filePath: The path to save the replay to
+        """
+
+        self.scene.world.chunkLoader.load_all()
+        self.replayRecorder = ReplayRecorder(self, filePath)
+
+
+    def update_camera(self) -> None:
+        "Moves the camera to where it should be drawn from this frame"
+
+        self.player.update_frame(self.interpolation)
+
+
+    def present(self) -> None:
+        "Shows the finished frame"
+
         pygame.display.flip()
 
 
@@ -82,6 +272,13 @@ class Engine:
             if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
                 self.isRunning = False
 
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F1:
+                self.overlay.toggle()
+
+            # Saves the frames in the tracer's ring buffer to look at a stall that just happened
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3 and self.tracer.enabled:
+                self.tracer.save()
+
             self.player.handle_event(event)
 
 
@@ -90,9 +287,20 @@ class Engine:
 
         # Runs main game loop while running
         while self.isRunning:
-            self.update()
-            self.handle_events()
-            self.render()
+            with self.tracer.span("Frame"):
+                self.update_frame()
+                self.handle_events()
+                self.render()
+
+            self.tracer.end_frame()
+
+        if self.replayRecorder:
+            self.replayRecorder.save()
+
+        if self.tracer.enabled:
+            self.tracer.save()
+
+        self.memoryTracker.report("Memory at exit")
 
         # Quits properly after running
         pygame.quit()
@@ -0,0 +1,202 @@
+import os
+import time
+
+import moderngl as mgl
+import pygame
+from overrides import overrides
+
+from settings import *
+from Engine import Engine
+from CameraPath import CameraPath
+from Profiling.StartupProfiler import StartupProfiler
+
+
+class HeadlessEngine(Engine):
+    def __init__(self, startupProfiler: StartupProfiler = None, cameraPath: CameraPath = None, seed: int = 0,
+                 dumpDirectory: str = None, dumpInterval: int = 0, serverAddress: tuple[str, int] = None) -> None:
+        """
+        Engine that renders into an offscreen framebuffer without a window, for benchmarking rendering on machines
+        with no display. The camera follows a scripted path instead of player input and frames are a fixed
+        HEADLESS_FRAME_TIME apart, so the same settings always draw the same frames
+
+        :param StartupProfiler startupProfiler: The profiler timing startup, which is created here if not provided
+        :param CameraPath cameraPath: The path the camera follows, which orbits the world if not provided
+        :param int seed: The seed for world generation
+        :param str dumpDirectory: The folder frames are saved to as PNG images, if frames are being saved
+        :param int dumpInterval: How many frames apart saved frames are, or 0 to not save any frames
+        :param tuple serverAddress: The (host, port) of a world server to render the world of, or None to render a
+        local world
+        """
+
+        self.cameraPath = cameraPath or CameraPath.orbit()
+        self.resolution = (int(WINDOW_RES.x), int(WINDOW_RES.y))
+        self.dumpDirectory = dumpDirectory
+        self.dumpInterval = dumpInterval
+        self.frameTimes: list[float] = []
+
+        super().__init__(startupProfiler, seed, serverAddress)
+
+
+    @overrides
+    def create_context(self) -> None:
+        "Creates a standalone OpenGL context that renders into an offscreen framebuffer"
+
+        # EGL works without a display server, and software renderers are fine for it
+        try:
+            self.context = mgl.create_standalone_context(require=330, backend='egl')
+
+        except Exception as e:
+            print(f"EGL unavailable, trying the default standalone context: {e}")
+            self.context = mgl.create_standalone_context(require=330)
+
+        self.framebuffer = self.context.framebuffer(
+            color_attachments=[self.context.texture(self.resolution, 4)],
+            depth_attachment=self.context.depth_renderbuffer(self.resolution))
+        self.framebuffer.use()
+
+
+    @overrides
+    def on_init(self) -> None:
+        "Handles further logic executes during the __init__ method"
+
+        super().on_init()
+
+        # Adapting the render distance to how long frames took would make runs draw different frames
+        self.qualityController.disable()
+
+        # Software renderers filter anisotropically very slowly, and with nearest filtering it makes no difference
+        self.textures.blockTextures.anisotropy = 1.0
+
+
+    @overrides
+    def update(self) -> None:
+        "Advances the simulation by one fixed length tick, without any player input"
+
+        self.scene.update()
+
+
+    @overrides
+    def update_frame(self) -> None:
+        "Moves time on by one fixed length frame and runs every simulation tick that is due"
+
+        self.time += HEADLESS_FRAME_TIME * 0.001
+        self.run_ticks(HEADLESS_FRAME_TIME)
+
+
+    @overrides
+    def update_camera(self) -> None:
+        "Moves the camera to its position along the camera path"
+
+        position, yaw, pitch = self.cameraPath.get_pose(self.time * 1000)
+
+        self.player.pos = glm.vec3(position)
+        self.player.previousPos = glm.vec3(position)
+        self.player.yaw = glm.radians(yaw)
+        self.player.pitch = glm.radians(pitch)
+
+        self.player.update_vectors()
+        self.player.update_view_matrix()
+
+
+    @overrides
+    def present(self) -> None:
+        "Waits for the GPU to finish the frame, so frame times include the rendering work"
+
+        self.context.finish()
+
+
+    @overrides
+    def handle_events(self) -> None:
+        "Headless mode has no input, only the camera path"
+
+        pass
+
+
+    def save_frame(self, filePath: str) -> None:
+        """
+        Saves the contents of the framebuffer as an image
+
+        :param str filePath: The path to save the image to
+        """
+
+        data = self.framebuffer.read(components=3)
+        image = pygame.image.frombuffer(data, self.resolution, "RGB")
+
+        # OpenGL's rows start at the bottom of the image
+        pygame.image.save(pygame.transform.flip(image, flip_x=False, flip_y=True), filePath)
+
+
+    def get_frame_stats(self) -> dict[str, float]:
+        """
+        Summarises the frame times of the run
+
+        :returns: A dictionary of frame time statistics in milliseconds, along with the frame count, average FPS,
+        the number of chunk meshes built during the run and the average number of draw calls per frame
+        """
+
+        frameTimes = np.array(self.frameTimes)
+
+        return {
+            "frames": len(frameTimes),
+            "mean": float(frameTimes.mean()),
+            "p50": float(np.percentile(frameTimes, 50)),
+            "p95": float(np.percentile(frameTimes, 95)),
+            "p99": float(np.percentile(frameTimes, 99)),
+            "max": float(frameTimes.max()),
+            "fps": float(1000 / frameTimes.mean()),
+            "meshBuilds": self.scene.world.meshBuildCount - self.startMeshBuildCount,
+            "drawCalls": float(np.mean(self.drawCalls)),
+        }
+
+
+    def run_frames(self, frameCount: int = HEADLESS_FRAMES, waitForWorld: bool = True) -> dict[str, float]:
+        """
+        Renders a set number of frames and reports how long they took
+
+        :param int frameCount: The number of frames to render
+        :param bool waitForWorld: Whether to finish loading the world before the first frame, so every frame draws
+        the whole world
+
+        :returns: The frame time statistics of the run
+        """
+
+        # Compiling in the background would take time away from the frames being measured
+        if self.kernelWarmup:
+            self.kernelWarmup.wait()
+
+        if waitForWorld:
+            self.scene.world.chunkLoader.load_all()
+
+        self.startMeshBuildCount = self.scene.world.meshBuildCount
+        self.drawCalls: list[int] = []
+
+        if self.dumpDirectory:
+            os.makedirs(self.dumpDirectory, exist_ok=True)
+
+        for frame in range(frameCount):
+            startTime = time.perf_counter()
+
+            with self.tracer.span("Frame"):
+                self.update_frame()
+                self.render()
+
+            self.frameTimes.append((time.perf_counter() - startTime) * 1000)
+            self.tracer.end_frame()
+            self.drawCalls.append(self.scene.world.drawCallCount)
+
+            if self.dumpDirectory and self.dumpInterval and frame % self.dumpInterval == 0:
+                self.save_frame(os.path.join(self.dumpDirectory, f"frame_{frame:05d}.png"))
+
+        if self.tracer.enabled:
+            self.tracer.save()
+
+        self.memoryTracker.report("Memory after rendering")
+
+        stats = self.get_frame_stats()
+
+        print(f"Rendered {stats['frames']} frames at {self.resolution[0]}x{self.resolution[1]}: "
+              f"mean {stats['mean']:.2f} ms, p50 {stats['p50']:.2f} ms, p95 {stats['p95']:.2f} ms, "
+              f"p99 {stats['p99']:.2f} ms, max {stats['max']:.2f} ms ({stats['fps']:.0f} FPS), "
+              f"{stats['meshBuilds']} meshes built, {stats['drawCalls']:.1f} draw calls per frame")
+
+        return stats
@@ -0,0 +1,87 @@
+import threading
+import time
+
+from settings import *
+from Lighting.lightPropagation import light_column, update_light
+from Physics.collision import update_solid_bits, move_bodies
+from Simulation.fluidKernels import step_fluids
+from WorldObjects.rayCaster import ray_cast_batch
+from WorldObjects.voxelAccess import get_voxels_batch, set_voxels_batch
+from WorldObjects.surfaceHeights import build_column_heights, update_heights
+from WorldObjects.simplexNoise import add_noise_layer
+from Profiling.StartupProfiler import StartupProfiler
+
+
+class KernelWarmup:
+    def __init__(self, startupProfiler: StartupProfiler) -> None:
+        """
+        Class that compiles the kernels which are not compiled on import, or loads them from the kernel cache, on a
+        background thread while the window opens. Kernels are only compiled for the argument types the game calls
+        them with, not run, so no scratch world is needed
+
+        :param StartupProfiler startupProfiler: The profiler the warm-up time is reported to
+        """
+
+        self.startupProfiler = startupProfiler
+        self.thread = threading.Thread(target=self.warm_up, name="KernelWarmup", daemon=True)
+
+
+    def start(self) -> None:
+        "Starts warming up the kernels in the background"
+
+        # Numba's thread pool is started on the main thread, as a TBB pool started from another thread hangs on exit
+        numba.get_num_threads()
+
+        self.thread.start()
+
+
+    def wait(self) -> None:
+        "Waits for the warm-up to finish"
+
+        self.thread.join()
+
+
+    def get_kernel_calls(self) -> list[tuple]:
+        """
+        Gets example arguments for each kernel, in the order the game first needs them. Only the types matter
+
+        :returns: A list of (kernel, arguments) tuples
+        """
+
+        worldArray = np.zeros((1, 1), dtype='uint8')
+        dirtyChunks = np.zeros(1, dtype='bool')
+        positions = np.zeros((1, 3), dtype='int32')
+        bodies = np.zeros((1, 3), dtype='float64')
+        rays = np.zeros((1, 3), dtype='float32')
+        heights = np.zeros((1, 1), dtype='int16')
+
+        return [
+            # World loading
+            (add_noise_layer, (np.zeros((1, 1), dtype='float64'), 0, 0, 0.0, 0)),
+            (build_column_heights, (0, 0, worldArray, heights)),
+            (light_column, (0, 0, worldArray, worldArray, dirtyChunks)),
+
+            # The first tick of player movement and voxel targeting
+            (move_bodies, (bodies, bodies, bodies, dirtyChunks, 0.0, 0.0, 0.0, 0.0, worldArray)),
+            (ray_cast_batch, (rays, rays, 0.0, worldArray, positions, np.zeros((1, 3), dtype='int8'),
+                              np.zeros(1, dtype='uint8'), np.zeros(1, dtype='float32'))),
+
+            # The first voxel edit and the simulations it wakes up
+            (get_voxels_batch, (positions, worldArray, np.zeros(1, dtype='int16'))),
+            (set_voxels_batch, (positions, np.zeros(1, dtype='uint8'), worldArray, dirtyChunks, dirtyChunks)),
+            (update_solid_bits, (positions, worldArray, worldArray)),
+            (update_heights, (positions, worldArray, heights)),
+            (update_light, (positions, worldArray, worldArray, dirtyChunks)),
+            (step_fluids, (positions, worldArray, np.zeros(1, dtype='uint8'), dirtyChunks)),
+        ]
+
+
+    def warm_up(self) -> None:
+        "Compiles every kernel for the argument types it is called with"
+
+        startTime = time.perf_counter()
+
+        for kernel, arguments in self.get_kernel_calls():
+            kernel.compile(tuple(numba.typeof(argument) for argument in arguments))
+
+        self.startupProfiler.warmupTime = time.perf_counter() - startTime
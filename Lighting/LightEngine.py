@@ -0,0 +1,46 @@
+from settings import *
+from Lighting.lightPropagation import build_light, light_column, update_light
+import World
+
+
+class LightEngine:
+    def __init__(self, world: 'World.World') -> None:
+        """
+        Class that stores and updates the sky and block light levels of every voxel in the world
+
+        :param World world: The world that the light is calculated for
+        """
+
+        self.world = world
+
+        # Packed light levels in the same layout as World.voxels (sky light in the upper 4 bits, block light in the lower 4)
+        self.light = np.zeros([WORLD_VOLUME, CHUNK_VOLUME], dtype='uint8')
+
+
+    def build_light(self) -> None:
+        "Calculates the light for the whole world from scratch"
+
+        build_light(self.world.voxels, self.light)
+
+
+    def light_column(self, columnX: int, columnZ: int, dirtyChunks: np.array) -> None:
+        """
+        Calculates the light for a column of chunks that has just been generated
+
+        :param int columnX: The x position of the chunk column
+        :param int columnZ: The z position of the chunk column
+        :param np.array dirtyChunks: A boolean array with one flag per chunk, set for every chunk whose light changes
+        """
+
+        light_column(columnX, columnZ, self.world.voxels, self.light, dirtyChunks)
+
+
+    def update_voxels(self, positions: np.array, dirtyChunks: np.array) -> None:
+        """
+        Updates the light around voxels that have been edited
+
+        :param np.array positions: An (N, 3) integer array of world voxel positions that have been edited
+        :param np.array dirtyChunks: A boolean array with one flag per chunk, set for every chunk whose light changes
+        """
+
+        update_light(positions, self.world.voxels, self.light, dirtyChunks)
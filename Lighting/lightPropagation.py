@@ -0,0 +1,403 @@
+from settings import *
+from Meshes.chunkMeshBuilder import get_chunk_index
+from WorldObjects.voxelAccess import get_voxel_index, mark_dirty
+
+
+"""
+Light is stored with one byte per voxel in the same layout as World.voxels. The upper 4 bits hold the sky light
+level and the lower 4 bits hold the block light level. Both channels are spread with a breadth first flood fill,
+losing one level per voxel travelled, except for full strength sky light which travels straight down for free.
+"""
+
+SKY_CHANNEL = 0
+BLOCK_CHANNEL = 1
+
+# Neighbour offsets used by the flood fill, index 3 is the downwards direction
+NEIGHBOUR_OFFSETS = np.array([
+    (1, 0, 0), (-1, 0, 0),
+    (0, 1, 0), (0, -1, 0),
+    (0, 0, 1), (0, 0, -1),
+], dtype='int32')
+DOWN = 3
+
+
+@njit
+def get_light(chunkIndex: int, voxelIndex: int, channel: int, worldLight: np.array) -> int:
+    """
+    Gets the light level of one channel for a voxel
+
+    :param int chunkIndex: The index of the chunk the voxel is in
+    :param int voxelIndex: The index of the voxel within its chunk
+    :param int channel: SKY_CHANNEL or BLOCK_CHANNEL
+    :param np.array worldLight: The packed light levels for every voxel in the world
+
+    :returns: The light level (0-15)
+    """
+
+    if channel == SKY_CHANNEL:
+        return np.int64(worldLight[chunkIndex, voxelIndex] >> 4)
+
+    return np.int64(worldLight[chunkIndex, voxelIndex] & 15)
+
+
+@njit
+def set_light(chunkIndex: int, voxelIndex: int, channel: int, level: int, worldLight: np.array) -> None:
+    """
+    Sets the light level of one channel for a voxel, leaving the other channel unchanged
+
+    :param int chunkIndex: The index of the chunk the voxel is in
+    :param int voxelIndex: The index of the voxel within its chunk
+    :param int channel: SKY_CHANNEL or BLOCK_CHANNEL
+    :param int level: The new light level (0-15)
+    :param np.array worldLight: The packed light levels for every voxel in the world
+    """
+
+    if channel == SKY_CHANNEL:
+        worldLight[chunkIndex, voxelIndex] = (level << 4) | (worldLight[chunkIndex, voxelIndex] & 15)
+    else:
+        worldLight[chunkIndex, voxelIndex] = (worldLight[chunkIndex, voxelIndex] & 240) | level
+
+
+@njit
+def push(queue: np.array, tail: int, x: int, y: int, z: int, level: int) -> tuple[np.array, int]:
+    """
+    Adds an entry to the end of a light queue, growing the queue if it is full
+
+    :param np.array queue: An (N, 4) array of (x, y, z, level) entries
+    :param int tail: The index of the end of the queue
+    :param int x: The world x coordinate of the voxel
+    :param int y: The world y coordinate of the voxel
+    :param int z: The world z coordinate of the voxel
+    :param int level: The light level stored with the entry
+
+    :returns: The (possibly reallocated) queue and its new tail index
+    """
+
+    if tail == queue.shape[0]:
+        grownQueue = np.empty((queue.shape[0] * 2, 4), dtype=np.int32)
+        grownQueue[:tail] = queue
+        queue = grownQueue
+
+    queue[tail, 0] = x
+    queue[tail, 1] = y
+    queue[tail, 2] = z
+    queue[tail, 3] = level
+
+    return queue, tail + 1
+
+
+@njit
+def propagate_light(queue: np.array, tail: int, channel: int, worldVoxels: np.array, worldLight: np.array, dirtyChunks: np.array) -> None:
+    """
+    Spreads light outwards from every voxel in the queue until it runs out
+
+    :param np.array queue: An (N, 4) array of (x, y, z, level) entries to spread light from
+    :param int tail: The index of the end of the queue
+    :param int channel: SKY_CHANNEL or BLOCK_CHANNEL
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+    :param np.array worldLight: The packed light levels for every voxel in the world
+    :param np.array dirtyChunks: A boolean array with one flag per chunk, set for every chunk whose light changes
+    """
+
+    head = 0
+    while head < tail:
+        x, y, z = queue[head, 0], queue[head, 1], queue[head, 2]
+        head += 1
+
+        chunkIndex = get_chunk_index((x, y, z))
+        if chunkIndex == -1:
+            continue
+
+        level = get_light(chunkIndex, get_voxel_index(x, y, z), channel, worldLight)
+        if level == 0:
+            continue
+
+        for direction in range(6):
+            adjX = x + NEIGHBOUR_OFFSETS[direction, 0]
+            adjY = y + NEIGHBOUR_OFFSETS[direction, 1]
+            adjZ = z + NEIGHBOUR_OFFSETS[direction, 2]
+
+            adjChunkIndex = get_chunk_index((adjX, adjY, adjZ))
+            if adjChunkIndex == -1:
+                continue
+
+            adjVoxelIndex = get_voxel_index(adjX, adjY, adjZ)
+            if worldVoxels[adjChunkIndex, adjVoxelIndex]:
+                continue
+
+            if channel == SKY_CHANNEL and direction == DOWN and level == MAX_LIGHT:
+                newLevel = level
+            else:
+                newLevel = level - 1
+
+            if get_light(adjChunkIndex, adjVoxelIndex, channel, worldLight) < newLevel:
+                set_light(adjChunkIndex, adjVoxelIndex, channel, newLevel, worldLight)
+                mark_dirty(adjX, adjY, adjZ, dirtyChunks)
+                queue, tail = push(queue, tail, adjX, adjY, adjZ, newLevel)
+
+
+@njit
+def remove_light(removeQueue: np.array, removeTail: int, addQueue: np.array, addTail: int, channel: int,
+                 worldVoxels: np.array, worldLight: np.array, dirtyChunks: np.array) -> tuple[np.array, int]:
+    """
+    Removes the light that was spread from every voxel in the removal queue. Any brighter light found at the edge
+    of the removed area is added to the add queue so it can spread back in afterwards
+
+    :param np.array removeQueue: An (N, 4) array of (x, y, z, level) entries holding the light level that was removed
+    :param int removeTail: The index of the end of the removal queue
+    :param np.array addQueue: An (N, 4) array of voxels that need to spread their light again
+    :param int addTail: The index of the end of the add queue
+    :param int channel: SKY_CHANNEL or BLOCK_CHANNEL
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+    :param np.array worldLight: The packed light levels for every voxel in the world
+    :param np.array dirtyChunks: A boolean array with one flag per chunk, set for every chunk whose light changes
+
+    :returns: The (possibly reallocated) add queue and its new tail index
+    """
+
+    head = 0
+    while head < removeTail:
+        x, y, z, level = removeQueue[head, 0], removeQueue[head, 1], removeQueue[head, 2], removeQueue[head, 3]
+        head += 1
+
+        for direction in range(6):
+            adjX = x + NEIGHBOUR_OFFSETS[direction, 0]
+            adjY = y + NEIGHBOUR_OFFSETS[direction, 1]
+            adjZ = z + NEIGHBOUR_OFFSETS[direction, 2]
+
+            adjChunkIndex = get_chunk_index((adjX, adjY, adjZ))
+            if adjChunkIndex == -1:
+                continue
+
+            adjVoxelIndex = get_voxel_index(adjX, adjY, adjZ)
+            adjLevel = get_light(adjChunkIndex, adjVoxelIndex, channel, worldLight)
+            if adjLevel == 0:
+                continue
+
+            # Light that came from the removed voxel is removed, brighter light is spread back in later
+            isSkyColumn = channel == SKY_CHANNEL and direction == DOWN and level == MAX_LIGHT
+            if adjLevel < level or isSkyColumn:
+                set_light(adjChunkIndex, adjVoxelIndex, channel, 0, worldLight)
+                mark_dirty(adjX, adjY, adjZ, dirtyChunks)
+                removeQueue, removeTail = push(removeQueue, removeTail, adjX, adjY, adjZ, adjLevel)
+
+                emission = VOXEL_EMISSION[worldVoxels[adjChunkIndex, adjVoxelIndex]]
+                if channel == BLOCK_CHANNEL and emission:
+                    set_light(adjChunkIndex, adjVoxelIndex, channel, emission, worldLight)
+                    addQueue, addTail = push(addQueue, addTail, adjX, adjY, adjZ, emission)
+
+            else:
+                addQueue, addTail = push(addQueue, addTail, adjX, adjY, adjZ, adjLevel)
+
+    return addQueue, addTail
+
+
+@njit
+def update_light(positions: np.array, worldVoxels: np.array, worldLight: np.array, dirtyChunks: np.array) -> None:
+    """
+    Updates the light around a batch of edited voxels. The old light is removed from each edited voxel and then
+    light from the surrounding voxels is spread back in, so the work done depends only on the affected volume
+
+    :param np.array positions: An (N, 3) array of world voxel positions that have been edited
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+    :param np.array worldLight: The packed light levels for every voxel in the world
+    :param np.array dirtyChunks: A boolean array with one flag per chunk, set for every chunk whose light changes
+    """
+
+    for channel in (SKY_CHANNEL, BLOCK_CHANNEL):
+        removeQueue = np.empty((max(64, positions.shape[0] * 8), 4), dtype=np.int32)
+        addQueue = np.empty((max(64, positions.shape[0] * 8), 4), dtype=np.int32)
+        removeTail = 0
+        addTail = 0
+
+        for i in range(positions.shape[0]):
+            x, y, z = positions[i, 0], positions[i, 1], positions[i, 2]
+
+            chunkIndex = get_chunk_index((x, y, z))
+            if chunkIndex == -1:
+                continue
+
+            voxelIndex = get_voxel_index(x, y, z)
+            voxelID = worldVoxels[chunkIndex, voxelIndex]
+
+            level = get_light(chunkIndex, voxelIndex, channel, worldLight)
+            set_light(chunkIndex, voxelIndex, channel, 0, worldLight)
+            mark_dirty(x, y, z, dirtyChunks)
+            removeQueue, removeTail = push(removeQueue, removeTail, x, y, z, level)
+
+            if channel == BLOCK_CHANNEL and VOXEL_EMISSION[voxelID]:
+                set_light(chunkIndex, voxelIndex, channel, VOXEL_EMISSION[voxelID], worldLight)
+                addQueue, addTail = push(addQueue, addTail, x, y, z, VOXEL_EMISSION[voxelID])
+
+            if voxelID:
+                continue
+
+            # An empty voxel is relit by its neighbours, or directly by the sky at the top of the world
+            if channel == SKY_CHANNEL and y == WORLD_SIZE_Y - 1:
+                set_light(chunkIndex, voxelIndex, channel, MAX_LIGHT, worldLight)
+                addQueue, addTail = push(addQueue, addTail, x, y, z, MAX_LIGHT)
+
+            for direction in range(6):
+                addQueue, addTail = push(
+                    addQueue, addTail,
+                    x + NEIGHBOUR_OFFSETS[direction, 0], y + NEIGHBOUR_OFFSETS[direction, 1], z + NEIGHBOUR_OFFSETS[direction, 2], 0)
+
+        addQueue, addTail = remove_light(removeQueue, removeTail, addQueue, addTail, channel, worldVoxels, worldLight, dirtyChunks)
+        propagate_light(addQueue, addTail, channel, worldVoxels, worldLight, dirtyChunks)
+
+
+@njit
+def build_light(worldVoxels: np.array, worldLight: np.array) -> None:
+    """
+    Calculates the sky and block light for the whole world from scratch. Every voxel above the highest solid voxel
+    in its column is lit by the sky, and the flood fill only needs to start from sky lit voxels next to a taller
+    column and from light emitting voxels
+
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+    :param np.array worldLight: The packed light levels for every voxel in the world, overwritten by this function
+    """
+
+    worldLight[:] = 0
+    dirtyChunks = np.zeros(WORLD_VOLUME, dtype=np.bool_)
+
+    # The lowest sky lit y coordinate of every column
+    skyHeights = np.zeros((WORLD_SIZE_X, WORLD_SIZE_Z), dtype=np.int32)
+
+    for x in range(WORLD_SIZE_X):
+        for z in range(WORLD_SIZE_Z):
+            y = WORLD_SIZE_Y - 1
+            while y >= 0 and not worldVoxels[get_chunk_index((x, y, z)), get_voxel_index(x, y, z)]:
+                set_light(get_chunk_index((x, y, z)), get_voxel_index(x, y, z), SKY_CHANNEL, MAX_LIGHT, worldLight)
+                y -= 1
+
+            skyHeights[x, z] = y + 1
+
+    queue = np.empty((WORLD_SIZE_X * WORLD_SIZE_Z, 4), dtype=np.int32)
+    tail = 0
+
+    for x in range(WORLD_SIZE_X):
+        for z in range(WORLD_SIZE_Z):
+            tallestNeighbour = 0
+            for adjX, adjZ in ((x - 1, z), (x + 1, z), (x, z - 1), (x, z + 1)):
+                if 0 <= adjX < WORLD_SIZE_X and 0 <= adjZ < WORLD_SIZE_Z:
+                    tallestNeighbour = max(tallestNeighbour, skyHeights[adjX, adjZ])
+
+            for y in range(skyHeights[x, z], tallestNeighbour):
+                queue, tail = push(queue, tail, x, y, z, MAX_LIGHT)
+
+    propagate_light(queue, tail, SKY_CHANNEL, worldVoxels, worldLight, dirtyChunks)
+
+    tail = 0
+    for chunkIndex in range(WORLD_VOLUME):
+        chunkX = chunkIndex % WORLD_WIDTH
+        chunkZ = chunkIndex // WORLD_WIDTH % WORLD_DEPTH
+        chunkY = chunkIndex // WORLD_AREA
+
+        for voxelIndex in range(CHUNK_VOLUME):
+            emission = VOXEL_EMISSION[worldVoxels[chunkIndex, voxelIndex]]
+            if emission:
+                x = chunkX * CHUNK_SIZE + voxelIndex % CHUNK_SIZE
+                y = chunkY * CHUNK_SIZE + voxelIndex // CHUNK_AREA
+                z = chunkZ * CHUNK_SIZE + voxelIndex // CHUNK_SIZE % CHUNK_SIZE
+
+                set_light(chunkIndex, voxelIndex, BLOCK_CHANNEL, emission, worldLight)
+                queue, tail = push(queue, tail, x, y, z, emission)
+
+    propagate_light(queue, tail, BLOCK_CHANNEL, worldVoxels, worldLight, dirtyChunks)
+
+
+@njit
+def push_if_lit(queue: np.array, tail: int, x: int, y: int, z: int, channel: int, worldLight: np.array) -> tuple[np.array, int]:
+    """
+    Adds a voxel to a light queue if it is inside the world and has some light in the given channel
+
+    :param np.array queue: An (N, 4) array of (x, y, z, level) entries
+    :param int tail: The index of the end of the queue
+    :param int x: The world x coordinate of the voxel
+    :param int y: The world y coordinate of the voxel
+    :param int z: The world z coordinate of the voxel
+    :param int channel: SKY_CHANNEL or BLOCK_CHANNEL
+    :param np.array worldLight: The packed light levels for every voxel in the world
+
+    :returns: The (possibly reallocated) queue and its new tail index
+    """
+
+    chunkIndex = get_chunk_index((x, y, z))
+    if chunkIndex != -1:
+        level = get_light(chunkIndex, get_voxel_index(x, y, z), channel, worldLight)
+        if level:
+            queue, tail = push(queue, tail, x, y, z, level)
+
+    return queue, tail
+
+
+@njit
+def light_column(columnX: int, columnZ: int, worldVoxels: np.array, worldLight: np.array, dirtyChunks: np.array) -> None:
+    """
+    Lights a column of chunks that has just been generated. Columns that have not been generated yet are filled
+    with opaque voxels, so adding a column can only brighten the world and light only needs to be spread from the
+    new column and from the edges of the columns next to it
+
+    :param int columnX: The x position of the chunk column
+    :param int columnZ: The z position of the chunk column
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+    :param np.array worldLight: The packed light levels for every voxel in the world
+    :param np.array dirtyChunks: A boolean array with one flag per chunk, set for every chunk whose light changes
+    """
+
+    startX = columnX * CHUNK_SIZE
+    startZ = columnZ * CHUNK_SIZE
+
+    for chunkY in range(WORLD_HEIGHT):
+        worldLight[columnX + WORLD_WIDTH * columnZ + WORLD_AREA * chunkY] = 0
+
+    for x in range(startX, startX + CHUNK_SIZE):
+        for z in range(startZ, startZ + CHUNK_SIZE):
+            y = WORLD_SIZE_Y - 1
+            while y >= 0 and not worldVoxels[get_chunk_index((x, y, z)), get_voxel_index(x, y, z)]:
+                set_light(get_chunk_index((x, y, z)), get_voxel_index(x, y, z), SKY_CHANNEL, MAX_LIGHT, worldLight)
+                y -= 1
+
+    skyQueue = np.empty((CHUNK_AREA * 4, 4), dtype=np.int32)
+    blockQueue = np.empty((CHUNK_AREA * 4, 4), dtype=np.int32)
+    skyTail = 0
+    blockTail = 0
+
+    for x in range(startX, startX + CHUNK_SIZE):
+        for z in range(startZ, startZ + CHUNK_SIZE):
+            for y in range(WORLD_SIZE_Y):
+                chunkIndex = get_chunk_index((x, y, z))
+                voxelIndex = get_voxel_index(x, y, z)
+
+                emission = VOXEL_EMISSION[worldVoxels[chunkIndex, voxelIndex]]
+                if emission:
+                    set_light(chunkIndex, voxelIndex, BLOCK_CHANNEL, emission, worldLight)
+                    blockQueue, blockTail = push(blockQueue, blockTail, x, y, z, emission)
+
+                # Sky light only needs to spread sideways from voxels next to a darker empty voxel
+                if get_light(chunkIndex, voxelIndex, SKY_CHANNEL, worldLight) == MAX_LIGHT:
+                    for adjX, adjZ in ((x - 1, z), (x + 1, z), (x, z - 1), (x, z + 1)):
+                        adjChunkIndex = get_chunk_index((adjX, y, adjZ))
+                        if adjChunkIndex == -1:
+                            continue
+
+                        adjVoxelIndex = get_voxel_index(adjX, y, adjZ)
+                        if not worldVoxels[adjChunkIndex, adjVoxelIndex] and get_light(adjChunkIndex, adjVoxelIndex, SKY_CHANNEL, worldLight) < MAX_LIGHT:
+                            skyQueue, skyTail = push(skyQueue, skyTail, x, y, z, MAX_LIGHT)
+                            break
+
+    # Light already in the neighbouring columns spreads in across the shared faces
+    for y in range(WORLD_SIZE_Y):
+        for offset in range(CHUNK_SIZE):
+            for adjX, adjZ in (
+                (startX - 1, startZ + offset), (startX + CHUNK_SIZE, startZ + offset),
+                (startX + offset, startZ - 1), (startX + offset, startZ + CHUNK_SIZE),
+            ):
+                skyQueue, skyTail = push_if_lit(skyQueue, skyTail, adjX, y, adjZ, SKY_CHANNEL, worldLight)
+                blockQueue, blockTail = push_if_lit(blockQueue, blockTail, adjX, y, adjZ, BLOCK_CHANNEL, worldLight)
+
+    for chunkY in range(WORLD_HEIGHT):
+        dirtyChunks[columnX + WORLD_WIDTH * columnZ + WORLD_AREA * chunkY] = True
+
+    propagate_light(skyQueue, skyTail, SKY_CHANNEL, worldVoxels, worldLight, dirtyChunks)
+    propagate_light(blockQueue, blockTail, BLOCK_CHANNEL, worldVoxels, worldLight, dirtyChunks)
@@ -8,6 +8,9 @@ class BaseMesh:
     def __init__(self):
         "Base mesh class to which future mesh classes will inherit from"
 
+        # The engine the mesh belongs to
+        self.app = None
+
         # OpenGL Context and Shader Program
         self.context: mgl.Context = None
         self.shaderProgram: ShaderProgram = None
@@ -16,7 +19,8 @@ class BaseMesh:
         self.vboFormat = None
         self.attrs: tuple[str, ...] = None
 
-        # Vertex Array Object
+        # Vertex Buffer Object and Vertex Array Object
+        self.vbo: mgl.Buffer = None
         self.vao: mgl.VertexArray = None
 
 
@@ -38,12 +42,26 @@ class BaseMesh:
         """
 
         vertexData = self.get_vertex_data()
-        vbo = self.context.buffer(vertexData)
-        vao = self.context.vertex_array(self.shaderProgram, [(vbo, self.vboFormat, *self.attrs)], skip_errors=True)
+
+        with self.app.tracer.span("VBO upload"):
+            # OpenGL buffers can't be empty, so a mesh with no vertices gets a buffer too small to hold a vertex
+            if vertexData.size:
+                self.vbo = self.context.buffer(vertexData)
+            else:
+                self.vbo = self.context.buffer(reserve=vertexData.itemsize)
+
+            vao = self.context.vertex_array(self.shaderProgram, [(self.vbo, self.vboFormat, *self.attrs)], skip_errors=True)
         
         return vao
     
 
+    def release(self) -> None:
+        "Frees the mesh's buffers on the GPU"
+
+        self.vao.release()
+        self.vbo.release()
+
+
     def render(self) -> None:
         "Renders the current mesh"
         
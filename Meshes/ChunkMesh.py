@@ -1,8 +1,10 @@
+import moderngl as mgl
 from overrides import overrides
 
 from settings import *
 from Meshes.BaseMesh import BaseMesh
 from Meshes.chunkMeshBuilder import build_chunk_mesh
+from Meshes.binaryMeshBuilder import build_chunk_mesh_binary, MAX_BINARY_CHUNK_SIZE
 import WorldObjects.Chunk
 
 
@@ -21,9 +23,14 @@ class ChunkMesh(BaseMesh):
         self.context = self.app.context
         self.shaderProgram = self.app.shaderProgram.chunk
 
-        self.vboFormat = "1u4"
+        self.vboFormat = "1u4 1u4"
         self.formatSize = sum(int(format[:1]) for format in self.vboFormat.split())
-        self.attrs = ("packedData",)
+        self.attrs = ("packedData", "lightData")
+        self.buildMesh = build_chunk_mesh_binary if BINARY_MESHING and CHUNK_SIZE <= MAX_BINARY_CHUNK_SIZE else build_chunk_mesh
+
+        # A mesh built somewhere else, such as on the mesh worker, which is uploaded instead of building one
+        self.builtMesh: np.array = None
+
         self.vao = self.get_vao()
 
 
@@ -35,16 +42,70 @@ class ChunkMesh(BaseMesh):
         :returns: A numpy array containing all of the mesh data for the chunk
         """
         
-        mesh = build_chunk_mesh(
-            chunkVoxels=self.chunk.voxels,
-            formatSize=self.formatSize,
-            chunkPos=self.chunk.position,
-            worldVoxels=self.chunk.world.voxels)
+        self.chunk.world.meshBuildCount += 1
+
+        if self.builtMesh is not None:
+            mesh, self.builtMesh = self.builtMesh, None
+
+        else:
+            with self.app.tracer.span("Meshing"):
+                mesh = self.buildMesh(
+                    chunkVoxels=self.chunk.voxels,
+                    formatSize=self.formatSize,
+                    chunkPos=self.chunk.position,
+                    worldVoxels=self.chunk.world.voxels,
+                    worldLight=self.chunk.world.lightEngine.light)
+
+        self.vertexCount = len(mesh) // self.formatSize
+        self.chunk.world.uploadedVertexCount += self.vertexCount
+
+        # The binary mesher sizes the mesh exactly, the other mesh is a view of a scratch array sized for the worst case
+        # of 18 vertices per voxel, which is held until the mesh is uploaded
+        if self.buildMesh is build_chunk_mesh_binary:
+            self.cpuMeshBytes = mesh.nbytes
+        else:
+            self.cpuMeshBytes = CHUNK_VOLUME * 18 * self.formatSize * mesh.itemsize
+        self.app.memoryTracker.allocate("CPU meshes", self.chunk, self.cpuMeshBytes)
 
         return mesh
     
 
-    def rebuild_mesh(self) -> None:
-        "Rebuilds the current chunk's mesh"
-        
-        self.vao = self.get_vao()
\ No newline at end of file
+    @overrides
+    def get_vao(self) -> mgl.VertexArray:
+        """
+        Builds the chunk's mesh and uploads it to the GPU, recording the memory used along the way
+
+        :returns: An OpenGL vertex array object
+        """
+
+        vao = super().get_vao()
+
+        self.app.memoryTracker.free("CPU meshes", self.chunk, self.cpuMeshBytes)
+        self.app.memoryTracker.allocate("GPU buffers", self.chunk, self.vbo.size)
+        self.chunk.registry.set_mesh(self.chunk.index, self.vertexCount, self.vbo.size)
+
+        return vao
+
+
+    @overrides
+    def release(self) -> None:
+        "Frees the chunk's buffers on the GPU"
+
+        self.app.memoryTracker.free("GPU buffers", self.chunk, self.vbo.size)
+
+        super().release()
+
+
+    def rebuild_mesh(self, builtMesh: np.array = None) -> None:
+        """
+        Rebuilds the current chunk's mesh
+
+        :param np.array builtMesh: A mesh that has already been built for the chunk to upload, if there is one
+        """
+
+        self.builtMesh = builtMesh
+
+        with self.app.tracer.span("ChunkMesh.rebuild_mesh"):
+            # The old buffers are freed first, otherwise every rebuild leaks them on the GPU
+            self.release()
+            self.vao = self.get_vao()
\ No newline at end of file
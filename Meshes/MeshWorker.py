@@ -0,0 +1,99 @@
+import queue
+import threading
+from collections import deque
+
+from settings import *
+from Meshes.chunkMeshBuilder import build_chunk_mesh
+from Meshes.binaryMeshBuilder import build_chunk_mesh_binary, MAX_BINARY_CHUNK_SIZE
+import World
+
+
+class MeshWorker:
+    def __init__(self, world: 'World.World') -> None:
+        """
+        Class that rebuilds chunk meshes on a background thread from snapshots of the chunks, so the main thread only
+        uploads the finished meshes. The worker keeps its own copy of the world, and only copies in the chunks that
+        changed since it last meshed near them. A mesh whose chunks changed again while it was being built is thrown
+        away and the chunk is queued again
+
+        :param World world: The world whose chunks are meshed
+        """
+
+        self.world = world
+        self.buildMesh = build_chunk_mesh_binary if BINARY_MESHING and CHUNK_SIZE <= MAX_BINARY_CHUNK_SIZE else build_chunk_mesh
+
+        # The worker's copy of the world and the version of each chunk it holds
+        self.voxels = np.full([WORLD_VOLUME, CHUNK_VOLUME], UNLOADED_VOXEL_ID, dtype='uint8')
+        self.light = np.zeros([WORLD_VOLUME, CHUNK_VOLUME], dtype='uint8')
+        self.heldVersions = np.full(WORLD_VOLUME, -1, dtype='int64')
+
+        # Chunks waiting for the worker, and the (chunk index, snapshot, mesh) of each finished mesh
+        self.requests: queue.Queue[int] = queue.Queue()
+        self.queuedChunks: set[int] = set()
+        self.results: deque[tuple] = deque()
+
+        # Counters used by the performance reports
+        self.builtCount = 0
+        self.discardedCount = 0
+
+        self.thread = threading.Thread(target=self.run, name="MeshWorker", daemon=True)
+        self.thread.start()
+
+
+    def submit(self, chunkIndex: int) -> None:
+        """
+        Queues a chunk to be meshed, unless it is already waiting. Its snapshot is only taken once the worker starts
+        on it, so a chunk that changes again while it waits is still only meshed once
+
+        :param int chunkIndex: The index of the chunk
+        """
+
+        if chunkIndex not in self.queuedChunks:
+            self.queuedChunks.add(chunkIndex)
+            self.requests.put(chunkIndex)
+
+
+    def run(self) -> None:
+        "Meshes queued chunks until the program exits"
+
+        while True:
+            chunkIndex = self.requests.get()
+            self.queuedChunks.discard(chunkIndex)
+
+            snapshot = self.world.voxelSnapshots.get_snapshot(chunkIndex)
+            snapshot.copy_into(self.voxels, self.light, self.heldVersions)
+
+            # The mesh is built in the vertex format of the chunk mesh it will be uploaded to
+            mesh = self.buildMesh(
+                chunkVoxels=self.voxels[chunkIndex],
+                formatSize=self.world.chunks[chunkIndex].mesh.formatSize,
+                chunkPos=(chunkIndex % WORLD_WIDTH, chunkIndex // WORLD_AREA, chunkIndex // WORLD_WIDTH % WORLD_DEPTH),
+                worldVoxels=self.voxels,
+                worldLight=self.light)
+
+            self.results.append((chunkIndex, snapshot, mesh))
+
+
+    def upload_finished(self) -> None:
+        "Uploads the meshes that have finished since the last call, queueing again any built from out of date chunks"
+
+        while self.results:
+            chunkIndex, snapshot, mesh = self.results.popleft()
+
+            if not self.world.voxelSnapshots.is_current(snapshot):
+                self.discardedCount += 1
+                self.submit(chunkIndex)
+                continue
+
+            self.builtCount += 1
+            self.world.chunks[chunkIndex].mesh.rebuild_mesh(mesh)
+
+
+    def get_pending_count(self) -> int:
+        """
+        Counts the chunks waiting for the worker or waiting to be uploaded
+
+        :returns: The number of chunks
+        """
+
+        return self.requests.qsize() + len(self.results)
@@ -0,0 +1,47 @@
+import moderngl as mgl
+from overrides import overrides
+
+from settings import *
+from Meshes.BaseMesh import BaseMesh
+import Engine
+
+
+class OverlayMesh(BaseMesh):
+    def __init__(self, app: 'Engine.Engine', size: tuple[int, int]) -> None:
+        """
+        Class that stores a textured quad drawn over the top left corner of the screen
+
+        :param Engine app: The Engine the overlay is drawn in
+        :param tuple size: The (width, height) of the quad in pixels
+        """
+
+        super().__init__()
+
+        self.app = app
+        self.context: mgl.Context = app.context
+        self.shaderProgram = app.shaderProgram.overlay
+        self.size = size
+
+        self.vboFormat = "2f 2f"
+        self.attrs = ("inPosition", "inTexCoord")
+        self.vao = self.get_vao()
+
+
+    @overrides
+    def get_vertex_data(self) -> np.array:
+        """
+        Builds the quad in screen space, sized to cover the same number of pixels at any window resolution
+
+        :returns: A numpy array of the positions and texture coordinates of the quad's vertices
+        """
+
+        right = -1 + 2 * self.size[0] / WINDOW_RES.x
+        bottom = 1 - 2 * self.size[1] / WINDOW_RES.y
+
+        # Wound anticlockwise so the quad is not culled
+        vertices = [
+            (-1, bottom, 0, 0), (right, bottom, 1, 0), (right, 1, 1, 1),
+            (-1, bottom, 0, 0), (right, 1, 1, 1), (-1, 1, 0, 1)
+        ]
+
+        return np.array(vertices, dtype='float32')
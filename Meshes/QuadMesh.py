@@ -15,7 +15,7 @@ class QuadMesh(BaseMesh):
         self.context: mgl.Context = app.context
         self.shaderProgram = app.shaderProgram.quad
 
-        self.vbo_format = "3f 3f"
+        self.vboFormat = "3f 3f"
         self.attrs = ("inPosition", "inColour")
         self.vao = self.get_vao()
 
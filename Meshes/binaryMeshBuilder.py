@@ -0,0 +1,324 @@
+from settings import *
+from numba import uint8, uint32, uint64, int64, types
+from Meshes.chunkMeshBuilder import POSITION, WORLD_ARRAY, pack_data, pack_light, get_light_data
+
+
+"""
+Mesher that works on whole rows of voxels at once. The chunk and a one voxel border around it are stored as 64 bit
+occupancy masks, one per (y, z) row running along x, with bit x + 1 set when the voxel at x is not void (the extra bit
+at each end holds the neighbouring chunks' voxels). The visible faces of a row in each direction, and the ambient
+occlusion values of their corners, are then found with shifts and ANDs of neighbouring rows. The mesh has exactly the
+same faces as build_chunk_mesh, vertex for vertex, but they are added row by row rather than voxel by voxel
+"""
+
+# Rows are CHUNK_SIZE + 2 bits long, so chunks up to 62 voxels wide fit into 64 bit masks. Wider chunks are meshed
+# with build_chunk_mesh instead
+MAX_BINARY_CHUNK_SIZE = 62
+PADDED_SIZE = CHUNK_SIZE + 2
+
+ONE = np.uint64(1)
+INNER_MASK = np.uint64(((1 << min(CHUNK_SIZE, MAX_BINARY_CHUNK_SIZE)) - 1) << 1)
+FULL_MASK = np.uint64((1 << 64) - 1)
+
+# Constants to turn 8 voxels read as one 64 bit word into 8 bits, one per voxel
+LOW_BITS = np.uint64(0x0101010101010101)
+GATHER_BITS = np.uint64(0x0102040810204080)
+
+# The offset to the voxel in front of each face, and the plane the face lies in (0: Y, 1: X, 2: Z)
+FACE_NORMALS = np.array([(0, 1, 0), (0, -1, 0), (1, 0, 0), (-1, 0, 0), (0, 0, -1), (0, 0, 1)], dtype='int64')
+FACE_PLANES = np.array([0, 0, 1, 1, 2, 2], dtype='int64')
+
+# The corners of each face relative to the voxel, and the order they are added in without and with a flip
+FACE_CORNERS = np.array([
+    [(0, 1, 0), (1, 1, 0), (1, 1, 1), (0, 1, 1)],
+    [(0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1)],
+    [(1, 0, 0), (1, 1, 0), (1, 1, 1), (1, 0, 1)],
+    [(0, 0, 0), (0, 1, 0), (0, 1, 1), (0, 0, 1)],
+    [(0, 0, 0), (0, 1, 0), (1, 1, 0), (1, 0, 0)],
+    [(0, 0, 1), (0, 1, 1), (1, 1, 1), (1, 0, 1)],
+], dtype='int64')
+FACE_ORDERS = np.array([
+    [(0, 3, 2, 0, 2, 1), (1, 0, 3, 1, 3, 2)],
+    [(0, 2, 3, 0, 1, 2), (1, 3, 0, 1, 2, 3)],
+    [(0, 1, 2, 0, 2, 3), (3, 0, 1, 3, 1, 2)],
+    [(0, 2, 1, 0, 3, 2), (3, 1, 0, 3, 2, 1)],
+    [(0, 1, 2, 0, 2, 3), (3, 0, 1, 3, 1, 2)],
+    [(0, 2, 1, 0, 3, 2), (3, 1, 0, 3, 2, 1)],
+], dtype='int64')
+
+# Each corner's offset from the voxel in packed form, which is added to the voxel's packed data
+CORNER_OFFSETS = np.array([[pack_data(*corner, 0, 0, 0, 0) for corner in corners] for corners in FACE_CORNERS], dtype='int64')
+
+
+@njit(uint64(uint64, int64))
+def shift_row(row: int, offset: int) -> int:
+    """
+    Lines a row up with the voxels offset along it, so bit x + 1 of the result is the voxel at x + offset
+
+    :param int row: The row mask
+    :param int offset: The offset along the row, from -1 to 1
+
+    :returns: The shifted row mask
+    """
+
+    if offset > 0:
+        return row >> ONE
+
+    if offset < 0:
+        return row << ONE
+
+    return row
+
+
+@njit(int64(uint64))
+def count_bits(mask: int) -> int:
+    """
+    Counts the set bits of a mask, in parallel across the bits of the mask rather than one at a time
+
+    :param int mask: The mask to count
+
+    :returns: The number of set bits
+    """
+
+    mask = mask - ((mask >> ONE) & np.uint64(0x5555555555555555))
+    mask = (mask & np.uint64(0x3333333333333333)) + ((mask >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    mask = (mask + (mask >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+
+    return int64((mask * LOW_BITS) >> np.uint64(56))
+
+
+@njit(uint64(uint8[::1], int64, int64))
+def get_row(voxels: np.array, y: int, z: int) -> int:
+    """
+    Gets the occupancy mask of a row of a chunk's voxels, without the bits at either end
+
+    :param np.array voxels: The voxels of the chunk
+    :param int y: The y coordinate of the row in the chunk
+    :param int z: The z coordinate of the row in the chunk
+
+    :returns: A row mask with bit x + 1 set when the voxel at x is not void
+    """
+
+    row = np.uint64(0)
+    rowIndex = CHUNK_SIZE * z + CHUNK_AREA * y
+
+    for x in range(CHUNK_SIZE):
+        row |= np.uint64(voxels[rowIndex + x] != 0) << np.uint64(x + 1)
+
+    return row
+
+
+@njit(uint64(uint64[::1], int64, int64))
+def get_row_from_words(words: np.array, y: int, z: int) -> int:
+    """
+    Gets the occupancy mask of a row of a chunk's voxels 8 voxels at a time, for chunks with rows a whole number of
+    64 bit words long
+
+    :param np.array words: The voxels of the chunk, read as 64 bit words
+    :param int y: The y coordinate of the row in the chunk
+    :param int z: The z coordinate of the row in the chunk
+
+    :returns: A row mask with bit x + 1 set when the voxel at x is not void
+    """
+
+    row = np.uint64(0)
+    rowIndex = (CHUNK_SIZE * z + CHUNK_AREA * y) // 8
+
+    for word in range(CHUNK_SIZE // 8):
+        # Sets the lowest bit of each byte of a non void voxel, then gathers those bits into the top byte
+        voxelBits = words[rowIndex + word]
+        voxelBits |= voxelBits >> np.uint64(4)
+        voxelBits |= voxelBits >> np.uint64(2)
+        voxelBits |= voxelBits >> ONE
+        voxelBits = ((voxelBits & LOW_BITS) * GATHER_BITS) >> np.uint64(56)
+
+        row |= voxelBits << np.uint64(word * 8 + 1)
+
+    return row
+
+
+@njit(uint64[:, ::1](uint8[::1], POSITION, WORLD_ARRAY))
+def build_occupancy(chunkVoxels: np.array, chunkPos: tuple[int, int, int], worldVoxels: np.array) -> np.array:
+    """
+    Builds the occupancy masks of a chunk and the voxels bordering it. Voxels outside of the world are counted as
+    occupied, matching is_void
+
+    :param np.array chunkVoxels: The voxels of the chunk
+    :param tuple chunkPos: The position of the chunk in the world
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+
+    :returns: A (PADDED_SIZE, PADDED_SIZE) array of row masks indexed by [y + 1, z + 1]
+    """
+
+    occupancy = np.empty((PADDED_SIZE, PADDED_SIZE), dtype=np.uint64)
+    chunkX, chunkY, chunkZ = chunkPos
+
+    # Rows are contiguous, so when they are a whole number of words long they are read 8 voxels at a time
+    readWords = CHUNK_SIZE % 8 == 0
+    if readWords:
+        chunkWords = chunkVoxels.view(np.uint64)
+        worldWords = worldVoxels.view(np.uint64)
+
+    for paddedY in range(PADDED_SIZE):
+        for paddedZ in range(PADDED_SIZE):
+            worldY = chunkY * CHUNK_SIZE + paddedY - 1
+            worldZ = chunkZ * CHUNK_SIZE + paddedZ - 1
+
+            # Every row runs through chunks in the same row of chunks as this one, or is entirely outside of the world
+            if not (0 <= worldY < WORLD_SIZE_Y and 0 <= worldZ < WORLD_SIZE_Z):
+                occupancy[paddedY, paddedZ] = FULL_MASK
+                continue
+
+            rowChunkY, y = divmod(worldY, CHUNK_SIZE)
+            rowChunkZ, z = divmod(worldZ, CHUNK_SIZE)
+            rowChunkIndex = chunkX + WORLD_WIDTH * rowChunkZ + WORLD_AREA * rowChunkY
+
+            isChunkRow = rowChunkY == chunkY and rowChunkZ == chunkZ
+
+            if readWords:
+                row = get_row_from_words(chunkWords if isChunkRow else worldWords[rowChunkIndex], y, z)
+            else:
+                row = get_row(chunkVoxels if isChunkRow else worldVoxels[rowChunkIndex], y, z)
+
+            # The bits at either end come from the chunks to the left and right of this one
+            rowIndex = CHUNK_SIZE * z + CHUNK_AREA * y
+
+            if chunkX == 0 or worldVoxels[rowChunkIndex - 1, rowIndex + CHUNK_SIZE - 1]:
+                row |= ONE
+
+            if chunkX == WORLD_WIDTH - 1 or worldVoxels[rowChunkIndex + 1, rowIndex]:
+                row |= ONE << np.uint64(PADDED_SIZE - 1)
+
+            occupancy[paddedY, paddedZ] = row
+
+    return occupancy
+
+
+@njit(types.void(uint64[:, ::1], int64, int64, int64, uint64[::1]))
+def get_corner_masks(void: np.array, paddedY: int, paddedZ: int, faceID: int, cornerMasks: np.array) -> None:
+    """
+    Calculates the ambient occlusion values of every face in a row facing one direction at once. Each corner's value
+    is the number of void voxels out of the three around it, which is added up bit by bit across the whole row
+
+    :param np.array void: The inverted occupancy masks
+    :param int paddedY: The y index of the row in the padded masks
+    :param int paddedZ: The z index of the row in the padded masks
+    :param int faceID: The direction the faces point in
+    :param np.array cornerMasks: An output array for the low and high bits of the value of corners 0 to 3, as
+    (low0, high0, low1, high1, ...)
+    """
+
+    normalX, normalY, normalZ = FACE_NORMALS[faceID]
+    plane = FACE_PLANES[faceID]
+
+    # The n, nw, w, sw, s, se, e and ne neighbours of the voxel in front of each face, each lined up with the row
+    if plane == 0:
+        frontY = paddedY + normalY
+        back, middle, front = void[frontY, paddedZ - 1], void[frontY, paddedZ], void[frontY, paddedZ + 1]
+        n, nw, w, sw = back, back << ONE, middle << ONE, front << ONE
+        s, se, e, ne = front, front >> ONE, middle >> ONE, back >> ONE
+
+    elif plane == 1:
+        n, nw, w, sw = void[paddedY, paddedZ - 1], void[paddedY - 1, paddedZ - 1], void[paddedY - 1, paddedZ], void[paddedY - 1, paddedZ + 1]
+        s, se, e, ne = void[paddedY, paddedZ + 1], void[paddedY + 1, paddedZ + 1], void[paddedY + 1, paddedZ], void[paddedY + 1, paddedZ - 1]
+        n, nw, w, sw = shift_row(n, normalX), shift_row(nw, normalX), shift_row(w, normalX), shift_row(sw, normalX)
+        s, se, e, ne = shift_row(s, normalX), shift_row(se, normalX), shift_row(e, normalX), shift_row(ne, normalX)
+
+    else:
+        frontZ = paddedZ + normalZ
+        below, middle, above = void[paddedY - 1, frontZ], void[paddedY, frontZ], void[paddedY + 1, frontZ]
+        n, nw, w, sw = middle << ONE, below << ONE, below, below >> ONE
+        s, se, e, ne = middle >> ONE, above >> ONE, above, above << ONE
+
+    # A full adder of the three neighbours of each corner, giving each corner a value from 0 to 3
+    for corner, (a, b, c) in enumerate(((n, nw, w), (e, ne, n), (s, se, e), (w, sw, s))):
+        cornerMasks[corner * 2] = a ^ b ^ c
+        cornerMasks[corner * 2 + 1] = (a & b) | (a & c) | (b & c)
+
+
+# The GIL is released so chunks can be meshed on the mesh worker while the main thread runs
+@njit(uint32[::1](uint8[::1], int64, POSITION, WORLD_ARRAY, WORLD_ARRAY), nogil=True)
+def build_chunk_mesh_binary(chunkVoxels: np.array, formatSize: int, chunkPos: tuple[int, int, int], worldVoxels: np.array, worldLight: np.array) -> np.array:
+    """
+    Builds the mesh for a chunk from its occupancy masks. The mesh has the same faces as the one build_chunk_mesh
+    builds, but the array is sized to fit the mesh exactly rather than the worst case
+
+    :param np.array chunkVoxels: The array of voxels to build mesh from
+    :param int formatSize: The number of items representing each vertex
+    :param tuple chunkPos: The position of the chunk in the world
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+    :param np.array worldLight: A numpy array storing the packed light levels of all of the voxels in the world
+
+    :returns: A numpy array of vertices
+    """
+
+    occupancy = build_occupancy(chunkVoxels, chunkPos, worldVoxels)
+    void = ~occupancy
+
+    # Visible faces of each row in each direction, which are counted to size the vertex array
+    faceMasks = np.zeros((CHUNK_SIZE, CHUNK_SIZE, 6), dtype=np.uint64)
+    faceCount = 0
+
+    for y in range(CHUNK_SIZE):
+        for z in range(CHUNK_SIZE):
+            solid = occupancy[y + 1, z + 1] & INNER_MASK
+            if not solid:
+                continue
+
+            for faceID in range(6):
+                normalX, normalY, normalZ = FACE_NORMALS[faceID]
+                faceMasks[y, z, faceID] = solid & shift_row(void[y + 1 + normalY, z + 1 + normalZ], normalX)
+                faceCount += count_bits(faceMasks[y, z, faceID])
+
+    vertexData = np.empty(faceCount * 6 * formatSize, dtype='uint32')
+    index = 0
+
+    chunkX, chunkY, chunkZ = chunkPos
+    chunkIndex = chunkX + WORLD_WIDTH * chunkZ + WORLD_AREA * chunkY
+    cornerMasks = np.empty(8, dtype=np.uint64)
+    aoValues = np.empty(4, dtype=np.int64)
+    vertices = np.empty(4, dtype=np.int64)
+
+    for y in range(CHUNK_SIZE):
+        for z in range(CHUNK_SIZE):
+            for faceID in range(6):
+                faces = faceMasks[y, z, faceID]
+                if not faces:
+                    continue
+
+                get_corner_masks(void, y + 1, z + 1, faceID, cornerMasks)
+                normalX, normalY, normalZ = FACE_NORMALS[faceID]
+
+                # Goes through the faces of the row from the lowest bit up, as the number of trailing zeros of each
+                while faces:
+                    bit = np.uint64(count_bits((faces & (~faces + ONE)) - ONE))
+                    faces &= faces - ONE
+                    x = int64(bit) - 1
+
+                    for corner in range(4):
+                        low = (cornerMasks[corner * 2] >> bit) & ONE
+                        high = (cornerMasks[corner * 2 + 1] >> bit) & ONE
+                        aoValues[corner] = int64(low | high << ONE)
+
+                    needFlip = aoValues[1] + aoValues[3] > aoValues[0] + aoValues[2]
+
+                    # Light comes from the voxel in front of the face, which is only looked up in the world at the border
+                    voxelID = chunkVoxels[x + CHUNK_SIZE * z + CHUNK_AREA * y]
+                    adjX, adjY, adjZ = x + normalX, y + normalY, z + normalZ
+                    if 0 <= adjX < CHUNK_SIZE and 0 <= adjY < CHUNK_SIZE and 0 <= adjZ < CHUNK_SIZE:
+                        lightData = pack_light(voxelID, int64(worldLight[chunkIndex, adjX + CHUNK_SIZE * adjZ + CHUNK_AREA * adjY]))
+                    else:
+                        lightData = pack_light(voxelID, get_light_data((chunkX * CHUNK_SIZE + adjX, chunkY * CHUNK_SIZE + adjY, chunkZ * CHUNK_SIZE + adjZ), worldLight))
+
+                    # The corners only differ from the voxel's packed data in their position and ambient occlusion
+                    voxelData = pack_data(x, y, z, voxelID, faceID, 0, needFlip)
+                    for corner in range(4):
+                        vertices[corner] = voxelData + CORNER_OFFSETS[faceID, corner] | aoValues[corner] << 1
+
+                    # Added as 2 triangles, flipped if needed to avoid anisotropy, in the same order as build_chunk_mesh
+                    for vertex in range(6):
+                        vertexData[index] = vertices[FACE_ORDERS[faceID, int(needFlip), vertex]]
+                        vertexData[index + 1] = lightData
+                        index += 2
+
+    return vertexData
@@ -1,5 +1,11 @@
 from settings import *
-from numba import uint8
+from numba import uint8, uint32, int64, boolean, types
+
+
+# Types of the mesher kernels' arguments. Giving the kernels signatures compiles them on import instead of on the
+# first mesh build, and they are then loaded from the kernel cache on later runs
+POSITION = types.UniTuple(int64, 3)
+WORLD_ARRAY = uint8[:, ::1]
 
 
 """ 
@@ -13,21 +19,35 @@ FACE ID's ARE AS FOLLOWS:
 """
 
 
+# Bits per coordinate and per voxel ID in each vertex layout
+COORDINATE_BITS, VOXEL_ID_BITS = {1: (6, 8), 2: (8, 16)}[VERTEX_LAYOUT]
+
+if CHUNK_SIZE >= 1 << COORDINATE_BITS:
+    raise Exception(f"Chunks {CHUNK_SIZE} voxels wide do not fit vertex layout {VERTEX_LAYOUT}, use layout 2")
+
+
 @njit
 def pack_data(x: int, y: int, z: int, voxelID: int, faceID: int, aoValue: int, needFlip: int) -> int:
     """
-    Packs all data into a single 32 bit unsigned integer. The format of the 32 bit integer is as below:
+    Packs all data into a single 32 bit unsigned integer. The format of the 32 bit integer in layout 1 is as below:
     
-    x: 6 bits (0-32 in chunk)
-    y: 6 bits (0-32 in chunk)
-    z: 6 bits (0-32 in chunk)
+    x: 6 bits (0-63 in chunk)
+    y: 6 bits (0-63 in chunk)
+    z: 6 bits (0-63 in chunk)
     voxelID: 8 bits (255 block types)
     faceID: 3 bits (faces 0-5)
     aoValue: 2 bits (values 0-3)
     needFlip: 1 bit (bool 0 or 1)
+
+    Layout 2 uses 8 bits per coordinate (0-255 in chunk) and leaves the voxelID out, as it is packed with the light
+    levels by pack_light instead
     """
 
-    yLen, zLen, voxelIDLen, faceIDLen, aoValueLen, needFlipLen = 6, 6, 8, 3, 2, 1
+    yLen, zLen, faceIDLen, aoValueLen, needFlipLen = COORDINATE_BITS, COORDINATE_BITS, 3, 2, 1
+    voxelIDLen = VOXEL_ID_BITS if VERTEX_LAYOUT == 1 else 0
+
+    if VERTEX_LAYOUT != 1:
+        voxelID = 0
 
     packedData = (
         x << yLen + zLen + voxelIDLen + faceIDLen + aoValueLen + needFlipLen |
@@ -42,6 +62,23 @@ def pack_data(x: int, y: int, z: int, voxelID: int, faceID: int, aoValue: int, n
     return packedData
 
 
+@njit
+def pack_light(voxelID: int, lightData: int) -> int:
+    """
+    Packs the second 32 bit unsigned integer of each vertex. In layout 1 this is just the light levels, layout 2 adds
+    the voxelID above them:
+
+    voxelID: 16 bits (65535 block types, layout 2 only)
+    skyLight: 4 bits
+    blockLight: 4 bits
+    """
+
+    if VERTEX_LAYOUT == 1:
+        return lightData
+
+    return voxelID << 8 | lightData
+
+
 @njit
 def get_chunk_index(worldVoxelPos: tuple[int, int, int]) -> int:
     """
@@ -66,7 +103,7 @@ def get_chunk_index(worldVoxelPos: tuple[int, int, int]) -> int:
     return chunkIndex
 
 
-@njit
+@njit(boolean(POSITION, POSITION, WORLD_ARRAY))
 def is_void(voxelPos: tuple[int, int, int], worldVoxelPos: tuple[int, int, int], worldVoxels: np.array) -> bool:
     """
     Checks to see if the voxel at the given coordinate is a solid block
@@ -94,13 +131,36 @@ def is_void(voxelPos: tuple[int, int, int], worldVoxelPos: tuple[int, int, int],
     return True
 
 
+@njit(int64(POSITION, WORLD_ARRAY))
+def get_light_data(worldVoxelPos: tuple[int, int, int], worldLight: np.array) -> int:
+    """
+    Gets the packed sky and block light level of a voxel
+
+    :param tuple worldVoxelPos: A tuple containing the world (x, y, z) coordinate of the voxel
+    :param np.array worldLight: An array of the packed light levels of all of the world voxels
+
+    :returns: The sky light level in the upper 4 bits and the block light level in the lower 4 bits
+    """
+
+    chunkIndex = get_chunk_index(worldVoxelPos)
+    if chunkIndex == -1:
+        return MAX_LIGHT << 4
+
+    x, y, z = worldVoxelPos
+    voxelIndex = x % CHUNK_SIZE + z % CHUNK_SIZE * CHUNK_SIZE + y % CHUNK_SIZE * CHUNK_AREA
+
+    return worldLight[chunkIndex, voxelIndex]
+
+
 @njit
-def add_data(vertexData: np.array, index: int, *vertices: int) -> int:
+def add_data(vertexData: np.array, index: int, lightData: int, *vertices: int) -> int:
     """
-    Adds any vertices provided to the vertexData array and updates the index pointer
+    Adds any vertices provided to the vertexData array, each followed by the light data of the face, and updates
+    the index pointer
 
     :param np.array vertexData: The array of vertices in the mesh
     :param int index: The index of the end of the data in the array
+    :param int lightData: The packed light levels shared by every vertex of the face
     :param *vertices: Any number of vertices to add to the vertexData array
 
     :returns: The updated index of the end of the data in the vertexData array
@@ -108,12 +168,13 @@ def add_data(vertexData: np.array, index: int, *vertices: int) -> int:
 
     for vertex in vertices:
         vertexData[index] = vertex
-        index += 1
+        vertexData[index + 1] = lightData
+        index += 2
 
     return index
 
 
-@njit
+@njit(types.UniTuple(int64, 4)(POSITION, POSITION, WORLD_ARRAY, types.unicode_type))
 def calc_ambient_occlusion(voxelPos: tuple[int, int, int], worldVoxelPos: tuple[int, int, int], worldVoxels: np.array, plane: str) -> tuple[int, int, int, int]:
     """
     Calculates the ambient occlusion value for a given voxel by checking the presence of blocks around the face. The block location
@@ -181,15 +242,18 @@ def calc_ambient_occlusion(voxelPos: tuple[int, int, int], worldVoxelPos: tuple[
     return aoValues
 
 
-@njit
-def build_chunk_mesh(chunkVoxels: np.array, formatSize: int, chunkPos: tuple[int, int, int], worldVoxels: np.array) -> np.array:
+# The GIL is released so chunks can be meshed on the mesh worker while the main thread runs
+@njit(uint32[::1](uint8[::1], int64, POSITION, WORLD_ARRAY, WORLD_ARRAY), nogil=True)
+def build_chunk_mesh(chunkVoxels: np.array, formatSize: int, chunkPos: tuple[int, int, int], worldVoxels: np.array, worldLight: np.array) -> np.array:
     """
-    Builds the mesh for a chunk from an array of voxels
+    Builds the mesh for a chunk from an array of voxels. Each vertex is made of the packed vertex data followed by
+    the packed light levels of the empty voxel in front of the face (along with the voxelID in vertex layout 2)
     
     :param np.array chunkVoxels: The array of voxels to build mesh from
     :param int formatSize: The number of items representing each vertex
     :param tuple chunkPos: The position of the chunk in the world
     :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+    :param np.array worldLight: A numpy array storing the packed light levels of all of the voxels in the world
     
     :returns: A numpy array of vertices
     """
@@ -216,6 +280,7 @@ def build_chunk_mesh(chunkVoxels: np.array, formatSize: int, chunkPos: tuple[int
                 # Checks whether to add top face to mesh
                 if is_void((x, y + 1, z), (worldX, worldY + 1, worldZ), worldVoxels):
                     aoValues = calc_ambient_occlusion((x, y + 1, z), (worldX, worldY + 1, worldZ), worldVoxels, 'Y')
+                    lightData = pack_light(voxelID, get_light_data((worldX, worldY + 1, worldZ), worldLight))
                     needFlip = aoValues[1] + aoValues[3] > aoValues[0] + aoValues[2]
                     
                     v0 = pack_data(x    , y + 1, z    , voxelID, 0, aoValues[0], needFlip)
@@ -225,13 +290,14 @@ def build_chunk_mesh(chunkVoxels: np.array, formatSize: int, chunkPos: tuple[int
 
                     # Adding vertices for 2 triangles clockwise (Flips the triangles if needed to avoid anisotropy)
                     if needFlip:
-                        index = add_data(vertexData, index, v1, v0, v3, v1, v3, v2)
+                        index = add_data(vertexData, index, lightData, v1, v0, v3, v1, v3, v2)
                     else:
-                        index = add_data(vertexData, index, v0, v3, v2, v0, v2, v1)
+                        index = add_data(vertexData, index, lightData, v0, v3, v2, v0, v2, v1)
 
                 # Checks whether to add bottom face to mesh
                 if is_void((x, y - 1, z), (worldX, worldY - 1, worldZ), worldVoxels):
                     aoValues = calc_ambient_occlusion((x, y - 1, z), (worldX, worldY - 1, worldZ), worldVoxels, 'Y')
+                    lightData = pack_light(voxelID, get_light_data((worldX, worldY - 1, worldZ), worldLight))
                     needFlip = aoValues[1] + aoValues[3] > aoValues[0] + aoValues[2]
 
                     v0 = pack_data(x    , y, z    , voxelID, 1, aoValues[0], needFlip)
@@ -241,13 +307,14 @@ def build_chunk_mesh(chunkVoxels: np.array, formatSize: int, chunkPos: tuple[int
 
                     # Adding vertices for 2 triangles clockwise (Flips the triangles if needed to avoid anisotropy)
                     if needFlip:
-                        index = add_data(vertexData, index, v1, v3, v0, v1, v2, v3)
+                        index = add_data(vertexData, index, lightData, v1, v3, v0, v1, v2, v3)
                     else:
-                        index = add_data(vertexData, index, v0, v2, v3, v0, v1, v2)
+                        index = add_data(vertexData, index, lightData, v0, v2, v3, v0, v1, v2)
 
                 # Checks whether to add right face to mesh
                 if is_void((x + 1, y, z), (worldX + 1, worldY, worldZ), worldVoxels):
                     aoValues = calc_ambient_occlusion((x + 1, y, z), (worldX + 1, worldY, worldZ), worldVoxels, 'X')
+                    lightData = pack_light(voxelID, get_light_data((worldX + 1, worldY, worldZ), worldLight))
                     needFlip = aoValues[1] + aoValues[3] > aoValues[0] + aoValues[2]
 
                     v0 = pack_data(x + 1, y    , z    , voxelID, 2, aoValues[0], needFlip)
@@ -257,13 +324,14 @@ def build_chunk_mesh(chunkVoxels: np.array, formatSize: int, chunkPos: tuple[int
 
                     # Adding vertices for 2 triangles clockwise (Flips the triangles if needed to avoid anisotropy)
                     if needFlip:
-                        index = add_data(vertexData, index, v3, v0, v1, v3, v1, v2)
+                        index = add_data(vertexData, index, lightData, v3, v0, v1, v3, v1, v2)
                     else:
-                        index = add_data(vertexData, index, v0, v1, v2, v0, v2, v3)
+                        index = add_data(vertexData, index, lightData, v0, v1, v2, v0, v2, v3)
 
                 # Checks whether to add left face to mesh
                 if is_void((x - 1, y, z), (worldX - 1, worldY, worldZ), worldVoxels):
                     aoValues = calc_ambient_occlusion((x - 1, y, z), (worldX - 1, worldY, worldZ), worldVoxels, 'X')
+                    lightData = pack_light(voxelID, get_light_data((worldX - 1, worldY, worldZ), worldLight))
                     needFlip = aoValues[1] + aoValues[3] > aoValues[0] + aoValues[2]
 
                     v0 = pack_data(x, y    , z    , voxelID, 3, aoValues[0], needFlip)
@@ -273,13 +341,14 @@ def build_chunk_mesh(chunkVoxels: np.array, formatSize: int, chunkPos: tuple[int
 
                     # Adding vertices for 2 triangles clockwise (Flips the triangles if needed to avoid anisotropy)
                     if needFlip:
-                        index = add_data(vertexData, index, v3, v1, v0, v3, v2, v1)
+                        index = add_data(vertexData, index, lightData, v3, v1, v0, v3, v2, v1)
                     else:
-                        index = add_data(vertexData, index, v0, v2, v1, v0, v3, v2)
+                        index = add_data(vertexData, index, lightData, v0, v2, v1, v0, v3, v2)
 
                 # Checks whether to add back face to mesh
                 if is_void((x, y, z - 1), (worldX, worldY, worldZ - 1), worldVoxels):
                     aoValues = calc_ambient_occlusion((x, y, z - 1), (worldX, worldY, worldZ - 1), worldVoxels, 'Z')
+                    lightData = pack_light(voxelID, get_light_data((worldX, worldY, worldZ - 1), worldLight))
                     needFlip = aoValues[1] + aoValues[3] > aoValues[0] + aoValues[2]
 
                     v0 = pack_data(x    , y    , z, voxelID, 4, aoValues[0], needFlip)
@@ -289,13 +358,14 @@ def build_chunk_mesh(chunkVoxels: np.array, formatSize: int, chunkPos: tuple[int
 
                     # Adding vertices for 2 triangles clockwise (Flips the triangles if needed to avoid anisotropy)
                     if needFlip:
-                        index = add_data(vertexData, index, v3, v0, v1, v3, v1, v2)
+                        index = add_data(vertexData, index, lightData, v3, v0, v1, v3, v1, v2)
                     else:
-                        index = add_data(vertexData, index, v0, v1, v2, v0, v2, v3)
+                        index = add_data(vertexData, index, lightData, v0, v1, v2, v0, v2, v3)
 
                 # Checks whether to add front face to mesh
                 if is_void((x, y, z + 1), (worldX, worldY, worldZ + 1), worldVoxels):
                     aoValues = calc_ambient_occlusion((x, y, z + 1), (worldX, worldY, worldZ + 1), worldVoxels, 'Z')
+                    lightData = pack_light(voxelID, get_light_data((worldX, worldY, worldZ + 1), worldLight))
                     needFlip = aoValues[1] + aoValues[3] > aoValues[0] + aoValues[2]
 
                     v0 = pack_data(x    , y    , z + 1, voxelID, 5, aoValues[0], needFlip)
@@ -305,9 +375,9 @@ def build_chunk_mesh(chunkVoxels: np.array, formatSize: int, chunkPos: tuple[int
 
                     # Adding vertices for 2 triangles clockwise (Flips the triangles if needed to avoid anisotropy)
                     if needFlip:
-                        index = add_data(vertexData, index, v3, v1, v0, v3, v2, v1)
+                        index = add_data(vertexData, index, lightData, v3, v1, v0, v3, v2, v1)
                     else:
-                        index = add_data(vertexData, index, v0, v2, v1, v0, v3, v2)
+                        index = add_data(vertexData, index, lightData, v0, v2, v1, v0, v3, v2)
 
     # Only return the none empty areas of the array that has vertex data in
-    return vertexData[:index + 1]
\ No newline at end of file
+    return vertexData[:index]
\ No newline at end of file
@@ -0,0 +1,237 @@
+import asyncio
+import queue
+import threading
+import time
+
+from settings import *
+from Network.chunkCodec import decode_chunk
+from Network.protocol import *
+import World
+
+
+class WorldClient:
+    def __init__(self, host: str = SERVER_HOST, port: int = SERVER_PORT, viewDistance: int = NETWORK_VIEW_DISTANCE,
+                 keepReceived: bool = True) -> None:
+        """
+        Class that connects to a world server and receives the chunks and voxel edits around the player. Messages are
+        read and chunks decompressed on the client's own event loop, and the results are queued in the order they
+        arrived so the main thread can apply them to the world between frames
+
+        :param str host: The address of the server
+        :param int port: The port the server listens on
+        :param int viewDistance: How many chunk columns around the player are meshed. The server sends one more
+        column than this, so every column in view has all of its neighbours when it is meshed
+        :param bool keepReceived: Whether received chunks and edits are queued for apply_received, which simulated
+        clients that only count them turn off
+        """
+
+        self.host = host
+        self.port = port
+        self.viewDistance = viewDistance
+        self.column: tuple[int, int] = None
+
+        # ("chunk", chunk index, voxels, light) and ("delta", positions, voxel IDs) in the order they arrived
+        self.received: queue.Queue[tuple] = queue.Queue() if keepReceived else None
+
+        self.loop: asyncio.AbstractEventLoop = None
+        self.reader: asyncio.StreamReader = None
+        self.writer: asyncio.StreamWriter = None
+        self.connected = threading.Event()
+        self.error: BaseException = None
+        self.thread: threading.Thread = None
+
+        # The time each edit sent and not yet seen in a delta was sent at, by position
+        self.editSequence = 0
+        self.pendingEdits: dict[tuple[int, int, int], float] = {}
+
+        # Counters used by the benchmarks, with the time from sending an edit to receiving it in milliseconds
+        self.receivedChunkCount = 0
+        self.receivedByteCount = 0
+        self.editLatencies: list[float] = []
+
+
+    def start(self, position: glm.vec3 = PLAYER_POS) -> None:
+        """
+        Connects to the server on a background thread and waits for the connection
+
+        :param glm.vec3 position: The position the player starts at, which the first chunks are sent around
+
+        :raises: Exception when the server cannot be reached
+        """
+
+        self.thread = threading.Thread(target=asyncio.run, args=(self.run(position),), name="WorldClient", daemon=True)
+        self.thread.start()
+        self.connected.wait()
+
+        if self.error:
+            raise Exception(f"Could not connect to the world server at {self.host}:{self.port}: {self.error}")
+
+
+    async def connect(self, position: glm.vec3 = PLAYER_POS) -> None:
+        """
+        Connects to the server on the running event loop and subscribes to the area around a position
+
+        :param glm.vec3 position: The position of the player
+        """
+
+        self.loop = asyncio.get_running_loop()
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.update_position(position)
+
+
+    async def run(self, position: glm.vec3 = PLAYER_POS) -> None:
+        """
+        Connects to the server and receives messages until the connection closes
+
+        :param glm.vec3 position: The position of the player
+        """
+
+        try:
+            await self.connect(position)
+
+        except OSError as e:
+            self.error = e
+            return
+
+        finally:
+            self.connected.set()
+
+        # The connection closing and messages that cannot be decoded both end the connection, and the error is
+        # kept so apply_received can report it
+        try:
+            await self.receive_messages()
+
+        except Exception as e:
+            self.error = e
+
+        finally:
+            self.writer.close()
+
+
+    async def receive_messages(self) -> None:
+        "Reads messages from the server until the connection closes"
+
+        while True:
+            messageType, payload = await read_message(self.reader)
+            self.receivedByteCount += MESSAGE_HEADER.size + len(payload)
+
+            if messageType == MESSAGE_CHUNK:
+                chunkIndex, version = CHUNK_FORMAT.unpack_from(payload)
+                voxels, light = decode_chunk(memoryview(payload)[CHUNK_FORMAT.size:])
+                self.receivedChunkCount += 1
+
+                if self.received is not None:
+                    self.received.put(("chunk", chunkIndex, voxels, light))
+
+            elif messageType == MESSAGE_DELTA:
+                tick, positions, voxelIDs = unpack_edits(payload)
+                self.record_latencies(positions)
+
+                if self.received is not None:
+                    self.received.put(("delta", positions, voxelIDs))
+
+            else:
+                raise Exception(f"Unknown message type from the world server: {messageType}")
+
+
+    def record_latencies(self, positions: np.array) -> None:
+        """
+        Records how long the edits this client made took to come back from the server
+
+        :param np.array positions: The positions of the voxels in a delta
+        """
+
+        if not self.pendingEdits:
+            return
+
+        receiveTime = time.perf_counter()
+
+        for position in map(tuple, positions.tolist()):
+            sendTime = self.pendingEdits.pop(position, None)
+            if sendTime is not None:
+                self.editLatencies.append((receiveTime - sendTime) * 1000)
+
+
+    def send(self, messageType: int, *parts) -> None:
+        """
+        Sends a message to the server. This can be called from any thread
+
+        :param int messageType: The type of the message
+        :param parts: The bytes-like objects that make up the message after its header
+        """
+
+        self.loop.call_soon_threadsafe(write_message, self.writer, messageType, *parts)
+
+
+    def update_position(self, position: glm.vec3) -> None:
+        """
+        Subscribes to the area around the player whenever they move into another chunk column
+
+        :param glm.vec3 position: The position of the player
+        """
+
+        column = (int(position.x // CHUNK_SIZE), int(position.z // CHUNK_SIZE))
+
+        if column != self.column:
+            self.column = column
+            self.send(MESSAGE_SUBSCRIBE, SUBSCRIBE_FORMAT.pack(*column, self.viewDistance + 1))
+
+
+    def get_view_area(self) -> tuple[slice, slice]:
+        """
+        Gets the chunk columns within the view distance of the column the client is subscribed around
+
+        :returns: The x and z ranges of the columns as slices
+        """
+
+        columnX, columnZ = self.column
+
+        return (slice(max(columnX - self.viewDistance, 0), max(columnX + self.viewDistance + 1, 0)),
+                slice(max(columnZ - self.viewDistance, 0), max(columnZ + self.viewDistance + 1, 0)))
+
+
+    def send_edits(self, positions: np.array, voxelIDs: np.array) -> None:
+        """
+        Asks the server to set voxels. The world is only changed once the server sends the edits back
+
+        :param np.array positions: An (N, 3) integer array of world voxel positions
+        :param np.array voxelIDs: An (N,) array of voxel IDs
+        """
+
+        sendTime = time.perf_counter()
+        for position in map(tuple, np.asarray(positions).tolist()):
+            self.pendingEdits[position] = sendTime
+
+        self.editSequence += 1
+        self.send(MESSAGE_EDIT, *pack_edits(self.editSequence, positions, voxelIDs))
+
+
+    def apply_received(self, world: 'World.World', wait: bool = False) -> None:
+        """
+        Applies the chunks and edits received since the last call to the world, in the order they were sent.
+        Chunks go to the chunk loader to be meshed, and edited chunks are rebuilt with the world's dirty chunks
+
+        :param World world: The world to apply them to
+        :param bool wait: Whether to wait for the server to send something if nothing has been received yet
+
+        :raises: Exception when waiting after the connection to the server has closed
+        """
+
+        messages = []
+
+        while wait and not messages:
+            try:
+                messages.append(self.received.get(timeout=0.1))
+
+            except queue.Empty:
+                if not self.thread.is_alive():
+                    raise Exception(f"Lost the connection to the world server: {self.error}")
+
+        while not self.received.empty():
+            messages.append(self.received.get_nowait())
+
+        for message in messages:
+            if message[0] == "chunk":
+                world.chunkLoader.receive_chunk(*message[1:])
+            else:
+                world.dirtyChunks |= world.set_voxels(*message[1:], simulate=False)
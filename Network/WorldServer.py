@@ -0,0 +1,326 @@
+import asyncio
+import random
+import time
+
+from settings import *
+import Engine  # Imported before any world objects so the Engine -> Scene -> World import cycle resolves
+from Network.chunkCodec import encode_chunk
+from Network.protocol import *
+from Profiling.MemoryTracker import MemoryTracker
+from Profiling.StartupProfiler import StartupProfiler
+from Profiling.Tracer import Tracer
+from World import World
+
+
+class ClientSession:
+    def __init__(self, server: 'WorldServer', reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Class for a client connected to the world server, which keeps track of the area the client is subscribed to
+        and the version of every chunk it has been sent
+
+        :param WorldServer server: The server the client is connected to
+        :param asyncio.StreamReader reader: The stream messages from the client arrive on
+        :param asyncio.StreamWriter writer: The stream messages to the client are sent on
+        """
+
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+
+        # The column the client is centred on in voxels, which is None until the client subscribes
+        self.position: glm.vec3 = None
+        self.viewDistance = 0
+
+        # The version of each chunk the client holds, where 0 is a chunk it has not been sent
+        self.sentVersions = np.zeros(WORLD_VOLUME, dtype='int64')
+
+        # Set whenever there may be chunks to send, which wakes the chunk stream
+        self.hasChunksToSend = asyncio.Event()
+
+
+    async def run(self) -> None:
+        "Handles messages from the client and streams chunks to it until it disconnects"
+
+        streamTask = asyncio.create_task(self.stream_chunks())
+
+        try:
+            while True:
+                messageType, payload = await read_message(self.reader, MAX_MESSAGE_SIZE)
+
+                if messageType == MESSAGE_SUBSCRIBE:
+                    columnX, columnZ, self.viewDistance = SUBSCRIBE_FORMAT.unpack(payload)
+                    self.position = glm.vec3(columnX + 0.5, 0, columnZ + 0.5) * CHUNK_SIZE
+                    self.hasChunksToSend.set()
+
+                elif messageType == MESSAGE_EDIT:
+                    sequence, positions, voxelIDs = unpack_edits(payload)
+                    positions, voxelIDs = self.get_allowed_edits(positions, voxelIDs)
+
+                    if len(voxelIDs):
+                        self.server.editRequests.append((positions, voxelIDs))
+
+                else:
+                    raise Exception(f"Unknown message type from a world client: {messageType}")
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+        # A client that sends a message the server cannot decode is disconnected rather than taking the server down
+        except Exception as e:
+            print(f"Disconnecting a world client that sent an invalid message: {e}")
+
+        finally:
+            streamTask.cancel()
+
+
+    def get_allowed_edits(self, positions: np.array, voxelIDs: np.array) -> tuple[np.array, np.array]:
+        """
+        Drops the edits a client is not allowed to make, which are edits outside of the world and edits to voxel IDs
+        that players cannot place, such as the ID of unloaded voxels
+
+        :param np.array positions: An (N, 3) array of the positions of the voxels to set
+        :param np.array voxelIDs: An (N,) array of the voxel IDs to set them to
+
+        :returns: The positions and voxel IDs of the allowed edits
+        """
+
+        isAllowed = np.all((positions >= 0) & (positions < (WORLD_SIZE_X, WORLD_SIZE_Y, WORLD_SIZE_Z)), axis=1)
+        isAllowed &= VOXEL_PLACEABLE[voxelIDs]
+
+        return positions[isAllowed], voxelIDs[isAllowed]
+
+
+    def get_in_view(self) -> np.array:
+        """
+        Gets which chunks are within the client's view distance
+
+        :returns: A boolean array with an element for each chunk
+        """
+
+        if self.position is None:
+            return np.zeros(WORLD_VOLUME, dtype='bool')
+
+        return self.server.world.chunkRegistry.get_in_render_distance(self.position, self.viewDistance)
+
+
+    async def stream_chunks(self) -> None:
+        """
+        Sends the chunks in view that the client does not have at their latest version, nearest first. The stream
+        waits for the client to read what it has been sent before sending more, so a slow client only holds back
+        its own chunks
+        """
+
+        while True:
+            await self.hasChunksToSend.wait()
+            self.hasChunksToSend.clear()
+
+            versions = self.server.world.voxelSnapshots.published[0]
+            chunkIndices = np.flatnonzero(self.get_in_view() & (self.sentVersions < versions))
+            chunkIndices = chunkIndices[np.argsort(self.server.world.chunkRegistry.get_sort_keys(self.position)[chunkIndices])]
+
+            for chunkIndex in chunkIndices:
+                version, encodedChunk = self.server.get_encoded_chunk(chunkIndex)
+
+                # Chunks edited while waiting are up to date already, as the client is sent every edit in view
+                if self.sentVersions[chunkIndex] >= version:
+                    continue
+
+                write_message(self.writer, MESSAGE_CHUNK, CHUNK_FORMAT.pack(chunkIndex, version), encodedChunk)
+                self.sentVersions[chunkIndex] = version
+                self.server.sentChunkCount += 1
+
+                await self.writer.drain()
+
+
+    def send_edits(self, positions: np.array, voxelIDs: np.array, parts: tuple) -> None:
+        """
+        Sends the client the edits made this tick that are within its view distance
+
+        :param np.array positions: An (N, 3) array of the positions of the voxels that changed
+        :param np.array voxelIDs: An (N,) array of the new voxel IDs
+        :param tuple parts: The delta message holding every edit, which is sent as it is if they are all in view
+        """
+
+        chunkPositions = positions // CHUNK_SIZE
+        chunkIndices = chunkPositions[:, 0] + WORLD_WIDTH * chunkPositions[:, 2] + WORLD_AREA * chunkPositions[:, 1]
+        isEditInView = self.get_in_view()[chunkIndices]
+
+        if not np.any(isEditInView):
+            return
+
+        if np.all(isEditInView):
+            write_message(self.writer, MESSAGE_DELTA, *parts)
+        else:
+            write_message(self.writer, MESSAGE_DELTA, *pack_edits(self.server.tick, positions[isEditInView], voxelIDs[isEditInView]))
+
+        # The client applies the edits to the chunks it holds, so those do not need sending again
+        editedChunks = np.unique(chunkIndices[isEditInView])
+        editedChunks = editedChunks[self.sentVersions[editedChunks] > 0]
+        self.sentVersions[editedChunks] = self.server.world.voxelSnapshots.published[0][editedChunks]
+
+
+class WorldServer:
+    def __init__(self, host: str = SERVER_HOST, port: int = SERVER_PORT, seed: int = 0,
+                 startupProfiler: StartupProfiler = None) -> None:
+        """
+        Class that hosts the world without a window or OpenGL context, running the simulations and serving chunks
+        and voxel edits to clients over TCP. The world is generated in full on startup, and everything runs on one
+        event loop, so clients' edits are applied between ticks and every message is sent from a consistent world
+
+        :param str host: The address to listen on
+        :param int port: The port to listen on, or 0 to pick any free port
+        :param int seed: The seed for world generation and random ticks
+        :param StartupProfiler startupProfiler: The profiler timing startup, which is created here if not provided
+        """
+
+        self.host = host
+        self.port = port
+        self.startupProfiler = startupProfiler or StartupProfiler()
+        self.tracer = Tracer()
+        self.memoryTracker = MemoryTracker(self)
+
+        # The server's world is the one every client's world is a copy of
+        self.worldClient = None
+
+        self.seed = seed
+        if seed is not None:
+            random.seed(seed)
+
+        self.world = World(self, publishSnapshots=True)
+        self.world.chunkLoader.generate_all()
+        self.world.editLog = []
+
+        self.sessions: set[ClientSession] = set()
+        self.editRequests: list[tuple[np.array, np.array]] = []
+        self.tick = 0
+
+        # The simulations advance by deltaTime milliseconds each tick
+        self.deltaTime = SERVER_TICK_TIME
+
+        # The (version, encoded chunk) of each chunk last sent, shared by every client
+        self.encodedChunks: dict[int, tuple[int, bytes]] = {}
+
+        # Counters used by the benchmarks, with the total time spent running ticks in milliseconds
+        self.sentChunkCount = 0
+        self.encodedChunkCount = 0
+        self.totalTickTime = 0
+
+        self.server: asyncio.Server = None
+        self.tickTask: asyncio.Task = None
+
+
+    async def start(self) -> None:
+        "Starts listening for clients and running ticks on the running event loop"
+
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.tickTask = asyncio.create_task(self.run_ticks())
+
+
+    async def stop(self) -> None:
+        "Stops running ticks and disconnects every client"
+
+        self.tickTask.cancel()
+        self.server.close()
+
+        for session in list(self.sessions):
+            session.writer.close()
+
+        await self.server.wait_closed()
+
+
+    async def serve(self) -> None:
+        "Runs the server until the program is stopped"
+
+        await self.start()
+        print(f"World server listening on {self.host}:{self.port}")
+
+        await self.server.serve_forever()
+
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serves a client from when it connects until it disconnects
+
+        :param asyncio.StreamReader reader: The stream messages from the client arrive on
+        :param asyncio.StreamWriter writer: The stream messages to the client are sent on
+        """
+
+        session = ClientSession(self, reader, writer)
+        self.sessions.add(session)
+
+        try:
+            await session.run()
+
+        finally:
+            self.sessions.discard(session)
+            writer.close()
+
+
+    async def run_ticks(self) -> None:
+        "Runs a tick every SERVER_TICK_TIME milliseconds"
+
+        nextTickTime = time.perf_counter()
+
+        while True:
+            startTime = time.perf_counter()
+            self.update()
+            self.totalTickTime += (time.perf_counter() - startTime) * 1000
+
+            # Ticks are scheduled against a fixed clock, so a slow tick is made up for by a shorter wait
+            nextTickTime = max(nextTickTime + SERVER_TICK_TIME * 0.001, time.perf_counter())
+            await asyncio.sleep(nextTickTime - time.perf_counter())
+
+
+    def update(self) -> None:
+        "Applies the edits clients asked for, runs the simulations and sends every voxel that changed to the clients"
+
+        self.tick += 1
+
+        with self.tracer.span("Server tick"):
+            for positions, voxelIDs in self.editRequests:
+                self.world.set_voxels(positions, voxelIDs)
+            self.editRequests.clear()
+
+            self.world.fluidSimulator.update()
+            self.world.tickScheduler.update()
+            self.world.dirtyChunks.clear()
+
+            self.broadcast_edits()
+
+
+    def broadcast_edits(self) -> None:
+        "Sends the voxels changed this tick to every client with them in view, as one delta message per client"
+
+        if not self.world.editLog:
+            return
+
+        positions = np.concatenate([positions for positions, _ in self.world.editLog])
+        voxelIDs = np.concatenate([voxelIDs for _, voxelIDs in self.world.editLog])
+        self.world.editLog.clear()
+
+        parts = pack_edits(self.tick, positions, voxelIDs)
+
+        for session in self.sessions:
+            session.send_edits(positions, voxelIDs, parts)
+
+
+    def get_encoded_chunk(self, chunkIndex: int) -> tuple[int, bytes]:
+        """
+        Gets a chunk encoded at its latest version, encoding it from the world's read only snapshot of it if it has
+        changed since it was last encoded
+
+        :param int chunkIndex: The index of the chunk
+
+        :returns: The version of the chunk and the encoded chunk
+        """
+
+        versions, voxels, light = self.world.voxelSnapshots.published
+        version = int(versions[chunkIndex])
+
+        encodedChunk = self.encodedChunks.get(chunkIndex)
+        if encodedChunk is None or encodedChunk[0] != version:
+            encodedChunk = self.encodedChunks[chunkIndex] = (version, encode_chunk(voxels[chunkIndex], light[chunkIndex]))
+            self.encodedChunkCount += 1
+
+        return encodedChunk
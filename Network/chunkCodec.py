@@ -0,0 +1,110 @@
+import struct
+import zlib
+
+from settings import *
+
+
+# The codec byte at the start of every encoded chunk, so chunks can be decoded whichever codec the server used
+CHUNK_CODECS = {"zlib": 0, "palette": 1}
+
+# The codec and the size of the encoded voxels, followed by the encoded voxels and then the compressed light
+CHUNK_HEADER = struct.Struct("<BI")
+
+# The number of voxel IDs in a palette and the bits used for each voxel
+PALETTE_HEADER = struct.Struct("<HB")
+
+
+def encode_palette(voxels: np.array) -> bytes:
+    """
+    Encodes voxels as a palette of the voxel IDs in them, followed by the index of each voxel in the palette packed
+    into as few bits as the palette needs. Chunks of a single voxel ID are just the palette
+
+    :param np.array voxels: The voxels of a chunk
+
+    :returns: The encoded voxels
+    """
+
+    palette = np.flatnonzero(np.bincount(voxels, minlength=256)).astype('uint8')
+    bitCount = (len(palette) - 1).bit_length()
+
+    paletteIndices = np.zeros(256, dtype='uint8')
+    paletteIndices[palette] = np.arange(len(palette))
+
+    # Each index is split into its bits and only the lowest bitCount bits are kept
+    bits = np.unpackbits(paletteIndices[voxels].reshape(-1, 1), axis=1)[:, 8 - bitCount:]
+
+    return PALETTE_HEADER.pack(len(palette), bitCount) + palette.tobytes() + np.packbits(bits).tobytes()
+
+
+def decode_palette(data: memoryview) -> np.array:
+    """
+    Decodes voxels encoded by encode_palette
+
+    :param memoryview data: The encoded voxels
+
+    :returns: The voxels of the chunk
+    """
+
+    paletteSize, bitCount = PALETTE_HEADER.unpack_from(data)
+    palette = np.frombuffer(data, dtype='uint8', count=paletteSize, offset=PALETTE_HEADER.size)
+
+    if not bitCount:
+        return np.full(CHUNK_VOLUME, palette[0], dtype='uint8')
+
+    bits = np.unpackbits(np.frombuffer(data, dtype='uint8', offset=PALETTE_HEADER.size + paletteSize))
+    bits = bits[:CHUNK_VOLUME * bitCount].reshape(-1, bitCount)
+
+    # The bits of each index are put back into the lowest bits of a byte
+    indices = np.packbits(np.pad(bits, ((0, 0), (8 - bitCount, 0))), axis=1).ravel()
+
+    return palette[indices]
+
+
+def encode_chunk(voxels: np.array, light: np.array, compression: str = CHUNK_COMPRESSION) -> bytes:
+    """
+    Encodes the voxels and light of a chunk to send over the network. The arrays are read through memoryviews, so
+    they are not copied before being compressed
+
+    :param np.array voxels: The voxels of the chunk
+    :param np.array light: The packed light levels of the chunk
+    :param str compression: How the voxels are compressed, either "palette" or "zlib". The light is always
+    compressed with zlib
+
+    :returns: The encoded chunk
+    """
+
+    if compression not in CHUNK_CODECS:
+        raise Exception(f"Unknown chunk compression: {compression}")
+
+    if compression == "palette":
+        encodedVoxels = encode_palette(voxels)
+    else:
+        encodedVoxels = zlib.compress(memoryview(voxels), CHUNK_ZLIB_LEVEL)
+
+    encodedLight = zlib.compress(memoryview(light), CHUNK_ZLIB_LEVEL)
+
+    return CHUNK_HEADER.pack(CHUNK_CODECS[compression], len(encodedVoxels)) + encodedVoxels + encodedLight
+
+
+def decode_chunk(data: memoryview) -> tuple[np.array, np.array]:
+    """
+    Decodes a chunk encoded by encode_chunk
+
+    :param memoryview data: The encoded chunk
+
+    :returns: The voxels and packed light levels of the chunk
+    """
+
+    data = memoryview(data)
+    codec, voxelsSize = CHUNK_HEADER.unpack_from(data)
+    encodedVoxels = data[CHUNK_HEADER.size:CHUNK_HEADER.size + voxelsSize]
+    encodedLight = data[CHUNK_HEADER.size + voxelsSize:]
+
+    if codec == CHUNK_CODECS["palette"]:
+        voxels = decode_palette(encodedVoxels)
+    else:
+        voxels = np.frombuffer(zlib.decompress(encodedVoxels), dtype='uint8')
+
+    light = np.frombuffer(zlib.decompress(encodedLight), dtype='uint8')
+
+    return voxels, light
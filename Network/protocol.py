@@ -0,0 +1,94 @@
+import asyncio
+import struct
+
+from settings import *
+
+
+# Message types. Clients subscribe to the area around them and send edits, and the server sends chunks and the
+# edits made each tick
+MESSAGE_SUBSCRIBE = 1
+MESSAGE_CHUNK = 2
+MESSAGE_DELTA = 3
+MESSAGE_EDIT = 4
+
+# Every message starts with its type and the size of the rest of the message
+MESSAGE_HEADER = struct.Struct("<BI")
+
+# The chunk column a client is centred on and how many columns around it the client wants
+SUBSCRIBE_FORMAT = struct.Struct("<iii")
+
+# The index and version of a chunk, followed by the chunk encoded by chunkCodec
+CHUNK_FORMAT = struct.Struct("<II")
+
+# The tick or sequence number and the number of voxels, followed by their positions as int32 and then their IDs
+EDITS_FORMAT = struct.Struct("<II")
+
+
+def write_message(writer: asyncio.StreamWriter, messageType: int, *parts) -> None:
+    """
+    Queues a message to be sent. The parts are handed to the transport as they are, so large payloads such as encoded
+    chunks are sent from memoryviews of the original buffers without being joined into one
+
+    :param asyncio.StreamWriter writer: The stream to send the message on
+    :param int messageType: The type of the message
+    :param parts: The bytes-like objects that make up the message after its header
+    """
+
+    # Empty parts are left out, as memoryviews of empty arrays can't be cast to bytes
+    parts = [memoryview(part).cast('B') for part in parts if memoryview(part).nbytes]
+
+    writer.writelines([MESSAGE_HEADER.pack(messageType, sum(part.nbytes for part in parts)), *parts])
+
+
+async def read_message(reader: asyncio.StreamReader, maxSize: int = None) -> tuple[int, bytes]:
+    """
+    Waits for the next message
+
+    :param asyncio.StreamReader reader: The stream to read from
+    :param int maxSize: The largest message size accepted in bytes, or None for no limit
+
+    :returns: The type of the message and the rest of the message
+
+    :raises: asyncio.IncompleteReadError when the other end closes the connection, and Exception when the message
+    is larger than maxSize, which is raised before any of it is read
+    """
+
+    messageType, size = MESSAGE_HEADER.unpack(await reader.readexactly(MESSAGE_HEADER.size))
+
+    if maxSize is not None and size > maxSize:
+        raise Exception(f"Message of {size} bytes is larger than the limit of {maxSize} bytes")
+
+    return messageType, await reader.readexactly(size)
+
+
+def pack_edits(number: int, positions: np.array, voxelIDs: np.array) -> tuple:
+    """
+    Packs voxel edits into the parts of a delta or edit message, which can be sent to any number of clients
+
+    :param int number: The tick of a delta, or the sequence number of an edit
+    :param np.array positions: An (N, 3) integer array of world voxel positions
+    :param np.array voxelIDs: An (N,) array of the voxel IDs at the positions
+
+    :returns: The parts of the message to pass to write_message
+    """
+
+    positions = np.ascontiguousarray(positions, dtype='int32')
+    voxelIDs = np.ascontiguousarray(voxelIDs, dtype='uint8')
+
+    return EDITS_FORMAT.pack(number, len(voxelIDs)), positions, voxelIDs
+
+
+def unpack_edits(payload: bytes) -> tuple[int, np.array, np.array]:
+    """
+    Unpacks the edits packed by pack_edits, as read only views of the message
+
+    :param bytes payload: The message after its header
+
+    :returns: The tick or sequence number, an (N, 3) array of positions and an (N,) array of voxel IDs
+    """
+
+    number, count = EDITS_FORMAT.unpack_from(payload)
+    positions = np.frombuffer(payload, dtype='int32', count=count * 3, offset=EDITS_FORMAT.size).reshape(-1, 3)
+    voxelIDs = np.frombuffer(payload, dtype='uint8', count=count, offset=EDITS_FORMAT.size + positions.nbytes)
+
+    return number, positions, voxelIDs
@@ -0,0 +1,67 @@
+from settings import *
+from Physics.collision import move_bodies, set_solid, update_solid_bits
+
+
+class SolidityGrid:
+    def __init__(self, worldVoxels: np.array) -> None:
+        """
+        Class that stores a bit-packed copy of which voxels in the world are solid, using the same chunk layout
+        as World.voxels with one bit per voxel
+
+        :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+        """
+
+        self.worldVoxels = worldVoxels
+        self.bits = np.packbits(VOXEL_SOLID[worldVoxels], axis=1, bitorder='little')
+
+
+    def update_chunk(self, chunkIndex: int) -> None:
+        """
+        Rebuilds the solidity bits of a whole chunk after it has been generated
+
+        :param int chunkIndex: The index of the chunk
+        """
+
+        self.bits[chunkIndex] = np.packbits(VOXEL_SOLID[self.worldVoxels[chunkIndex]], bitorder='little')
+
+
+    def update_voxel(self, chunkIndex: int, voxelIndex: int) -> None:
+        """
+        Refreshes the solidity bit of a single voxel after it has been edited
+
+        :param int chunkIndex: The index of the chunk the voxel is in
+        :param int voxelIndex: The index of the voxel within its chunk
+        """
+
+        set_solid(chunkIndex, voxelIndex, VOXEL_SOLID[self.worldVoxels[chunkIndex, voxelIndex]], self.bits)
+
+
+    def update_voxels(self, positions: np.array) -> None:
+        """
+        Refreshes the solidity bits of many voxels after a bulk edit
+
+        :param np.array positions: An (N, 3) integer array of world voxel positions that have changed
+        """
+
+        update_solid_bits(positions, self.worldVoxels, self.bits)
+
+
+    def move_bodies(self, positions: np.array, velocities: np.array, halfExtents: np.array, onGround: np.array,
+                    deltaTime: float, gravity: float = GRAVITY, stepHeight: float = STEP_HEIGHT) -> None:
+        """
+        Moves a batch of bodies through the world, stopping them at solid voxels. All arrays are updated in place
+
+        :param np.array positions: An (N, 3) float64 array of body centres
+        :param np.array velocities: An (N, 3) float64 array of body velocities in voxels per millisecond
+        :param np.array halfExtents: An (N, 3) float64 array of the half sizes of each body
+        :param np.array onGround: An (N,) boolean array of whether each body is standing on a voxel
+        :param float deltaTime: The time step in milliseconds
+        :param float gravity: The downwards acceleration in voxels per millisecond squared
+        :param float stepHeight: The tallest ledge a body can walk up without jumping
+        """
+
+        # Long frames are split up so a body never skips through a voxel or scans a long sweep in one step
+        steps = max(1, int(np.ceil(deltaTime / MAX_PHYSICS_STEP)))
+        for _ in range(steps):
+            move_bodies(positions, velocities, halfExtents, onGround,
+                        deltaTime / steps, gravity, MAX_FALL_SPEED, stepHeight, self.bits)
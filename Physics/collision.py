@@ -0,0 +1,228 @@
+from settings import *
+from numba import prange
+from Meshes.chunkMeshBuilder import get_chunk_index
+from WorldObjects.voxelAccess import get_voxel_index
+
+
+# Gap left between a body and the voxel it collides with so it never ends up inside the voxel
+COLLISION_SKIN = 0.0001
+
+
+@njit
+def is_solid(worldX: int, worldY: int, worldZ: int, solidBits: np.array) -> bool:
+    """
+    Checks the solidity bitmap to see if the voxel at a world position is solid
+
+    :param int worldX: The world x coordinate of the voxel
+    :param int worldY: The world y coordinate of the voxel
+    :param int worldZ: The world z coordinate of the voxel
+    :param np.array solidBits: The bit-packed solidity grid with one bit per voxel
+
+    :returns: True if the voxel is solid, otherwise False (positions outside of the world are never solid)
+    """
+
+    chunkIndex = get_chunk_index((worldX, worldY, worldZ))
+    if chunkIndex == -1:
+        return False
+
+    voxelIndex = get_voxel_index(worldX, worldY, worldZ)
+
+    return (solidBits[chunkIndex, voxelIndex >> 3] >> (voxelIndex & 7)) & 1 == 1
+
+
+@njit
+def set_solid(chunkIndex: int, voxelIndex: int, isSolid: bool, solidBits: np.array) -> None:
+    """
+    Sets the bit for a single voxel in the solidity bitmap
+
+    :param int chunkIndex: The index of the chunk the voxel is in
+    :param int voxelIndex: The index of the voxel within its chunk
+    :param bool isSolid: Whether the voxel is solid
+    :param np.array solidBits: The bit-packed solidity grid with one bit per voxel
+    """
+
+    mask = np.uint8(1 << (voxelIndex & 7))
+
+    if isSolid:
+        solidBits[chunkIndex, voxelIndex >> 3] |= mask
+    else:
+        solidBits[chunkIndex, voxelIndex >> 3] &= ~mask
+
+
+@njit
+def update_solid_bits(positions: np.array, worldVoxels: np.array, solidBits: np.array) -> None:
+    """
+    Refreshes the solidity bits for a batch of voxel positions from the world voxels
+
+    :param np.array positions: An (N, 3) array of world voxel positions that have changed
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+    :param np.array solidBits: The bit-packed solidity grid with one bit per voxel
+    """
+
+    for i in range(positions.shape[0]):
+        worldX, worldY, worldZ = positions[i, 0], positions[i, 1], positions[i, 2]
+
+        chunkIndex = get_chunk_index((worldX, worldY, worldZ))
+        if chunkIndex == -1:
+            continue
+
+        voxelIndex = get_voxel_index(worldX, worldY, worldZ)
+        set_solid(chunkIndex, voxelIndex, VOXEL_SOLID[worldVoxels[chunkIndex, voxelIndex]], solidBits)
+
+
+@njit
+def is_layer_blocked(axis: int, layer: int, boxMin: np.array, boxMax: np.array, solidBits: np.array) -> bool:
+    """
+    Checks whether any solid voxel in one layer of voxels overlaps the cross section of a box
+
+    :param int axis: The axis the layer is perpendicular to (0 = x, 1 = y, 2 = z)
+    :param int layer: The voxel coordinate of the layer along the axis
+    :param np.array boxMin: The minimum corner of the box
+    :param np.array boxMax: The maximum corner of the box
+    :param np.array solidBits: The bit-packed solidity grid with one bit per voxel
+
+    :returns: True if the layer blocks the box, otherwise False
+    """
+
+    axisU = (axis + 1) % 3
+    axisV = (axis + 2) % 3
+
+    startU = int(np.floor(boxMin[axisU] + COLLISION_SKIN))
+    endU = int(np.floor(boxMax[axisU] - COLLISION_SKIN))
+    startV = int(np.floor(boxMin[axisV] + COLLISION_SKIN))
+    endV = int(np.floor(boxMax[axisV] - COLLISION_SKIN))
+
+    voxel = np.empty(3, dtype=np.int64)
+    voxel[axis] = layer
+
+    for u in range(startU, endU + 1):
+        voxel[axisU] = u
+        for v in range(startV, endV + 1):
+            voxel[axisV] = v
+            if is_solid(voxel[0], voxel[1], voxel[2], solidBits):
+                return True
+
+    return False
+
+
+@njit
+def clip_axis(axis: int, displacement: float, boxMin: np.array, boxMax: np.array, solidBits: np.array) -> float:
+    """
+    Sweeps a box along one axis and shortens the displacement so the box stops at the first solid voxel
+
+    :param int axis: The axis the box is moving along (0 = x, 1 = y, 2 = z)
+    :param float displacement: The distance the box is trying to move along the axis
+    :param np.array boxMin: The minimum corner of the box
+    :param np.array boxMax: The maximum corner of the box
+    :param np.array solidBits: The bit-packed solidity grid with one bit per voxel
+
+    :returns: The distance the box can move before colliding
+    """
+
+    if displacement > 0:
+        layer = int(np.ceil(boxMax[axis] - COLLISION_SKIN))
+        while layer < boxMax[axis] + displacement:
+            if is_layer_blocked(axis, layer, boxMin, boxMax, solidBits):
+                return max(layer - boxMax[axis] - COLLISION_SKIN, 0.0)
+            layer += 1
+
+    elif displacement < 0:
+        layer = int(np.floor(boxMin[axis] + COLLISION_SKIN)) - 1
+        while layer + 1 > boxMin[axis] + displacement:
+            if is_layer_blocked(axis, layer, boxMin, boxMax, solidBits):
+                return min(layer + 1 - boxMin[axis] + COLLISION_SKIN, 0.0)
+            layer -= 1
+
+    return displacement
+
+
+@njit
+def move_box(axis: int, displacement: float, boxMin: np.array, boxMax: np.array, solidBits: np.array) -> float:
+    """
+    Moves a box along one axis as far as it can go without colliding
+
+    :param int axis: The axis the box is moving along (0 = x, 1 = y, 2 = z)
+    :param float displacement: The distance the box is trying to move along the axis
+    :param np.array boxMin: The minimum corner of the box, updated in place
+    :param np.array boxMax: The maximum corner of the box, updated in place
+    :param np.array solidBits: The bit-packed solidity grid with one bit per voxel
+
+    :returns: The distance the box actually moved
+    """
+
+    moved = clip_axis(axis, displacement, boxMin, boxMax, solidBits)
+    boxMin[axis] += moved
+    boxMax[axis] += moved
+
+    return moved
+
+
+@njit(parallel=True)
+def move_bodies(positions: np.array, velocities: np.array, halfExtents: np.array, onGround: np.array,
+                deltaTime: float, gravity: float, maxFallSpeed: float, stepHeight: float, solidBits: np.array) -> None:
+    """
+    Moves a batch of axis aligned bodies through the world, resolving collisions against the solidity grid with a
+    swept AABB test one axis at a time. Bodies on the ground that walk into a ledge no taller than the step height
+    are lifted on top of it
+
+    :param np.array positions: An (N, 3) array of body centres, updated in place
+    :param np.array velocities: An (N, 3) array of body velocities in voxels per millisecond, updated in place
+    :param np.array halfExtents: An (N, 3) array of the half sizes of each body
+    :param np.array onGround: An (N,) boolean array of whether each body is standing on a voxel, updated in place
+    :param float deltaTime: The time step in milliseconds
+    :param float gravity: The downwards acceleration in voxels per millisecond squared
+    :param float maxFallSpeed: The maximum downwards speed in voxels per millisecond
+    :param float stepHeight: The tallest ledge a body can walk up without jumping
+    :param np.array solidBits: The bit-packed solidity grid with one bit per voxel
+    """
+
+    for i in prange(positions.shape[0]):
+        boxMin = np.empty(3, dtype=np.float64)
+        boxMax = np.empty(3, dtype=np.float64)
+        for axis in range(3):
+            boxMin[axis] = positions[i, axis] - halfExtents[i, axis]
+            boxMax[axis] = positions[i, axis] + halfExtents[i, axis]
+
+        velocities[i, 1] = max(velocities[i, 1] - gravity * deltaTime, -maxFallSpeed)
+
+        moveX = velocities[i, 0] * deltaTime
+        moveY = velocities[i, 1] * deltaTime
+        moveZ = velocities[i, 2] * deltaTime
+
+        # Vertical movement is resolved first so bodies land before sliding along the ground
+        movedY = move_box(1, moveY, boxMin, boxMax, solidBits)
+        landed = moveY < 0 and movedY > moveY
+        if movedY != moveY:
+            velocities[i, 1] = 0.0
+
+        startMin = boxMin.copy()
+        startMax = boxMax.copy()
+
+        movedX = move_box(0, moveX, boxMin, boxMax, solidBits)
+        movedZ = move_box(2, moveZ, boxMin, boxMax, solidBits)
+
+        # Tries walking the same movement from a raised position and keeps it if the body gets further
+        if stepHeight > 0 and (landed or onGround[i]) and (movedX != moveX or movedZ != moveZ):
+            stepMin = startMin.copy()
+            stepMax = startMax.copy()
+
+            raised = move_box(1, stepHeight, stepMin, stepMax, solidBits)
+            steppedX = move_box(0, moveX, stepMin, stepMax, solidBits)
+            steppedZ = move_box(2, moveZ, stepMin, stepMax, solidBits)
+            move_box(1, -raised, stepMin, stepMax, solidBits)
+
+            if steppedX * steppedX + steppedZ * steppedZ > movedX * movedX + movedZ * movedZ:
+                boxMin[:] = stepMin
+                boxMax[:] = stepMax
+                movedX, movedZ = steppedX, steppedZ
+
+        if movedX != moveX:
+            velocities[i, 0] = 0.0
+        if movedZ != moveZ:
+            velocities[i, 2] = 0.0
+
+        # Probes just below the body so resting bodies stay on the ground between ticks
+        onGround[i] = landed or clip_axis(1, -COLLISION_SKIN * 2, boxMin, boxMax, solidBits) == 0
+
+        for axis in range(3):
+            positions[i, axis] = boxMin[axis] + halfExtents[i, axis]
@@ -12,21 +12,45 @@ class Player(Camera):
         super().__init__(position, yaw, pitch)
         
         self.app = app
+        self.previousPos = glm.vec3(self.pos)
+
+        # Collision body data, stored as arrays of one body for the physics kernels
+        self.body = np.zeros((1, 3), dtype='float64')
+        self.velocity = np.zeros((1, 3), dtype='float64')
+        self.halfExtents = np.array([PLAYER_SIZE / 2], dtype='float64')
+        self.onGround = np.zeros(1, dtype='bool')
 
 
     def update(self):
-        "Updates camera information based on mouse movements and keyboard inputs"
+        "Moves the player by one simulation tick based on keyboard inputs"
 
+        self.previousPos = glm.vec3(self.pos)
         self.handle_keyboard()
+
+
+    def update_frame(self, interpolation: float):
+        """
+        Updates the camera every frame from mouse movements, placing it between its positions at the last two ticks
+
+        :param float interpolation: How far the frame is between the previous tick and the current tick (0-1)
+        """
+
         self.handle_mouse()
+        self.update_vectors()
 
-        super().update()
+        renderPos = glm.mix(self.previousPos, self.pos, interpolation)
+        self.viewMatrix = glm.lookAt(renderPos, renderPos + self.forward, self.up)
 
 
     def handle_keyboard(self):
         "Handles all keyboard input"
 
         keysPressed = pygame.key.get_pressed()
+
+        if PLAYER_COLLISION:
+            self.walk(keysPressed)
+            return
+
         velocity = PLAYER_SPEED * self.app.deltaTime
 
         if keysPressed[pygame.K_w]:
@@ -48,6 +72,45 @@ class Player(Camera):
             self.move_down(velocity)
 
 
+    def walk(self, keysPressed: pygame.key.ScancodeWrapper):
+        """
+        Moves the player along the ground with gravity, jumping and stepping, colliding with solid voxels
+
+        :param pygame.key.ScancodeWrapper keysPressed: The current state of the keyboard
+        """
+
+        # Walking directions ignore the pitch so looking up or down doesn't change walking speed
+        forward = glm.normalize(glm.vec3(self.forward.x, 0, self.forward.z))
+        right = glm.normalize(glm.vec3(self.right.x, 0, self.right.z))
+        direction = glm.vec3(0)
+
+        if keysPressed[pygame.K_w]:
+            direction += forward
+
+        if keysPressed[pygame.K_a]:
+            direction -= right
+
+        if keysPressed[pygame.K_s]:
+            direction -= forward
+
+        if keysPressed[pygame.K_d]:
+            direction += right
+
+        if glm.length(direction):
+            direction = glm.normalize(direction) * PLAYER_SPEED
+
+        self.velocity[0, 0] = direction.x
+        self.velocity[0, 2] = direction.z
+
+        if keysPressed[pygame.K_SPACE] and self.onGround[0]:
+            self.velocity[0, 1] = PLAYER_JUMP_SPEED
+
+        # The collision body is centred half way up the player, below the eyes
+        self.body[0] = self.pos.x, self.pos.y - PLAYER_EYE_HEIGHT + PLAYER_SIZE.y / 2, self.pos.z
+        self.app.scene.world.solidityGrid.move_bodies(self.body, self.velocity, self.halfExtents, self.onGround, self.app.deltaTime)
+        self.pos = glm.vec3(self.body[0, 0], self.body[0, 1] + PLAYER_EYE_HEIGHT - PLAYER_SIZE.y / 2, self.body[0, 2])
+
+
     def handle_mouse(self):
         "Handles all mouse input"
 
@@ -67,13 +130,33 @@ class Player(Camera):
         :param pygame.event event: The event to be handled
         """
 
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            voxelHandler = self.app.scene.world.voxelHandler
+        if event.type == pygame.KEYDOWN and pygame.K_1 <= event.key < pygame.K_1 + len(HOTBAR_VOXEL_IDS):
+            self.app.scene.world.voxelHandler.newVoxelID = HOTBAR_VOXEL_IDS[event.key - pygame.K_1]
 
+        if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:
-                voxelHandler.switch_interaction_mode(0)
-                voxelHandler.set_voxel()
+                self.edit_voxel(0)
             
+            if event.button == 2:
+                self.edit_voxel(1, LIGHT_VOXEL_ID)
+
             if event.button == 3:
-                voxelHandler.switch_interaction_mode(1)
-                voxelHandler.set_voxel()
\ No newline at end of file
+                self.edit_voxel(1)
+
+
+    def edit_voxel(self, interactionMode: int, voxelID: int = None):
+        """
+        Breaks or places a voxel where the player is looking, recording the edit if a replay is being recorded
+
+        :param int interactionMode: 0 to break the voxel or 1 to place one
+        :param int voxelID: The ID of the voxel to place (defaults to the voxel picked in the hotbar)
+        """
+
+        voxelHandler = self.app.scene.world.voxelHandler
+        voxelID = voxelID or voxelHandler.newVoxelID
+
+        if self.app.replayRecorder:
+            self.app.replayRecorder.record_edit(interactionMode, voxelID)
+
+        voxelHandler.switch_interaction_mode(interactionMode)
+        voxelHandler.set_voxel(voxelID)
\ No newline at end of file
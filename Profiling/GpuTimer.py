@@ -0,0 +1,46 @@
+import moderngl as mgl
+
+
+class GpuTimer:
+    def __init__(self, context: mgl.Context, queryCount: int = 3) -> None:
+        """
+        Class that times how long the GPU spends on the draw calls made inside it using timer queries. Reading a query
+        straight away would stall until the GPU catches up, so queries are used in turn and each is only read
+        queryCount - 1 frames after it was issued
+
+        :param mgl.Context context: The OpenGL context to time
+        :param int queryCount: The number of queries used in turn
+        """
+
+        self.queries = [context.query(time=True) for _ in range(queryCount)]
+        self.queryIndex = 0
+        self.issuedCount = 0
+        self.enabled = True
+
+        # The GPU time in milliseconds of the oldest frame that has been read back
+        self.elapsed: float = None
+
+
+    def __enter__(self) -> 'GpuTimer':
+        "Starts timing the draw calls that follow"
+
+        if self.enabled:
+            self.queries[self.queryIndex].__enter__()
+
+        return self
+
+
+    def __exit__(self, *exceptionInfo) -> None:
+        "Stops timing and reads back the oldest query"
+
+        if not self.enabled:
+            return
+
+        self.queries[self.queryIndex].__exit__(*exceptionInfo)
+        self.issuedCount += 1
+
+        # The next query to be reused is the oldest one, which is read before it is issued again
+        self.queryIndex = (self.queryIndex + 1) % len(self.queries)
+
+        if self.issuedCount >= len(self.queries):
+            self.elapsed = self.queries[self.queryIndex].elapsed * 1e-6
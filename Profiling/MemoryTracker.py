@@ -0,0 +1,115 @@
+import time
+from collections import defaultdict, deque
+
+from settings import *
+import Engine
+
+
+class MemoryTracker:
+    def __init__(self, app: 'Engine.Engine') -> None:
+        """
+        Class that keeps count of the bytes held by each owner (usually a chunk) in each category of memory, such as
+        voxel storage, CPU mesh arrays and GPU buffers. Every allocation and free is recorded as an event and as a
+        tracer counter, so a leak shows up as a total that keeps growing
+
+        :param Engine app: The Engine whose memory is tracked
+        """
+
+        self.app = app
+        self.startTime = time.perf_counter()
+
+        self.usage: dict[object, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.totals: dict[str, int] = defaultdict(int)
+        self.peaks: dict[str, int] = defaultdict(int)
+        self.allocationCounts: dict[str, int] = defaultdict(int)
+        self.freeCounts: dict[str, int] = defaultdict(int)
+
+        # The most recent (time, category, owner, change in bytes, total bytes) events
+        self.events: deque[tuple] = deque(maxlen=MEMORY_EVENT_LIMIT)
+
+
+    def record(self, category: str, owner: object, byteCount: int) -> None:
+        """
+        Records a change in the memory held by an owner
+
+        :param str category: The category of memory
+        :param object owner: The object holding the memory
+        :param int byteCount: The number of bytes allocated, or negative for bytes freed
+        """
+
+        self.usage[owner][category] += byteCount
+        self.totals[category] += byteCount
+        self.peaks[category] = max(self.peaks[category], self.totals[category])
+
+        self.events.append((time.perf_counter() - self.startTime, category, owner, byteCount, self.totals[category]))
+        self.app.tracer.counter(f"{category} (MB)", self.totals[category] / 2 ** 20)
+
+
+    def allocate(self, category: str, owner: object, byteCount: int) -> None:
+        """
+        Records memory being allocated
+
+        :param str category: The category of memory
+        :param object owner: The object holding the memory
+        :param int byteCount: The number of bytes allocated
+        """
+
+        self.allocationCounts[category] += 1
+        self.record(category, owner, byteCount)
+
+
+    def free(self, category: str, owner: object, byteCount: int) -> None:
+        """
+        Records memory being freed
+
+        :param str category: The category of memory
+        :param object owner: The object that held the memory
+        :param int byteCount: The number of bytes freed
+        """
+
+        self.freeCounts[category] += 1
+        self.record(category, owner, -byteCount)
+
+
+    def get_usage(self, owner: object) -> dict[str, int]:
+        """
+        Gets the memory held by an owner
+
+        :param object owner: The object to get the memory of
+
+        :returns: The bytes held in each category
+        """
+
+        return dict(self.usage.get(owner, {}))
+
+
+    def get_totals(self) -> dict[str, int]:
+        """
+        Gets the memory held in total
+
+        :returns: The bytes held in each category
+        """
+
+        return dict(self.totals)
+
+
+    def report(self, title: str, chunkCount: int = 5) -> None:
+        """
+        Prints the memory held in each category, along with the chunks holding the most memory
+
+        :param str title: The heading of the report
+        :param int chunkCount: The number of chunks to list
+        """
+
+        print(title)
+
+        for category, total in self.totals.items():
+            print(f"  {category:<16}{total / 2 ** 20:9.2f} MB (peak {self.peaks[category] / 2 ** 20:.2f} MB, "
+                  f"{self.allocationCounts[category]} allocations, {self.freeCounts[category]} frees)")
+
+        print(f"  {'Total':<16}{sum(self.totals.values()) / 2 ** 20:9.2f} MB")
+
+        largest = sorted(self.usage.items(), key=lambda item: sum(item[1].values()), reverse=True)[:chunkCount]
+        for owner, usage in largest:
+            owner = getattr(owner, "position", owner)
+            print(f"  {str(owner):<16}{sum(usage.values()) / 2 ** 10:9.1f} KB")
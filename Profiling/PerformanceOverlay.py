@@ -0,0 +1,155 @@
+import time
+from collections import defaultdict, deque
+
+import moderngl as mgl
+import pygame
+
+from settings import *
+from Meshes.OverlayMesh import OverlayMesh
+from Profiling.GpuTimer import GpuTimer
+import Engine
+
+
+class PerformanceOverlay:
+    def __init__(self, app: 'Engine.Engine') -> None:
+        """
+        Class that draws frame timings and rendering statistics over the top left corner of the screen. Values are
+        averaged over the last OVERLAY_AVERAGE_FRAMES frames and the text is only redrawn every OVERLAY_REFRESH_TIME
+        milliseconds, so the overlay is cheap enough to leave on
+
+        :param Engine app: The Engine the overlay shows statistics for
+        """
+
+        self.app = app
+        self.context = app.context
+        self.isVisible = SHOW_OVERLAY
+
+        # Times the chunk pass on the GPU, only while the overlay is shown
+        self.gpuTimer = GpuTimer(self.context)
+        self.gpuTimer.enabled = self.isVisible
+
+        self.samples: dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=OVERLAY_AVERAGE_FRAMES))
+        self.lastFrameTime = time.perf_counter()
+        self.lastRefreshTime = 0
+        self.lastUploadedVertexCount = 0
+
+        # The text is drawn with pygame and uploaded to a texture on a quad drawn over the world
+        self.font = pygame.font.Font(None, OVERLAY_FONT_SIZE)
+        self.surface = pygame.Surface(OVERLAY_SIZE, pygame.SRCALPHA)
+        self.texture = self.context.texture(OVERLAY_SIZE, 4)
+        self.texture.use(location=OVERLAY_TEXTURE_UNIT)
+        self.mesh = OverlayMesh(app, OVERLAY_SIZE)
+
+
+    def toggle(self) -> None:
+        "Shows or hides the overlay, starting the averages again when it is shown"
+
+        self.isVisible = not self.isVisible
+        self.gpuTimer.enabled = self.isVisible
+        self.samples.clear()
+        self.lastFrameTime = time.perf_counter()
+        self.lastRefreshTime = 0
+
+
+    def get_average(self, name: str) -> float:
+        """
+        Gets the average of a statistic over the frames it has been recorded for
+
+        :param str name: The name of the statistic
+
+        :returns: The average value, or 0 if nothing has been recorded yet
+        """
+
+        samples = self.samples[name]
+
+        return sum(samples) / len(samples) if samples else 0
+
+
+    def update(self) -> None:
+        "Records the statistics of the frame that was just drawn, redrawing the text if it is due"
+
+        currentTime = time.perf_counter()
+        frameTime = (currentTime - self.lastFrameTime) * 1000
+        self.lastFrameTime = currentTime
+
+        if not self.isVisible:
+            return
+
+        world = self.app.scene.world
+
+        self.samples["Frame"].append(frameTime)
+        self.samples["Simulation"].append(self.app.simulationTime)
+        self.samples["Loading"].append(self.app.loadingTime)
+        self.samples["Render"].append(self.app.renderTime)
+        self.samples["Draw calls"].append(world.drawCallCount)
+        self.samples["Vertices uploaded"].append(world.uploadedVertexCount - self.lastUploadedVertexCount)
+        self.lastUploadedVertexCount = world.uploadedVertexCount
+
+        if self.gpuTimer.elapsed is not None:
+            self.samples["GPU chunks"].append(self.gpuTimer.elapsed)
+
+        if (currentTime - self.lastRefreshTime) * 1000 >= OVERLAY_REFRESH_TIME:
+            self.lastRefreshTime = currentTime
+            self.draw_text()
+
+
+    def get_lines(self) -> list[str]:
+        """
+        Gets the lines of text shown on the overlay
+
+        :returns: A list of lines
+        """
+
+        world = self.app.scene.world
+        frameTime = self.get_average("Frame")
+        gpuTime = f"{self.get_average('GPU chunks'):.2f} ms" if self.samples["GPU chunks"] else "n/a"
+
+        qualityController = self.app.qualityController
+        renderDistance = f"{qualityController.renderDistance} chunks" if qualityController.enabled else "unlimited"
+        uploadLimit = qualityController.meshUploadLimit if qualityController.enabled else "no"
+
+        pendingMeshes = world.chunkLoader.get_pending_mesh_count() + len(world.dirtyChunks)
+        if world.meshWorker:
+            pendingMeshes += world.meshWorker.get_pending_count()
+
+        memoryTotals = self.app.memoryTracker.get_totals()
+        gpuBytes = memoryTotals.get("GPU buffers", 0)
+
+        return [
+            f"{1000 / frameTime if frameTime else 0:.0f} FPS ({frameTime:.2f} ms)",
+            f"Simulation: {self.get_average('Simulation'):.2f} ms",
+            f"Loading: {self.get_average('Loading'):.2f} ms",
+            f"Render (CPU): {self.get_average('Render'):.2f} ms",
+            f"Chunks (GPU): {gpuTime}",
+            f"Draw calls: {self.get_average('Draw calls'):.0f}",
+            f"Chunks drawn: {world.drawCallCount} / {len(world.chunks)}",
+            f"Vertices uploaded: {self.get_average('Vertices uploaded'):.0f} per frame",
+            f"Pending meshes: {pendingMeshes}",
+            f"Render distance: {renderDistance}, {uploadLimit} upload limit",
+            f"CPU memory: {(sum(memoryTotals.values()) - gpuBytes) / 2 ** 20:.1f} MB",
+            f"GPU buffers: {gpuBytes / 2 ** 20:.1f} MB",
+        ]
+
+
+    def draw_text(self) -> None:
+        "Draws the statistics onto the overlay's texture"
+
+        self.surface.fill(OVERLAY_BACKGROUND)
+
+        lineHeight = self.font.get_linesize()
+        for i, line in enumerate(self.get_lines()):
+            self.surface.blit(self.font.render(line, True, OVERLAY_TEXT_COLOUR), (6, 6 + i * lineHeight))
+
+        # Flipped because OpenGL textures start from the bottom row
+        self.texture.write(pygame.image.tostring(self.surface, "RGBA", True))
+
+
+    def render(self) -> None:
+        "Draws the overlay over everything else on the screen"
+
+        if not self.isVisible:
+            return
+
+        self.context.disable(mgl.DEPTH_TEST)
+        self.mesh.render()
+        self.context.enable(mgl.DEPTH_TEST)
@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from numba.core import event
+
+
+class CompileTimer(event.Listener):
+    def __init__(self, threadID: int) -> None:
+        """
+        Numba event listener that adds up the time each thread spends in numba's compiler. This includes loading
+        kernels from the cache and waiting for a compile on another thread to finish
+
+        :param int threadID: The identifier of the main thread, whose compile time is reported
+        """
+
+        self.threadID = threadID
+        self.depths: dict[int, int] = defaultdict(int)
+        self.startTimes: dict[int, float] = {}
+        self.durations: dict[int, float] = defaultdict(float)
+
+
+    @property
+    def duration(self) -> float:
+        "The time the main thread has spent compiling in seconds"
+
+        return self.durations[self.threadID]
+
+
+    def get_duration(self) -> float:
+        """
+        Gets the time the calling thread has spent compiling
+
+        :returns: The time in seconds
+        """
+
+        return self.durations[threading.get_ident()]
+
+
+    def on_start(self, event: event.Event) -> None:
+        "Starts timing when the outermost compile on the thread begins"
+
+        threadID = threading.get_ident()
+
+        # The compiler lock is re-entrant, so compiling a kernel that calls other kernels nests events
+        if self.depths[threadID] == 0:
+            self.startTimes[threadID] = time.perf_counter()
+
+        self.depths[threadID] += 1
+
+
+    def on_end(self, event: event.Event) -> None:
+        "Stops timing when the outermost compile on the thread finishes"
+
+        threadID = threading.get_ident()
+        self.depths[threadID] -= 1
+
+        if self.depths[threadID] == 0:
+            self.durations[threadID] += time.perf_counter() - self.startTimes[threadID]
+
+
+class StartupProfiler:
+    def __init__(self) -> None:
+        """
+        Class that breaks down where the time before the first frame goes. Time is recorded in named phases, with
+        time spent compiling kernels and in nested phases taken out of each phase and counted separately. Phases can
+        be timed on any thread, and those on other threads than the one that created the profiler are reported
+        separately since they overlap the main thread's
+        """
+
+        self.startTime = time.perf_counter()
+        self.threadID = threading.get_ident()
+        self.phaseTimes: dict[str, float] = defaultdict(float)
+        self.backgroundPhaseTimes: dict[str, float] = defaultdict(float)
+        self.lock = threading.Lock()
+
+        # Each thread nests its own phases
+        self.threadState = threading.local()
+
+        self.compileTimer = CompileTimer(self.threadID)
+        event.register("numba:compiler_lock", self.compileTimer)
+
+        self.warmupTime: float = None
+
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Context manager that records the time spent inside it against a phase
+
+        :param str name: The name of the phase
+        """
+
+        startTime = time.perf_counter()
+        startCompileTime = self.compileTimer.get_duration()
+
+        # Each entry is the time spent in the phase's own nested phases, not counting compiling
+        if not hasattr(self.threadState, "phaseStack"):
+            self.threadState.phaseStack = []
+        phaseStack = self.threadState.phaseStack
+        phaseStack.append(0)
+
+        try:
+            yield
+
+        finally:
+            nestedTime = phaseStack.pop()
+            elapsed = time.perf_counter() - startTime
+            compileTime = self.compileTimer.get_duration() - startCompileTime
+
+            phaseTimes = self.phaseTimes if threading.get_ident() == self.threadID else self.backgroundPhaseTimes
+            with self.lock:
+                phaseTimes[name] += elapsed - compileTime - nestedTime
+
+            if phaseStack:
+                phaseStack[-1] += elapsed - compileTime
+
+
+    def report(self, title: str) -> None:
+        """
+        Prints the time spent in each phase so far
+
+        :param str title: The heading of the report
+        """
+
+        totalTime = time.perf_counter() - self.startTime
+        otherTime = totalTime - sum(self.phaseTimes.values()) - self.compileTimer.duration
+
+        print(f"{title} after {totalTime:.2f} s")
+
+        for name, phaseTime in self.phaseTimes.items():
+            print(f"  {name:<20}{phaseTime:8.3f} s")
+
+        print(f"  {'JIT compilation':<20}{self.compileTimer.duration:8.3f} s")
+        print(f"  {'Other':<20}{otherTime:8.3f} s")
+
+        for name, phaseTime in list(self.backgroundPhaseTimes.items()):
+            print(f"  {name:<20}{phaseTime:8.3f} s (on a background thread)")
+
+        if self.warmupTime is not None:
+            print(f"  {'Kernel warm-up':<20}{self.warmupTime:8.3f} s (on a background thread)")
@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+from settings import *
+
+
+class Tracer:
+    def __init__(self, enabled: bool = TRACING, frameCount: int = TRACE_FRAMES) -> None:
+        """
+        Class that records nestable timed spans and counters around the hot paths of a frame. Only the last
+        frameCount frames are kept, and they can be saved as Chrome trace JSON to view in chrome://tracing or
+        Perfetto. While disabled, spans do nothing and nothing is recorded
+
+        :param bool enabled: Whether spans and counters are recorded
+        :param int frameCount: The number of frames kept in the ring buffer
+        """
+
+        self.enabled = enabled
+        self.startTime = time.perf_counter()
+
+        # Each frame is a list of (phase, name, start, end or value, threadID) tuples, which are only turned into trace
+        # events when saved to keep recording cheap
+        self.frames: deque[list[tuple]] = deque(maxlen=frameCount)
+        self.events: list[tuple] = []
+
+        # Shared by every span while disabled so a disabled span costs no more than a method call
+        self.disabledSpan = nullcontext()
+
+
+    def span(self, name: str):
+        """
+        Context manager that records the time spent inside it as a span, which nests inside any span it is opened in
+
+        :param str name: The name shown for the span
+
+        :returns: A context manager that times the span
+        """
+
+        if not self.enabled:
+            return self.disabledSpan
+
+        return self.record_span(name)
+
+
+    @contextmanager
+    def record_span(self, name: str):
+        """
+        Context manager that records a span
+
+        :param str name: The name shown for the span
+        """
+
+        startTime = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            self.events.append(("X", name, startTime, time.perf_counter(), threading.get_ident()))
+
+
+    def counter(self, name: str, value: float) -> None:
+        """
+        Records the value of a counter, which is drawn as a graph over time
+
+        :param str name: The name of the counter
+        :param float value: The value of the counter at this moment
+        """
+
+        if self.enabled:
+            self.events.append(("C", name, time.perf_counter(), value, threading.get_ident()))
+
+
+    def end_frame(self) -> None:
+        "Moves everything recorded since the last frame into the ring buffer, dropping the oldest frame if it is full"
+
+        if self.enabled:
+            self.frames.append(self.events)
+            self.events = []
+
+
+    def get_trace_events(self) -> list[dict]:
+        """
+        Converts the recorded frames into Chrome trace events, with times in microseconds since the tracer was created
+
+        :returns: A list of trace events
+        """
+
+        processID = os.getpid()
+        traceEvents = [{"name": "process_name", "ph": "M", "pid": processID, "args": {"name": "MinecraftPython"}}]
+
+        for frame in (*self.frames, self.events):
+            for phase, name, startTime, endOrValue, threadID in frame:
+                traceEvent = {"name": name, "ph": phase, "ts": (startTime - self.startTime) * 1e6, "pid": processID, "tid": threadID}
+
+                if phase == "X":
+                    traceEvent["dur"] = (endOrValue - startTime) * 1e6
+                else:
+                    traceEvent["args"] = {name: endOrValue}
+
+                traceEvents.append(traceEvent)
+
+        return traceEvents
+
+
+    def save(self, filePath: str = None) -> str:
+        """
+        Saves the frames in the ring buffer as a Chrome trace JSON file
+
+        :param str filePath: The path to save the trace to, which is a timestamped file in TRACE_DIRECTORY if not provided
+
+        :returns: The path the trace was saved to
+        """
+
+        if filePath is None:
+            os.makedirs(TRACE_DIRECTORY, exist_ok=True)
+            filePath = os.path.join(TRACE_DIRECTORY, f"trace_{time.strftime('%Y%m%d_%H%M%S')}.json")
+
+        with open(filePath, "w") as traceFile:
+            json.dump({"traceEvents": self.get_trace_events(), "displayTimeUnit": "ms"}, traceFile)
+
+        print(f"Saved a trace of the last {len(self.frames)} frames to {filePath}")
+
+        return filePath
@@ -0,0 +1,169 @@
+import json
+import os
+import time
+from collections import deque
+
+from settings import *
+import Engine
+
+
+class QualityController:
+    def __init__(self, app: 'Engine.Engine', enabled: bool = ADAPTIVE_QUALITY) -> None:
+        """
+        Class that watches recent frame times and trades render distance and the number of meshes uploaded per frame
+        against them to hold TARGET_FRAME_TIME. Nothing changes while the average frame time stays within the
+        hysteresis band around the target, and the window is cleared after each change so the next one is based only
+        on frames drawn with the new settings. While disabled, everything is drawn and uploads are not limited
+
+        :param Engine app: The Engine whose frames are watched
+        :param bool enabled: Whether the settings are adapted to the frame time
+        """
+
+        self.app = app
+        self.enabled = enabled
+        self.startTime = time.perf_counter()
+        self.frame = 0
+        self.lastLoweredFrame = -QUALITY_RAISE_DELAY
+
+        # The work time of each recent frame and how much of it was spent loading the world, in milliseconds
+        self.frameTimes: deque[float] = deque(maxlen=FRAME_TIME_WINDOW)
+        self.loadingTimes: deque[float] = deque(maxlen=FRAME_TIME_WINDOW)
+
+        # Start at the highest quality, and None means no limit
+        self.renderDistance: int = RENDER_DISTANCE_RANGE[1] if enabled else None
+        self.meshUploadLimit: int = MESH_UPLOAD_RANGE[1] if enabled else None
+
+        # Every adjustment made, which is also appended to the log file as a line of JSON
+        self.adjustments: list[dict] = []
+        self.logPath: str = None
+
+
+    def disable(self) -> None:
+        "Stops adapting the settings, so everything is drawn and uploads are not limited"
+
+        self.enabled = False
+        self.renderDistance = self.meshUploadLimit = None
+        self.frameTimes.clear()
+        self.loadingTimes.clear()
+
+
+    def update(self, frameTime: float, loadingTime: float) -> None:
+        """
+        Records the time taken by the frame that was just drawn, adjusting the settings if the recent frames were
+        outside the hysteresis band around the target frame time
+
+        :param float frameTime: The time spent working on the frame in milliseconds, not counting the frame rate cap
+        :param float loadingTime: The part of the frame time spent loading the world in milliseconds
+        """
+
+        if not self.enabled:
+            return
+
+        self.frame += 1
+        self.frameTimes.append(frameTime)
+        self.loadingTimes.append(loadingTime)
+
+        if len(self.frameTimes) < FRAME_TIME_WINDOW:
+            return
+
+        averageFrameTime = sum(self.frameTimes) / FRAME_TIME_WINDOW
+        averageLoadingTime = sum(self.loadingTimes) / FRAME_TIME_WINDOW
+
+        if averageFrameTime > TARGET_FRAME_TIME * (1 + FRAME_TIME_HYSTERESIS):
+            self.lower_quality(averageFrameTime, averageLoadingTime)
+
+        elif averageFrameTime < TARGET_FRAME_TIME * (1 - FRAME_TIME_HYSTERESIS):
+            self.raise_quality(averageFrameTime, averageLoadingTime)
+
+
+    def lower_quality(self, averageFrameTime: float, averageLoadingTime: float) -> None:
+        """
+        Lowers the setting that saves the most time. Uploads are throttled when loading alone could cover the time
+        over the target, since that keeps the render distance, otherwise fewer chunks are drawn. Throttling uploads
+        does nothing once loading is not what makes frames slow, so it is never done for that
+
+        :param float averageFrameTime: The average frame time of the recent frames in milliseconds
+        :param float averageLoadingTime: The average loading time of the recent frames in milliseconds
+        """
+
+        self.lastLoweredFrame = self.frame
+
+        if self.meshUploadLimit > MESH_UPLOAD_RANGE[0] and averageLoadingTime >= averageFrameTime - TARGET_FRAME_TIME:
+            self.adjust("meshUploadLimit", max(self.meshUploadLimit // 2, MESH_UPLOAD_RANGE[0]),
+                        "Loading is over the target", averageFrameTime, averageLoadingTime)
+
+        elif self.renderDistance > RENDER_DISTANCE_RANGE[0]:
+            self.adjust("renderDistance", self.renderDistance - 1,
+                        "Frame time is over the target", averageFrameTime, averageLoadingTime)
+
+
+    def raise_quality(self, averageFrameTime: float, averageLoadingTime: float) -> None:
+        """
+        Raises the render distance a step, or once it is at its highest lets more meshes be uploaded each frame.
+        Nothing is raised until QUALITY_RAISE_DELAY frames after the last time quality was lowered, so a setting the
+        frame time could not hold is not tried again every window
+
+        :param float averageFrameTime: The average frame time of the recent frames in milliseconds
+        :param float averageLoadingTime: The average loading time of the recent frames in milliseconds
+        """
+
+        if self.frame - self.lastLoweredFrame < QUALITY_RAISE_DELAY:
+            return
+
+        if self.renderDistance < RENDER_DISTANCE_RANGE[1]:
+            self.adjust("renderDistance", self.renderDistance + 1,
+                        "Frame time is under the target", averageFrameTime, averageLoadingTime)
+
+        elif self.meshUploadLimit < MESH_UPLOAD_RANGE[1]:
+            self.adjust("meshUploadLimit", min(self.meshUploadLimit * 2, MESH_UPLOAD_RANGE[1]),
+                        "Frame time is under the target", averageFrameTime, averageLoadingTime)
+
+
+    def adjust(self, setting: str, value: int, reason: str, averageFrameTime: float, averageLoadingTime: float) -> None:
+        """
+        Changes a setting, logs the change and starts measuring the frame time again
+
+        :param str setting: The name of the attribute to change, either renderDistance or meshUploadLimit
+        :param int value: The new value of the setting
+        :param str reason: Why the setting was changed
+        :param float averageFrameTime: The average frame time that caused the change in milliseconds
+        :param float averageLoadingTime: The average loading time that caused the change in milliseconds
+        """
+
+        adjustment = {
+            "time": time.perf_counter() - self.startTime,
+            "frame": self.frame,
+            "setting": setting,
+            "from": getattr(self, setting),
+            "to": value,
+            "reason": reason,
+            "averageFrameTime": averageFrameTime,
+            "averageLoadingTime": averageLoadingTime,
+            "targetFrameTime": TARGET_FRAME_TIME,
+        }
+
+        setattr(self, setting, value)
+        self.frameTimes.clear()
+        self.loadingTimes.clear()
+
+        self.adjustments.append(adjustment)
+        self.log(adjustment)
+
+        self.app.tracer.counter("Render distance", self.renderDistance)
+        self.app.tracer.counter("Mesh upload limit", self.meshUploadLimit)
+
+
+    def log(self, adjustment: dict) -> None:
+        """
+        Appends an adjustment to the log file, which is created on the first adjustment. Each change is written
+        straight away so the log survives a crash
+
+        :param dict adjustment: The adjustment to log
+        """
+
+        if self.logPath is None:
+            os.makedirs(ADAPTIVE_QUALITY_LOG_DIRECTORY, exist_ok=True)
+            self.logPath = os.path.join(ADAPTIVE_QUALITY_LOG_DIRECTORY, f"quality_{time.strftime('%Y%m%d_%H%M%S')}.jsonl")
+
+        with open(self.logPath, "a") as logFile:
+            logFile.write(json.dumps(adjustment) + "\n")
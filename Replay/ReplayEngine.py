@@ -0,0 +1,83 @@
+from collections import defaultdict
+
+from overrides import overrides
+
+from settings import *
+from HeadlessEngine import HeadlessEngine
+from Profiling.StartupProfiler import StartupProfiler
+
+
+class ReplayEngine(HeadlessEngine):
+    def __init__(self, filePath: str, startupProfiler: StartupProfiler = None, dumpDirectory: str = None,
+                 dumpInterval: int = 0) -> None:
+        """
+        Headless engine that plays back a recorded replay, running exactly one simulation tick per frame. The player
+        is moved to each recorded pose and the recorded edits are made through the player, so every run does the
+        same work and their frame times can be compared
+
+        :param str filePath: The path of the replay file
+        :param StartupProfiler startupProfiler: The profiler timing startup, which is created here if not provided
+        :param str dumpDirectory: The folder frames are saved to as PNG images, if frames are being saved
+        :param int dumpInterval: How many frames apart saved frames are, or 0 to not save any frames
+        """
+
+        replay = np.load(filePath)
+
+        if not np.isclose(replay["tickTime"], SIMULATION_TICK_TIME):
+            raise Exception(f"Replay was recorded with {float(replay['tickTime']):.2f} ms ticks, but ticks are {SIMULATION_TICK_TIME:.2f} ms")
+
+        self.poses = replay["poses"]
+        self.edits: dict[int, list[tuple[int, int]]] = defaultdict(list)
+        for tick, interactionMode, voxelID in replay["edits"]:
+            self.edits[int(tick)].append((int(interactionMode), int(voxelID)))
+
+        self.currentTick = 0
+
+        # Replays recorded without a seed are stored with a seed of -1, and are played back with a seed of 0 so that
+        # runs of them still match each other
+        seed = max(int(replay["seed"]), 0)
+        super().__init__(startupProfiler, seed=seed, dumpDirectory=dumpDirectory, dumpInterval=dumpInterval)
+
+
+    @overrides
+    def update(self) -> None:
+        "Runs the next tick of the replay"
+
+        self.scene.update()
+
+        x, y, z, yaw, pitch = self.poses[self.currentTick]
+        self.player.previousPos = glm.vec3(self.player.pos)
+        self.player.pos = glm.vec3(x, y, z)
+        self.player.yaw = float(yaw)
+        self.player.pitch = float(pitch)
+
+        for interactionMode, voxelID in self.edits[self.currentTick]:
+            self.player.edit_voxel(interactionMode, voxelID)
+
+        self.currentTick += 1
+
+
+    @overrides
+    def update_frame(self) -> None:
+        "Moves time on by exactly one simulation tick"
+
+        self.time += SIMULATION_TICK_TIME * 0.001
+        self.run_ticks(SIMULATION_TICK_TIME)
+
+
+    @overrides
+    def update_camera(self) -> None:
+        "Places the camera at the player's pose from the latest tick"
+
+        self.player.update_vectors()
+        self.player.update_view_matrix()
+
+
+    def run_replay(self) -> dict[str, float]:
+        """
+        Plays the whole replay back
+
+        :returns: The frame time statistics of the run
+        """
+
+        return self.run_frames(len(self.poses))
@@ -0,0 +1,51 @@
+from settings import *
+import Engine
+
+
+class ReplayRecorder:
+    def __init__(self, app: 'Engine.Engine', filePath: str) -> None:
+        """
+        Class that records the player's pose every simulation tick, along with any voxel edits, so a play session
+        can be replayed exactly for performance runs. Edits are stored against the last tick that ran before them
+
+        :param Engine app: The engine being recorded
+        :param str filePath: The path to save the replay to
+        """
+
+        self.app = app
+        self.filePath = filePath
+
+        # Poses are (x, y, z, yaw, pitch) with the angles in radians and edits are (tick, interactionMode, voxelID)
+        self.poses: list[tuple[float, float, float, float, float]] = []
+        self.edits: list[tuple[int, int, int]] = []
+
+
+    def record_tick(self) -> None:
+        "Records the player's pose after a tick"
+
+        player = self.app.player
+        self.poses.append((*player.pos, player.yaw, player.pitch))
+
+
+    def record_edit(self, interactionMode: int, voxelID: int) -> None:
+        """
+        Records a voxel edit made by the player
+
+        :param int interactionMode: 0 if a voxel was broken or 1 if a voxel was placed
+        :param int voxelID: The ID of the voxel placed
+        """
+
+        self.edits.append((len(self.poses) - 1, interactionMode, voxelID))
+
+
+    def save(self) -> None:
+        "Saves the recording as a compressed numpy archive"
+
+        np.savez_compressed(
+            self.filePath,
+            poses=np.array(self.poses, dtype='float32').reshape(-1, 5),
+            edits=np.array(self.edits, dtype='int32').reshape(-1, 3),
+            seed=-1 if self.app.seed is None else self.app.seed,
+            tickTime=SIMULATION_TICK_TIME)
+
+        print(f"Saved {len(self.poses)} ticks and {len(self.edits)} edits to {self.filePath}")
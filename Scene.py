@@ -11,6 +11,12 @@ class Scene:
         self.world = World(self.app)
 
 
+    def update_frame(self) -> None:
+        "Updates the parts of the current scene that run once per frame"
+
+        self.world.update_frame()
+
+
     def update(self) -> None:
         "Updates the current scene"
 
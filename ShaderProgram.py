@@ -4,20 +4,63 @@ import moderngl as mgl
 from settings import *
 
 
+# The shaders compiled by the program, each made of a vertex and fragment shader file in the Shaders folder
+SHADER_NAMES = ("Chunk", "Overlay", "Quad")
+
+
+def read_shader_sources(shaderNames: tuple[str, ...] = SHADER_NAMES) -> dict[str, tuple[str, str]]:
+    """
+    Reads the source of shaders from the Shaders folder. This does not need the OpenGL context, so it can be done on
+    another thread while the window opens
+
+    :param tuple shaderNames: The names of the shaders to read
+
+    :returns: The (vertex shader, fragment shader) source of each shader by name
+    """
+
+    shaderSources = {}
+
+    for shaderName in shaderNames:
+        try:
+            with open(f'Shaders/{shaderName}.vert') as vertFile:
+                vertexShader = vertFile.read()
+
+        except FileNotFoundError:
+            print(f"File not found: Shaders/{shaderName}.vert")
+            sys.exit()
+
+        try:
+            with open(f'Shaders/{shaderName}.frag') as fragFile:
+                fragmentShader = fragFile.read()
+
+        except FileNotFoundError:
+            print(f"File not found: Shaders/{shaderName}.frag")
+            sys.exit()
+
+        shaderSources[shaderName] = (vertexShader, fragmentShader)
+
+    return shaderSources
+
+
 class ShaderProgram:
-    def __init__(self, app) -> None:
+    def __init__(self, app, shaderSources: dict[str, tuple[str, str]] = None) -> None:
         """
         Class that loads and stores an OpenGL shader file
         
         :param Engine app: The Engine object which contains the OpenGL context shader should be loaded into
+        :param dict shaderSources: The sources of the shaders if they have already been read, otherwise they are read
+        here
         """
 
         self.app = app
         self.context = app.context
         self.player = app.player
+        self.shaderSources = shaderSources or read_shader_sources()
 
         # Shaders stored by the program
-        self.chunk = self.get_program('chunk')
+        self.chunk = self.get_program('Chunk', {"VERTEX_LAYOUT": VERTEX_LAYOUT})
+        self.overlay = self.get_program('Overlay')
+        self.quad = self.get_program('Quad')
 
         self.set_uniforms_on_init()
 
@@ -27,20 +70,28 @@ class ShaderProgram:
 
         self.chunk["projectionMatrix"].write(self.player.projectionMatrix)
         self.chunk["modelMatrix"].write(glm.mat4())
-        self.chunk["u_texture_0"] = 0
+        self.chunk["blockTextures"] = BLOCK_TEXTURE_UNIT
+        self.chunk["voxelTextureLayers"].write(VOXEL_TEXTURE_LAYER)
+        self.overlay["overlayTexture"] = OVERLAY_TEXTURE_UNIT
+
+        self.quad["projectionMatrix"].write(self.player.projectionMatrix)
+        self.quad["modelMatrix"].write(glm.mat4())
 
 
     def update(self) -> None:
         "Updates the Shader Program"
 
         self.chunk["viewMatrix"].write(self.player.viewMatrix)
+        self.quad["viewMatrix"].write(self.player.viewMatrix)
 
 
-    def get_program(self, shaderName: str) -> mgl.Program:
+    def get_program(self, shaderName: str, defines: dict[str, int] = None) -> mgl.Program:
         """
-        Loads the vertex and fragment shader files into a shader program and returns it
+        Compiles the vertex and fragment shaders of a shader into a shader program and returns it, reading the shader
+        files if they have not been read yet
 
         :param str shaderName: The filename for the shader file within the shaders file
+        :param dict defines: Any values defined at the top of both shaders, for settings the shaders are compiled for
 
         :return: An OpenGL shader program with the loaded vertex and fragment shaders
         """
@@ -48,24 +99,16 @@ class ShaderProgram:
         # Removes irrelevant areas of the path and file extension if accidentally provided
         shaderName = shaderName.split('Shaders/')[-1]
         shaderName = shaderName.split('.')[0]
-        
-        # Load the vertex shader
-        try:
-            with open(f'Shaders/{shaderName}.vert') as vertFile:
-                vertexShader = vertFile.read()
 
-        except FileNotFoundError:
-            print(f"File not found: Shaders/{shaderName}.vert")
-            sys.exit()
-        
-        # Load the fragment shader
-        try:
-            with open(f'Shaders/{shaderName}.frag') as fragFile:
-                fragmentShader = fragFile.read()
+        if shaderName not in self.shaderSources:
+            self.shaderSources.update(read_shader_sources((shaderName,)))
 
-        except FileNotFoundError:
-            print(f"File not found: Shaders/{shaderName}.frag")
-            sys.exit()
+        vertexShader, fragmentShader = self.shaderSources[shaderName]
+
+        # Defines have to come after the version directive on the first line
+        if defines:
+            defineLines = "".join(f"#define {name} {value}\n" for name, value in defines.items())
+            vertexShader, fragmentShader = (shader.replace("\n", "\n" + defineLines, 1) for shader in (vertexShader, fragmentShader))
 
         program = self.context.program(vertex_shader=vertexShader, fragment_shader=fragmentShader)
         
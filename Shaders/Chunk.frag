@@ -5,15 +5,16 @@ layout (location = 0) out vec4 fragColour;
 const vec3 gamma = vec3(2.2);
 const vec3 inv_gamma = 1 / gamma;
 
-uniform sampler2D u_texture_0;
+uniform sampler2DArray blockTextures;
 
 in vec3 voxel_colour;
 in vec2 uv;
 in float shading;
+flat in int textureLayer;
 
 
 void main() {
-    vec3 tex_col = texture(u_texture_0, uv).rgb;
+    vec3 tex_col = texture(blockTextures, vec3(uv, textureLayer)).rgb;
     tex_col = pow(tex_col, gamma);
 
     tex_col.rgb *= voxel_colour;
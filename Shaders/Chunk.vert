@@ -1,23 +1,34 @@
 #version 330 core
 
 layout (location = 0) in uint packedData;
+layout (location = 1) in uint lightData;
 
 int x, y, z;
 int voxelID;
 int faceID;
 int aoID;
 int needFlip;
+int skyLight;
+int blockLight;
 
 uniform mat4 projectionMatrix;
 uniform mat4 viewMatrix;
 uniform mat4 modelMatrix;
 
+// The layer of the block texture array each voxel ID is drawn with
+uniform int voxelTextureLayers[256];
+
 out vec3 voxel_colour;
 out vec2 uv;
 out float shading;
+flat out int textureLayer;
 
 const float aoValues[4] = float[4] (0.1, 0.25, 0.5, 1.0);
 
+// Brightness is kept above zero so unlit caves are dark rather than black
+const float minLightLevel = 0.03;
+const float lightFalloff = 0.8;
+
 const float faceShading[6] = float[6] (
     1.0, 0.5, // Top and bottom faces
     0.5, 0.8, // Right and left faces
@@ -46,16 +57,29 @@ vec3 hash31(float p) {
 void unpack(uint packedData) {
     // x, y, z, voxelID, faceID, aoValue, needFlip
 
+#if VERTEX_LAYOUT == 1
     uint yLen = 6u, zLen = 6u, voxelIDLen = 8u, faceIDLen = 3u, aoIDLen = 2u, needFlipLen = 1u;
     uint yMask = 63u, zMask = 63u, voxelIDMask = 255u, faceIDMask = 7u, aoIDMask = 3u, needFlipMask = 1u;
 
+    voxelID = int((packedData >> (faceIDLen + aoIDLen + needFlipLen)) & voxelIDMask);
+#else
+    // The voxelID is stored above the light levels instead
+    uint yLen = 8u, zLen = 8u, voxelIDLen = 0u, faceIDLen = 3u, aoIDLen = 2u, needFlipLen = 1u;
+    uint yMask = 255u, zMask = 255u, faceIDMask = 7u, aoIDMask = 3u, needFlipMask = 1u;
+
+    voxelID = int((lightData >> 8u) & 65535u);
+#endif
+
     x = int(packedData >> (yLen + zLen + voxelIDLen + faceIDLen + aoIDLen + needFlipLen));
     y = int((packedData >> (zLen + voxelIDLen + faceIDLen + aoIDLen + needFlipLen)) & yMask);
     z = int((packedData >> (voxelIDLen + faceIDLen + aoIDLen + needFlipLen)) & zMask);
-    voxelID = int((packedData >> (faceIDLen + aoIDLen + needFlipLen)) & voxelIDMask);
     faceID = int((packedData >> (aoIDLen + needFlipLen) & faceIDMask));
     aoID = int((packedData >> needFlipLen) & aoIDMask);
     needFlip = int(packedData & needFlipMask);
+
+    // Sky light is stored in the upper 4 bits and block light in the lower 4 bits
+    skyLight = int((lightData >> 4u) & 15u);
+    blockLight = int(lightData & 15u);
 }   
 
 
@@ -66,10 +90,12 @@ void main() {
     // Texturing
     int uv_index = gl_VertexID % 6 + ((faceID & 1) + needFlip * 2) * 6;
     uv = uv_coords[uv_indices[uv_index]];
+    textureLayer = voxelTextureLayers[min(voxelID, 255)];
 
     // Colouring and shading
     voxel_colour = hash31(voxelID);
-    shading = faceShading[faceID] * aoValues[aoID];
+    float lightLevel = pow(lightFalloff, float(15 - max(skyLight, blockLight)));
+    shading = faceShading[faceID] * aoValues[aoID] * max(lightLevel, minLightLevel);
     
     // Vertex positions
     gl_Position = projectionMatrix * viewMatrix * modelMatrix * vec4(inPosition, 1.0);
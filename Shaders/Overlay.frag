@@ -0,0 +1,12 @@
+#version 330 core
+
+layout (location = 0) out vec4 fragColour;
+
+uniform sampler2D overlayTexture;
+
+in vec2 uv;
+
+
+void main() {
+    fragColour = texture(overlayTexture, uv);
+}
@@ -0,0 +1,13 @@
+#version 330 core
+
+layout (location = 0) in vec2 inPosition;
+layout (location = 1) in vec2 inTexCoord;
+
+out vec2 uv;
+
+
+void main() {
+    // Positions are already in screen space, so no matrices are needed
+    uv = inTexCoord;
+    gl_Position = vec4(inPosition, 0.0, 1.0);
+}
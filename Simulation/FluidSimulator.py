@@ -0,0 +1,75 @@
+from settings import *
+from Simulation.fluidKernels import step_fluids
+from WorldObjects.voxelAccess import get_key_positions, get_neighbourhood, get_voxel_keys
+import World
+
+
+class FluidSimulator:
+    def __init__(self, world: 'World.World') -> None:
+        """
+        Class that simulates flowing fluids. Only voxels next to a recent change are kept in the active set and
+        evaluated each tick, so the cost depends on how much fluid is moving rather than the size of the world
+
+        :param World world: The world that the fluids flow in
+        """
+
+        self.world = world
+        self.app = world.app
+
+        # Keys of voxels to evaluate on the next tick, see get_voxel_keys
+        self.pendingKeys: list[np.array] = []
+        self.tickTimer = 0
+
+        # Statistics for the most recent tick
+        self.activeCount = 0
+        self.changedCount = 0
+
+
+    def wake(self, positions: np.array) -> None:
+        """
+        Adds voxels that have changed and their neighbours to the active set for the next tick
+
+        :param np.array positions: An (N, 3) integer array of world voxel positions that have changed
+        """
+
+        if len(positions):
+            self.pendingKeys.append(get_voxel_keys(get_neighbourhood(positions)))
+
+
+    def update(self) -> None:
+        "Runs a fluid tick every FLUID_TICK_TIME milliseconds"
+
+        self.tickTimer += self.app.deltaTime
+
+        if self.tickTimer >= FLUID_TICK_TIME:
+            # Slow frames only run one tick rather than trying to catch up
+            self.tickTimer = min(self.tickTimer - FLUID_TICK_TIME, FLUID_TICK_TIME)
+            self.tick()
+
+
+    def tick(self) -> None:
+        "Advances every active fluid voxel by one step, marking the affected chunks for rebuilding"
+
+        if not self.pendingKeys:
+            self.activeCount = self.changedCount = 0
+            return
+
+        keys = np.unique(np.concatenate(self.pendingKeys))
+        self.pendingKeys = []
+
+        # Any voxels over the per tick budget are carried over to the next tick
+        if len(keys) > FLUID_MAX_UPDATES_PER_TICK:
+            self.pendingKeys.append(keys[FLUID_MAX_UPDATES_PER_TICK:])
+            keys = keys[:FLUID_MAX_UPDATES_PER_TICK]
+
+        positions = get_key_positions(keys)
+        newVoxelIDs = np.empty(len(positions), dtype='uint8')
+        changed = np.empty(len(positions), dtype='bool')
+
+        step_fluids(positions, self.world.voxels, newVoxelIDs, changed)
+
+        self.activeCount = len(positions)
+        self.changedCount = np.count_nonzero(changed)
+
+        # Setting the voxels wakes their neighbours for the next tick
+        self.world.dirtyChunks |= self.world.set_voxels(positions[changed], newVoxelIDs[changed])
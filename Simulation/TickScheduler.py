@@ -0,0 +1,158 @@
+import heapq
+
+from settings import *
+from WorldObjects.voxelAccess import get_key_positions, get_neighbourhood, get_voxel_keys
+import World
+
+
+class TickScheduler:
+    def __init__(self, world: 'World.World', seed: int = None) -> None:
+        """
+        Class that runs scheduled block updates and random ticks. Scheduled updates are kept in a timing wheel with
+        one slot per upcoming tick (updates further away wait in an overflow heap), and each tick a few random
+        voxels are sampled from every chunk. All of the edits made in a tick are written to the world at once so
+        each chunk is only rebuilt once
+
+        :param World world: The world that the block updates happen in
+        :param int seed: The seed for the random tick sampling
+        """
+
+        self.world = world
+        self.app = world.app
+        self.rng = np.random.default_rng(seed)
+
+        self.currentTick = 0
+        self.tickTimer = 0
+
+        # Each slot holds arrays of voxel keys (see get_voxel_keys) that are due on a tick
+        self.wheel: list[list[np.array]] = [[] for _ in range(TICK_WHEEL_SIZE)]
+        self.overflow: list[tuple[int, int, np.array]] = []
+        self.overflowCount = 0
+
+        # Counters
+        self.queuedCount = 0
+        self.processedCount = 0
+        self.randomTickCount = 0
+
+
+    def schedule(self, positions: np.array, delay: int) -> None:
+        """
+        Schedules block updates for a batch of voxels
+
+        :param np.array positions: An (N, 3) integer array of world voxel positions inside the world
+        :param int delay: The number of ticks until the update happens (at least 1)
+        """
+
+        if not len(positions):
+            return
+
+        keys = get_voxel_keys(np.asarray(positions).reshape(-1, 3))
+        dueTick = self.currentTick + max(1, delay)
+
+        if delay < TICK_WHEEL_SIZE:
+            self.wheel[dueTick % TICK_WHEEL_SIZE].append(keys)
+        else:
+            heapq.heappush(self.overflow, (dueTick, self.overflowCount, keys))
+            self.overflowCount += 1
+
+        self.queuedCount += len(keys)
+
+
+    def on_voxels_changed(self, positions: np.array) -> None:
+        """
+        Schedules updates for any voxels next to an edit that react to their neighbours changing
+
+        :param np.array positions: An (N, 3) integer array of world voxel positions that have changed
+        """
+
+        if not len(positions):
+            return
+
+        neighbourhood = get_neighbourhood(positions)
+        voxelIDs = self.world.get_voxels(neighbourhood)
+
+        self.schedule(neighbourhood[VOXEL_FALLS[voxelIDs]], FALL_DELAY)
+
+
+    def update(self) -> None:
+        "Runs a tick every GAME_TICK_TIME milliseconds"
+
+        self.tickTimer += self.app.deltaTime
+
+        if self.tickTimer >= GAME_TICK_TIME:
+            # Slow frames only run one tick rather than trying to catch up
+            self.tickTimer = min(self.tickTimer - GAME_TICK_TIME, GAME_TICK_TIME)
+            self.tick()
+
+
+    def tick(self) -> None:
+        "Runs all of the block updates due this tick and the random ticks, marking the affected chunks for rebuilding"
+
+        self.currentTick += 1
+
+        # Moves updates from the overflow heap into the wheel once they are close enough
+        while self.overflow and self.overflow[0][0] - self.currentTick < TICK_WHEEL_SIZE:
+            dueTick, _, keys = heapq.heappop(self.overflow)
+            self.wheel[max(dueTick, self.currentTick) % TICK_WHEEL_SIZE].append(keys)
+
+        slot = self.wheel[self.currentTick % TICK_WHEEL_SIZE]
+        self.wheel[self.currentTick % TICK_WHEEL_SIZE] = []
+
+        writePositions = []
+        writeVoxelIDs = []
+
+        if slot:
+            # Unique keys are sorted by chunk so the updates are processed one chunk at a time
+            keys = np.unique(np.concatenate(slot))
+            self.queuedCount -= sum(len(slotKeys) for slotKeys in slot)
+            self.processedCount += len(keys)
+
+            self.run_falling_updates(get_key_positions(keys), writePositions, writeVoxelIDs)
+
+        self.run_random_ticks(writePositions, writeVoxelIDs)
+
+        if writePositions:
+            self.world.dirtyChunks |= self.world.set_voxels(np.concatenate(writePositions), np.concatenate(writeVoxelIDs))
+
+
+    def run_falling_updates(self, positions: np.array, writePositions: list[np.array], writeVoxelIDs: list[np.array]) -> None:
+        """
+        Moves falling voxels down by one voxel if there is nothing solid below them
+
+        :param np.array positions: An (N, 3) array of world positions with updates due this tick
+        :param list writePositions: A list that the positions of voxels to set are added to
+        :param list writeVoxelIDs: A list that the new voxel IDs are added to
+        """
+
+        voxelIDs = self.world.get_voxels(positions)
+        belowPositions = positions - (0, 1, 0)
+        belowIDs = self.world.get_voxels(belowPositions)
+
+        canFall = VOXEL_FALLS[voxelIDs] & (belowIDs != VOXEL_OUT_OF_WORLD) & ~VOXEL_SOLID[belowIDs]
+
+        # The voxel is moved by clearing its old position and then writing it below
+        writePositions += [positions[canFall], belowPositions[canFall]]
+        writeVoxelIDs += [np.zeros(np.count_nonzero(canFall), dtype='uint8'), voxelIDs[canFall].astype('uint8')]
+
+
+    def run_random_ticks(self, writePositions: list[np.array], writeVoxelIDs: list[np.array]) -> None:
+        """
+        Picks RANDOM_TICKS_PER_CHUNK random voxels from every chunk and advances the growth of any crops picked
+
+        :param list writePositions: A list that the positions of voxels to set are added to
+        :param list writeVoxelIDs: A list that the new voxel IDs are added to
+        """
+
+        voxelIndices = self.rng.integers(0, CHUNK_VOLUME, (WORLD_VOLUME, RANDOM_TICKS_PER_CHUNK))
+        voxelIDs = self.world.voxels[np.arange(WORLD_VOLUME)[:, None], voxelIndices]
+
+        chunkIndices, samples = np.nonzero(VOXEL_RANDOM_TICKS[voxelIDs])
+        self.randomTickCount += len(chunkIndices)
+
+        if not len(chunkIndices):
+            return
+
+        keys = chunkIndices.astype('int64') * CHUNK_VOLUME + voxelIndices[chunkIndices, samples]
+
+        writePositions.append(get_key_positions(keys))
+        writeVoxelIDs.append(voxelIDs[chunkIndices, samples] + 1)
@@ -0,0 +1,129 @@
+from settings import *
+from numba import prange
+from Meshes.chunkMeshBuilder import get_chunk_index
+from WorldObjects.voxelAccess import get_voxel_index
+
+
+# Offsets to the horizontal neighbours that fluids spread into
+HORIZONTAL_OFFSETS = np.array([(1, 0), (-1, 0), (0, 1), (0, -1)], dtype='int32')
+
+
+@njit
+def get_cell(x: int, y: int, z: int, worldVoxels: np.array) -> int:
+    """
+    Gets the voxel ID at a world position for the fluid simulation
+
+    :param int x: The world x coordinate of the voxel
+    :param int y: The world y coordinate of the voxel
+    :param int z: The world z coordinate of the voxel
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+
+    :returns: The voxel ID, or VOXEL_OUT_OF_WORLD if the position is outside of the world
+    """
+
+    chunkIndex = get_chunk_index((x, y, z))
+    if chunkIndex == -1:
+        return VOXEL_OUT_OF_WORLD
+
+    return worldVoxels[chunkIndex, get_voxel_index(x, y, z)]
+
+
+@njit
+def can_spread_sideways(x: int, y: int, z: int, worldVoxels: np.array) -> bool:
+    """
+    Checks whether a fluid voxel is resting on something, so it spreads sideways instead of falling
+
+    :param int x: The world x coordinate of the fluid voxel
+    :param int y: The world y coordinate of the fluid voxel
+    :param int z: The world z coordinate of the fluid voxel
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+
+    :returns: True if the voxel below is solid, a fluid source or outside of the world, otherwise False
+    """
+
+    belowID = get_cell(x, y - 1, z, worldVoxels)
+
+    if belowID == VOXEL_OUT_OF_WORLD:
+        return True
+
+    if VOXEL_FLUID_TYPE[belowID]:
+        return VOXEL_FLUID_LEVEL[belowID] == 0
+
+    return belowID != 0
+
+
+@njit
+def get_next_state(x: int, y: int, z: int, worldVoxels: np.array) -> int:
+    """
+    Works out what a voxel should become on the next fluid tick. Solid voxels and fluid sources never change, while
+    empty and flowing voxels take the strongest flow feeding them from above or from the side
+
+    :param int x: The world x coordinate of the voxel
+    :param int y: The world y coordinate of the voxel
+    :param int z: The world z coordinate of the voxel
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+
+    :returns: The voxel ID the voxel should have after the tick
+    """
+
+    voxelID = get_cell(x, y, z, worldVoxels)
+
+    if voxelID == VOXEL_OUT_OF_WORLD:
+        return voxelID
+
+    if voxelID and (not VOXEL_FLUID_TYPE[voxelID] or VOXEL_FLUID_LEVEL[voxelID] == 0):
+        return voxelID
+
+    bestType = 0
+    bestLevel = 0
+
+    # Fluid falling from above arrives almost full
+    aboveID = get_cell(x, y + 1, z, worldVoxels)
+    if aboveID > 0 and VOXEL_FLUID_TYPE[aboveID]:
+        bestType = VOXEL_FLUID_TYPE[aboveID]
+        bestLevel = 1
+
+    for direction in range(4):
+        adjX = x + HORIZONTAL_OFFSETS[direction, 0]
+        adjZ = z + HORIZONTAL_OFFSETS[direction, 1]
+
+        adjID = get_cell(adjX, y, adjZ, worldVoxels)
+        if adjID <= 0 or not VOXEL_FLUID_TYPE[adjID]:
+            continue
+
+        adjType = VOXEL_FLUID_TYPE[adjID]
+        level = VOXEL_FLUID_LEVEL[adjID] + 1
+
+        if level > FLUID_MAX_LEVELS[adjType] or (bestType and level >= bestLevel):
+            continue
+
+        if can_spread_sideways(adjX, y, adjZ, worldVoxels):
+            bestType = adjType
+            bestLevel = level
+
+    if not bestType:
+        return 0
+
+    return FLUID_BASE_IDS[bestType] + bestLevel
+
+
+@njit(parallel=True)
+def step_fluids(positions: np.array, worldVoxels: np.array, newVoxelIDs: np.array, changed: np.array) -> None:
+    """
+    Works out the next state of every active voxel. All voxels read the state from before the tick, so the order
+    they are processed in does not matter and nothing is written to the world
+
+    :param np.array positions: An (N, 3) array of world positions of the active voxels
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+    :param np.array newVoxelIDs: An (N,) output array for the voxel IDs after the tick
+    :param np.array changed: An (N,) boolean output array, set for every voxel that changes
+    """
+
+    for i in prange(positions.shape[0]):
+        x, y, z = positions[i, 0], positions[i, 1], positions[i, 2]
+
+        voxelID = get_cell(x, y, z, worldVoxels)
+        newVoxelID = get_next_state(x, y, z, worldVoxels)
+
+        newVoxelIDs[i] = max(newVoxelID, 0)
+        changed[i] = newVoxelID != voxelID
@@ -0,0 +1,230 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from settings import *
+from Profiling.StartupProfiler import StartupProfiler
+
+
+class StartupTask:
+    def __init__(self, name: str, function: Callable, dependencies: tuple[str, ...], onMainThread: bool) -> None:
+        """
+        Class for one step of startup, which runs once every task it depends on has finished
+
+        :param str name: The name of the task, which other tasks use to depend on it
+        :param Callable function: The function that does the work, whose return value is kept as the task's result
+        :param tuple dependencies: The names of the tasks that have to finish first
+        :param bool onMainThread: Whether the task has to run on the main thread, such as anything using OpenGL
+        """
+
+        self.name = name
+        self.function = function
+        self.dependencies = dependencies
+        self.onMainThread = onMainThread
+
+        self.isStarted = False
+        self.isFinished = False
+        self.result = None
+
+        # When the task ran in seconds since startup, and the thread it ran on
+        self.startTime: float = None
+        self.endTime: float = None
+        self.threadName: str = None
+
+
+class StartupPipeline:
+    def __init__(self, startupProfiler: StartupProfiler, workerCount: int = STARTUP_WORKERS) -> None:
+        """
+        Class that runs the steps of startup as a graph of tasks, each starting as soon as the tasks it depends on
+        have finished. Tasks that can run anywhere go to a thread pool, and tasks bound to the OpenGL context run on
+        the main thread, so reading files and generating the world overlap with opening the window
+
+        :param StartupProfiler startupProfiler: The profiler whose start time the timeline is measured from
+        :param int workerCount: The number of threads in the pool
+        """
+
+        self.startupProfiler = startupProfiler
+        self.workerCount = workerCount
+        self.tasks: dict[str, StartupTask] = {}
+        self.order: list[StartupTask] = []
+
+        # Guards the task states, and is notified whenever a task finishes
+        self.condition = threading.Condition()
+        self.error: BaseException = None
+        self.pool: ThreadPoolExecutor = None
+
+
+    def add(self, name: str, function: Callable, dependencies: tuple[str, ...] = (), onMainThread: bool = False) -> None:
+        """
+        Adds a task to the graph
+
+        :param str name: The name of the task, which other tasks use to depend on it
+        :param Callable function: The function that does the work, whose return value is kept as the task's result
+        :param tuple dependencies: The names of the tasks that have to finish first
+        :param bool onMainThread: Whether the task has to run on the main thread, such as anything using OpenGL
+        """
+
+        if name in self.tasks:
+            raise Exception(f"Startup task {name} has already been added")
+
+        self.tasks[name] = StartupTask(name, function, dependencies, onMainThread)
+
+
+    def get_order(self) -> list[StartupTask]:
+        """
+        Sorts the tasks so every task comes after the tasks it depends on
+
+        :returns: The tasks in dependency order
+        """
+
+        order = []
+        visiting = set()
+        visited = set()
+
+        def visit(task: StartupTask) -> None:
+            if task.name in visited:
+                return
+
+            if task.name in visiting:
+                raise Exception(f"Startup task {task.name} depends on itself")
+
+            visiting.add(task.name)
+
+            for dependency in task.dependencies:
+                if dependency not in self.tasks:
+                    raise Exception(f"Startup task {task.name} depends on {dependency}, which has not been added")
+
+                visit(self.tasks[dependency])
+
+            visiting.discard(task.name)
+            visited.add(task.name)
+            order.append(task)
+
+        for task in self.tasks.values():
+            visit(task)
+
+        return order
+
+
+    def run(self) -> dict[str, object]:
+        """
+        Runs every task, returning once they have all finished. An exception in any task stops the pipeline and is
+        raised again on the main thread
+
+        :returns: The result of each task by name
+        """
+
+        self.order = self.get_order()
+
+        with ThreadPoolExecutor(self.workerCount, thread_name_prefix="Startup") as self.pool:
+            while True:
+                with self.condition:
+                    self.submit_ready()
+
+                    task = self.get_ready_main_task()
+                    while task is None and self.error is None and not all(task.isFinished for task in self.order):
+                        self.condition.wait()
+                        task = self.get_ready_main_task()
+
+                    if self.error is not None:
+                        raise self.error
+
+                    if task is None:
+                        break
+
+                    task.isStarted = True
+
+                self.run_task(task)
+
+        return {task.name: task.result for task in self.order}
+
+
+    def is_ready(self, task: StartupTask) -> bool:
+        """
+        Checks whether a task can start
+
+        :param StartupTask task: The task to check
+
+        :returns: True if the task has not started and everything it depends on has finished, otherwise False
+        """
+
+        return not task.isStarted and all(self.tasks[dependency].isFinished for dependency in task.dependencies)
+
+
+    def get_ready_main_task(self) -> StartupTask:
+        """
+        Gets the first main thread task that can start
+
+        :returns: The task, or None if no main thread task can start yet
+        """
+
+        return next((task for task in self.order if task.onMainThread and self.is_ready(task)), None)
+
+
+    def submit_ready(self) -> None:
+        "Starts every pool task that can start on the thread pool. The condition has to be held when calling this"
+
+        if self.error is not None:
+            return
+
+        for task in self.order:
+            if not task.onMainThread and self.is_ready(task):
+                task.isStarted = True
+                self.pool.submit(self.run_pool_task, task)
+
+
+    def run_pool_task(self, task: StartupTask) -> None:
+        """
+        Runs a task on the thread pool, passing any exception on to the main thread
+
+        :param StartupTask task: The task to run
+        """
+
+        try:
+            self.run_task(task)
+
+        except BaseException as e:
+            with self.condition:
+                self.error = e
+                self.condition.notify_all()
+
+
+    def run_task(self, task: StartupTask) -> None:
+        """
+        Runs a task on the current thread and marks it as finished, starting any pool tasks that were waiting for it
+
+        :param StartupTask task: The task to run
+        """
+
+        task.threadName = threading.current_thread().name
+        task.startTime = time.perf_counter() - self.startupProfiler.startTime
+
+        task.result = task.function()
+
+        task.endTime = time.perf_counter() - self.startupProfiler.startTime
+
+        with self.condition:
+            task.isFinished = True
+            self.submit_ready()
+            self.condition.notify_all()
+
+
+    def report(self, width: int = 40) -> None:
+        """
+        Prints when each task ran and on which thread, with a bar showing where it falls in the startup
+
+        :param int width: The number of characters the whole startup is spread over
+        """
+
+        tasks = sorted(self.tasks.values(), key=lambda task: task.startTime)
+        endTime = max(task.endTime for task in tasks)
+
+        print(f"Startup timeline over {endTime:.2f} s")
+
+        for task in tasks:
+            start = int(task.startTime / endTime * width)
+            end = max(int(task.endTime / endTime * width), start + 1)
+            bar = " " * start + "#" * (end - start) + " " * (width - end)
+
+            print(f"  {task.name:<20}{task.threadName:<14}{task.startTime:7.3f} -{task.endTime:7.3f} s  |{bar}|")
@@ -0,0 +1,76 @@
+"""
+Checks that the binary mesher builds the same faces as the original mesher. The checks are plain functions that
+assert, so they run under pytest and are also run by the benchmark suite before anything is timed.
+
+    python -m pytest Tests
+"""
+
+from settings import *
+from Benchmarks.benchmarkUtils import build_world_voxels
+from Meshes.chunkMeshBuilder import build_chunk_mesh
+from Meshes.binaryMeshBuilder import build_chunk_mesh_binary, MAX_BINARY_CHUNK_SIZE
+
+
+SEEDS = (0, 1, 2)
+CHUNKS_PER_SEED = 4
+
+
+def get_faces(mesh: np.array) -> np.array:
+    """
+    Gets the faces of a mesh in sorted order, so meshes with the same faces added in a different order compare equal
+
+    :param np.array mesh: The vertex data of the mesh, with 6 vertices of 2 values per face
+
+    :returns: A (faces, 12) array with one face per row
+    """
+
+    assert len(mesh) % 12 == 0, f"Mesh of {len(mesh)} values does not hold whole faces"
+
+    faces = mesh.reshape(-1, 12)
+
+    return faces[np.lexsort(faces.T[::-1])]
+
+
+def check_meshes(worldVoxels: np.array, worldLight: np.array, chunkIndices: np.array) -> None:
+    """
+    Asserts that both meshers build the same faces for chunks of a world
+
+    :param np.array worldVoxels: The voxels of the world
+    :param np.array worldLight: The packed light levels of the world
+    :param np.array chunkIndices: The chunks to mesh
+    """
+
+    for chunkIndex in chunkIndices:
+        chunkPos = (chunkIndex % WORLD_WIDTH, chunkIndex // WORLD_AREA, chunkIndex // WORLD_WIDTH % WORLD_DEPTH)
+
+        mesh = build_chunk_mesh(worldVoxels[chunkIndex], 2, chunkPos, worldVoxels, worldLight)
+        binaryMesh = build_chunk_mesh_binary(worldVoxels[chunkIndex], 2, chunkPos, worldVoxels, worldLight)
+
+        assert np.array_equal(get_faces(mesh), get_faces(binaryMesh)), f"Binary mesh of chunk {chunkPos} does not match"
+
+
+def test_terrain_meshes_match() -> None:
+    "Checks every chunk of the generated terrain, with random light levels"
+
+    if CHUNK_SIZE > MAX_BINARY_CHUNK_SIZE:
+        return
+
+    worldVoxels = build_world_voxels()
+    worldLight = np.random.default_rng(0).integers(0, 256, worldVoxels.shape, dtype='uint8')
+
+    check_meshes(worldVoxels, worldLight, np.arange(WORLD_VOLUME))
+
+
+def test_noise_meshes_match() -> None:
+    "Checks a few chunks of random voxels for each seed, which gives every combination of neighbours"
+
+    if CHUNK_SIZE > MAX_BINARY_CHUNK_SIZE:
+        return
+
+    for seed in SEEDS:
+        rng = np.random.default_rng(seed)
+
+        worldVoxels = (rng.integers(1, 256, (WORLD_VOLUME, CHUNK_VOLUME)) * (rng.random((WORLD_VOLUME, CHUNK_VOLUME)) < 0.5)).astype('uint8')
+        worldLight = rng.integers(0, 256, worldVoxels.shape, dtype='uint8')
+
+        check_meshes(worldVoxels, worldLight, rng.choice(WORLD_VOLUME, CHUNKS_PER_SEED, replace=False))
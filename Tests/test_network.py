@@ -0,0 +1,79 @@
+"""
+Checks that chunks and voxel edits come back unchanged after being encoded for the network and decoded again
+
+    python -m pytest Tests
+"""
+
+from settings import *
+from Network.chunkCodec import CHUNK_CODECS, encode_chunk, decode_chunk
+from Network.protocol import MESSAGE_EDIT, MESSAGE_HEADER, pack_edits, unpack_edits, write_message
+
+
+class MessageRecorder:
+    def __init__(self) -> None:
+        "Class that stands in for a stream writer and keeps everything written to it"
+
+        self.data = b""
+
+
+    def writelines(self, parts: list) -> None:
+        """
+        Keeps the parts of a message
+
+        :param list parts: The bytes-like objects making up the message
+        """
+
+        self.data += b"".join(parts)
+
+
+def get_test_chunks() -> list[tuple[str, np.array, np.array]]:
+    """
+    Gets chunks that cover every size of palette, from a chunk of a single voxel ID up to one using every ID
+
+    :returns: A list of (description, voxels, light) tuples
+    """
+
+    rng = np.random.default_rng(0)
+    light = rng.integers(0, 256, CHUNK_VOLUME, dtype='uint8')
+
+    return [
+        ("empty", np.zeros(CHUNK_VOLUME, dtype='uint8'), np.zeros(CHUNK_VOLUME, dtype='uint8')),
+        ("single ID", np.full(CHUNK_VOLUME, 1, dtype='uint8'), light),
+        ("unloaded", np.full(CHUNK_VOLUME, UNLOADED_VOXEL_ID, dtype='uint8'), light),
+        ("two IDs", rng.choice(np.array([0, LIGHT_VOXEL_ID], dtype='uint8'), CHUNK_VOLUME), light),
+        ("five IDs", rng.choice(np.array([0, 1, 2, WATER_VOXEL_ID, 200], dtype='uint8'), CHUNK_VOLUME), light),
+        ("every ID", rng.integers(0, 256, CHUNK_VOLUME, dtype='uint8'), light),
+    ]
+
+
+def test_chunk_round_trip() -> None:
+    "Checks that every codec decodes the voxels and light it encoded"
+
+    for compression in CHUNK_CODECS:
+        for description, voxels, light in get_test_chunks():
+            decodedVoxels, decodedLight = decode_chunk(encode_chunk(voxels, light, compression))
+
+            assert np.array_equal(decodedVoxels, voxels), f"{compression} changed the voxels of a {description} chunk"
+            assert np.array_equal(decodedLight, light), f"{compression} changed the light of a {description} chunk"
+
+
+def test_edits_round_trip() -> None:
+    "Checks that edits sent as a message unpack to the same number, positions and voxel IDs they were packed with"
+
+    rng = np.random.default_rng(0)
+
+    for editCount in (0, 1, 1000):
+        positions = rng.integers(-2 ** 31, 2 ** 31, (editCount, 3), dtype='int32')
+        voxelIDs = rng.integers(0, 256, editCount, dtype='uint8')
+
+        recorder = MessageRecorder()
+        write_message(recorder, MESSAGE_EDIT, *pack_edits(editCount + 7, positions, voxelIDs))
+
+        messageType, size = MESSAGE_HEADER.unpack_from(recorder.data)
+        assert messageType == MESSAGE_EDIT and size == len(recorder.data) - MESSAGE_HEADER.size
+
+        number, unpackedPositions, unpackedVoxelIDs = unpack_edits(recorder.data[MESSAGE_HEADER.size:])
+
+        assert number == editCount + 7
+        assert np.array_equal(unpackedPositions, positions.reshape(-1, 3))
+        assert np.array_equal(unpackedVoxelIDs, voxelIDs)
@@ -1,44 +1,176 @@
+import hashlib
+import os
 import pygame
 import moderngl as mgl
 
 import Engine
+from settings import *
+
+
+# Changing how textures are decoded changes this, so older cache files are not used
+TEXTURE_CACHE_VERSION = 1
+
+# Block textures are drawn pixelated, and the filters that sample the smaller mip levels of a texture
+BLOCK_TEXTURE_FILTER = (mgl.NEAREST, mgl.NEAREST)
+MIPMAP_FILTERS = (mgl.NEAREST_MIPMAP_NEAREST, mgl.LINEAR_MIPMAP_NEAREST, mgl.NEAREST_MIPMAP_LINEAR, mgl.LINEAR_MIPMAP_LINEAR)
 
 
 class Textures:
-    def __init__(self, app: 'Engine.Engine'):
+    def __init__(self, app: 'Engine.Engine', blockTextureData: tuple[tuple[int, int, int], bytes] = None):
         """
         Class that stores data for a texture
 
         :param Engine app: The Engine instance that the texture is assocated with
+        :param tuple blockTextureData: The size and data of the block textures if they have already been loaded with
+        load_texture_data, otherwise they are loaded here
         """
-        
+
         self.app = app
         self.context = app.context
 
-        # Load texture
-        self.texture_0 = self.load_texture("DirtTexture.png")
+        # Load every block texture into one texture array, so drawing chunks only needs one texture bound
+        with app.startupProfiler.phase("Textures"):
+            self.blockTextures = self.load_texture_array(blockTextureData or self.load_texture_data(BLOCK_TEXTURES))
 
         # Assign Texture Unit
-        self.texture_0.use(location=0)
+        self.blockTextures.use(location=BLOCK_TEXTURE_UNIT)
+
+
+    @staticmethod
+    def load_texture_data(fileNames: tuple[str, ...]) -> tuple[tuple[int, int, int], bytes]:
+        """
+        Loads textures from the Assets folder as the layers of a texture array, in the order of the file names. The
+        decoded textures are cached, so they are only decoded again when a texture file changes. This does not need
+        the OpenGL context, so it can be done on another thread while the window opens
+
+        :param tuple fileNames: The filenames of the textures to load, which must all be the same size
+
+        :returns: The (width, height, layers) size of the texture array, and its data
+        """
+
+        cachePath = os.path.join(TEXTURE_CACHE_DIR, f"textures_{Textures.get_cache_key(fileNames)}.bin")
+
+        cachedTextures = Textures.load_cache(cachePath)
+        if cachedTextures:
+            return cachedTextures
+
+        size, data = Textures.decode_textures(fileNames)
+        Textures.save_cache(cachePath, size, data)
+
+        return size, data
+
+
+    def load_texture_array(self, textureData: tuple[tuple[int, int, int], bytes]) -> mgl.TextureArray:
+        """
+        Uploads loaded textures into the layers of a texture array
+
+        :param tuple textureData: The (width, height, layers) size of the texture array, and its data
+
+        :returns: An OpenGL texture array with a layer for each texture
+        """
+
+        size, data = textureData
+
+        textureArray = self.context.texture_array(size=size, components=4, data=data)
+        textureArray.anisotropy = 32.0
+
+        # Building mipmaps is most of the time taken to load the textures, so it is skipped when they would never be
+        # sampled
+        if BLOCK_TEXTURE_FILTER[0] in MIPMAP_FILTERS:
+            textureArray.build_mipmaps()
+
+        textureArray.filter = BLOCK_TEXTURE_FILTER
+
+        return textureArray
+
+
+    @staticmethod
+    def decode_textures(fileNames: tuple[str, ...]) -> tuple[tuple[int, int, int], bytes]:
+        """
+        Decodes textures from the Assets folder into RGBA data laid out as the layers of a texture array
+
+        :param tuple fileNames: The filenames of the textures to decode
+
+        :returns: The (width, height, layers) size of the texture array, and its data
+        """
+
+        layers = []
+
+        for fileName in fileNames:
+            texture = pygame.image.load(f"Assets/{fileName}")
+            texture = pygame.transform.flip(texture, flip_x=True, flip_y=False)
+
+            if layers and texture.get_size() != layers[0].get_size():
+                raise Exception(f"Texture {fileName} is {texture.get_size()}, not {layers[0].get_size()} like the other textures")
+
+            layers.append(texture)
+
+        width, height = layers[0].get_size()
+        data = b"".join(pygame.image.tostring(texture, "RGBA", False) for texture in layers)
+
+        return (width, height, len(layers)), data
 
 
-    def load_texture(self, fileName: str):
+    @staticmethod
+    def get_cache_key(fileNames: tuple[str, ...]) -> str:
         """
-        Loads a textures from the Assets folder with the provided file name
-        
-        :param str fileName: The filename of the texture to load
+        Gets a key that changes whenever the contents or order of the texture files change
+
+        :param tuple fileNames: The filenames of the textures
+
+        :returns: A hexadecimal key
         """
 
-        texture = pygame.image.load(f"Assets/{fileName}")
-        texture = pygame.transform.flip(texture, flip_x=True, flip_y=False)
-       
-        texture = self.context.texture(
-            size=texture.get_size(),
-            components=4,
-            data=pygame.image.tostring(texture, "RGBA", False),
-        )
-        texture.anisotropy = 32.0
-        texture.build_mipmaps()
-        texture.filter = (mgl.NEAREST, mgl.NEAREST)
+        cacheKey = hashlib.sha256(str(TEXTURE_CACHE_VERSION).encode())
+
+        for fileName in fileNames:
+            with open(f"Assets/{fileName}", "rb") as textureFile:
+                cacheKey.update(fileName.encode())
+                cacheKey.update(hashlib.sha256(textureFile.read()).digest())
+
+        return cacheKey.hexdigest()[:16]
+
+
+    @staticmethod
+    def load_cache(cachePath: str) -> tuple[tuple[int, int, int], bytes]:
+        """
+        Loads decoded textures from the cache
+
+        :param str cachePath: The path of the cache file
+
+        :returns: The size of the texture array and its data, or None if they are not cached
+        """
+
+        if not os.path.exists(cachePath):
+            return None
+
+        with open(cachePath, "rb") as cacheFile:
+            size = tuple(int(length) for length in np.frombuffer(cacheFile.read(12), dtype='int32'))
+            data = cacheFile.read()
+
+        # A file that was cut short is decoded again rather than used
+        if len(size) != 3 or len(data) != size[0] * size[1] * size[2] * 4:
+            return None
+
+        return size, data
+
+
+    @staticmethod
+    def save_cache(cachePath: str, size: tuple[int, int, int], data: bytes) -> None:
+        """
+        Saves decoded textures to the cache as the size of the texture array followed by its data
+
+        :param str cachePath: The path of the cache file
+        :param tuple size: The (width, height, layers) size of the texture array
+        :param bytes data: The data of the texture array
+        """
+
+        os.makedirs(TEXTURE_CACHE_DIR, exist_ok=True)
+
+        # Written to a temporary file first, so another process never reads a half written cache file
+        temporaryPath = f"{cachePath}.{os.getpid()}.tmp"
+        with open(temporaryPath, "wb") as cacheFile:
+            cacheFile.write(np.array(size, dtype='int32').tobytes())
+            cacheFile.write(data)
 
-        return texture
\ No newline at end of file
+        os.replace(temporaryPath, cachePath)
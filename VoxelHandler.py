@@ -1,5 +1,4 @@
 from settings import *
-from Meshes.chunkMeshBuilder import get_chunk_index
 import World
 from WorldObjects.Chunk import Chunk
 
@@ -13,6 +12,7 @@ class VoxelHandler:
         """
 
         self.app = world.app
+        self.world = world
         self.chunks = world.chunks
 
         # Results of ray casting
@@ -33,7 +33,8 @@ class VoxelHandler:
     def update(self) -> None:
         "Updates the VoxelHandler"
 
-        self.ray_cast()
+        with self.app.tracer.span("VoxelHandler.ray_cast"):
+            self.ray_cast()
 
 
     def switch_interaction_mode(self, interactionMode: int = -1) -> None:
@@ -49,15 +50,17 @@ class VoxelHandler:
             self.interactionMode = not self.interactionMode
 
     
-    def set_voxel(self) -> None:
+    def set_voxel(self, voxelID: int = None) -> None:
         """
         Either places or removes a block depending on the interaction Mode
         
+        :param int voxelID: The ID of the block to place (defaults to newVoxelID)
+
         :raises: Exception when interaction mode is invalid
         """
 
         if self.interactionMode == 1:
-            self.add_voxel()
+            self.add_voxel(voxelID)
         
         elif self.interactionMode == 0:
             self.remove_voxel()
@@ -66,21 +69,36 @@ class VoxelHandler:
             raise Exception(f"Invalid interaction mode when setting voxel: {self.interactionMode}")
 
 
-    def add_voxel(self) -> None:
-        "Places a block against the face of block that is currently being looked at"
+    def add_voxel(self, voxelID: int = None) -> None:
+        """
+        Places a block against the face of block that is currently being looked at
+
+        :param int voxelID: The ID of the block to place (defaults to newVoxelID)
+        """
 
         if self.voxelID:
-            # Check that the place we are going to place at is empty
+            voxelID = voxelID or self.newVoxelID
+
+            # Check that the place we are going to place at is empty and that a solid block won't trap the player
             result = self.get_voxel_id(self.voxelWorldPos + self.voxelNormal)
-            if not result[0]:
-                _, voxelIndex, _, chunk = result
-                chunk.voxels[voxelIndex] = self.newVoxelID
-                chunk.mesh.rebuild_mesh()
-                self.check_chunk_rebuilds()
+            if not result[0] and not (VOXEL_SOLID[voxelID] and self.is_inside_player(self.voxelWorldPos + self.voxelNormal)):
+                self.edit_voxel(self.voxelWorldPos + self.voxelNormal, voxelID)
+
+
+    def is_inside_player(self, voxelWorldPos: glm.ivec3) -> bool:
+        """
+        Checks whether a voxel overlaps the player's collision box
+
+        :param glm.ivec3 voxelWorldPos: The world position of the voxel
+
+        :returns: True if the voxel and the player's collision box overlap, otherwise False
+        """
+
+        playerPos = self.app.player.pos
+        playerMin = glm.vec3(playerPos.x - PLAYER_SIZE.x / 2, playerPos.y - PLAYER_EYE_HEIGHT, playerPos.z - PLAYER_SIZE.z / 2)
+        playerMax = playerMin + PLAYER_SIZE
 
-                # Marks empty chunks as not empty so they get rendered
-                if chunk.isEmpty:
-                    chunk.isEmpty = False
+        return all(voxelWorldPos[axis] < playerMax[axis] and voxelWorldPos[axis] + 1 > playerMin[axis] for axis in range(3))
 
 
     def remove_voxel(self) -> None:
@@ -88,43 +106,24 @@ class VoxelHandler:
 
         # Only remove a block if a block is in raycast
         if self.voxelID:
-            self.chunk.voxels[self.voxelIndex] = 0
-            self.chunk.mesh.rebuild_mesh()
-            self.check_chunk_rebuilds()
+            self.edit_voxel(self.voxelWorldPos, 0)
 
 
-    def rebuild_adjacent_chunk(self, adjVoxelPos: tuple[int, int, int]) -> None:
+    def edit_voxel(self, voxelWorldPos: tuple[int, int, int], voxelID: int) -> None:
         """
-        Rebuilds the mesh of an adjacent chunk
-        
-        :param tuple adjVoxelPos: The (x, y, z) coordinate of a voxel in the chunk that needs rebuilding
-        """
-        
-        index = get_chunk_index(adjVoxelPos)
-        if index != -1:
-            self.chunks[index].mesh.rebuild_mesh()
+        Sets a single voxel in the world and rebuilds the meshes of every chunk affected by the edit. When connected
+        to a server the edit is sent to it instead, and is made once the server sends it back
 
+        :param tuple voxelWorldPos: The (x, y, z) coordinate of the voxel to set
+        :param int voxelID: The ID to set the voxel to
+        """
 
-    def check_chunk_rebuilds(self) -> None:
-        "Checks to see which chunks need rebuilding around a certain block if it is on chunk boundaries"
-
-        localX, localY, localZ = self.voxelLocalPos
-        worldX, worldY, worldZ = self.voxelWorldPos
-
-        if localX == 0:
-            self.rebuild_adjacent_chunk((worldX - 1, worldY, worldZ))
-        elif localX == CHUNK_SIZE - 1:
-            self.rebuild_adjacent_chunk((worldX + 1, worldY, worldZ))
-
-        if localY == 0:
-            self.rebuild_adjacent_chunk((worldX, worldY - 1, worldZ))
-        elif localY == CHUNK_SIZE - 1:
-            self.rebuild_adjacent_chunk((worldX, worldY + 1, worldZ))
+        if self.app.worldClient:
+            self.app.worldClient.send_edits(np.array(voxelWorldPos, dtype='int32').reshape(1, 3), np.array([voxelID], dtype='uint8'))
+            return
 
-        if localZ == 0:
-            self.rebuild_adjacent_chunk((worldX, worldY, worldZ - 1))
-        elif localZ == CHUNK_SIZE - 1:
-            self.rebuild_adjacent_chunk((worldX, worldY, worldZ + 1))
+        for chunk in self.world.set_voxels(voxelWorldPos, voxelID):
+            chunk.mesh.rebuild_mesh()
 
 
     def ray_cast(self) -> bool:
@@ -157,7 +156,9 @@ class VoxelHandler:
         while not (maxX > 1.0 and maxY > 1.0 and maxZ > 1.0):
             # Updates voxel information for the collided voxel
             result = self.get_voxel_id(currentVoxelPos)
-            if result[0]:
+
+            # Chunks that have not been loaded yet are not drawn, so the ray passes through them
+            if result[0] and result[0] != UNLOADED_VOXEL_ID:
                 self.voxelID, self.voxelIndex, self.voxelLocalPos, self.chunk = result
                 self.voxelWorldPos = currentVoxelPos
 
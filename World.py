@@ -1,57 +1,247 @@
 from settings import *
 from WorldObjects.Chunk import Chunk
+from WorldObjects.ChunkLoader import ChunkLoader
+from WorldObjects.ChunkRegistry import ChunkRegistry
+from WorldObjects.VoxelSnapshots import VoxelSnapshots
+from Meshes.MeshWorker import MeshWorker
+from WorldObjects.HeightmapCache import HeightmapCache
+from WorldObjects.SurfaceHeightmap import SurfaceHeightmap
 from VoxelHandler import VoxelHandler
+from Physics.SolidityGrid import SolidityGrid
+from Lighting.LightEngine import LightEngine
+from Simulation.FluidSimulator import FluidSimulator
+from Simulation.TickScheduler import TickScheduler
+from WorldObjects.rayCaster import ray_cast_batch
+from WorldObjects.voxelAccess import get_voxels_batch, set_voxels_batch
 import Engine
 
 
 class World:
-    def __init__(self, app: 'Engine.Engine') -> None:
+    def __init__(self, app: 'Engine.Engine', publishSnapshots: bool = False) -> None:
         """
         Class that stores all of the data for the world
         
         :param Engine app: The current engine that the world is associated to
+        :param bool publishSnapshots: Whether read only snapshots of the chunks are published for the world server,
+        which the background mesh worker turns on as well
         """
 
         self.app = app
 
         self.chunks: list[Chunk] = [None for _ in range(WORLD_VOLUME)]
-        self.voxels = np.empty([WORLD_VOLUME, CHUNK_VOLUME], dtype='uint8')
+        self.chunkRegistry = ChunkRegistry()
+        self.dirtyChunks: set[Chunk] = set()
+
+        # The (positions, voxel IDs) of every voxel changed, only kept while something collects them such as the server
+        self.editLog: list[tuple[np.array, np.array]] = None
+
+        # Counters used by the performance reports
+        self.meshBuildCount = 0
+        self.drawCallCount = 0
+        self.uploadedVertexCount = 0
+        self.voxels = np.full([WORLD_VOLUME, CHUNK_VOLUME], UNLOADED_VOXEL_ID, dtype='uint8')
+        self.heightmapCache = HeightmapCache()
         self.build_chunks()
-        self.build_chunk_meshes()
+        self.lightEngine = LightEngine(self)
+
+        # Every write copies the chunks it changed into a snapshot, so they are only kept while something reads them
+        self.voxelSnapshots = VoxelSnapshots(self) if publishSnapshots or BACKGROUND_MESHING else None
+        self.meshWorker = MeshWorker(self) if BACKGROUND_MESHING else None
+        self.solidityGrid = SolidityGrid(self.voxels)
+        self.surfaceHeightmap = SurfaceHeightmap(self.voxels)
+        self.record_chunk_memory()
+        self.fluidSimulator = FluidSimulator(self)
+        self.tickScheduler = TickScheduler(self, self.app.seed)
         self.voxelHandler = VoxelHandler(self)
 
+        # The chunks around the player are generated straight away and meshed by load_initial once the shaders are
+        # ready, and the rest are streamed in over the next frames
+        self.chunkLoader = ChunkLoader(self)
+        self.chunkLoader.generate_initial()
+
 
     def build_chunks(self) -> None:
-        "Builds the voxels for all of the chunks in the world"
+        "Creates all of the chunks in the world, their voxels are generated later by the chunk loader"
 
         for x in range(WORLD_WIDTH):
             for y in range(WORLD_HEIGHT):
                 for z in range(WORLD_DEPTH):
                     chunk = Chunk(self, position=(x, y, z))
 
-                    chunk_index = x + WORLD_HEIGHT * z + WORLD_AREA * y
+                    chunk_index = x + WORLD_WIDTH * z + WORLD_AREA * y
                     
                     self.chunks[chunk_index] = chunk
-                    self.voxels[chunk_index] = chunk.build_voxels()
-
                     chunk.voxels = self.voxels[chunk_index]
 
 
-    def build_chunk_meshes(self) -> None:
-        "Builds the meshes for all of the chunks"
+    def record_chunk_memory(self) -> None:
+        "Records the voxel, light and solidity storage held by each chunk with the memory tracker"
+
+        for chunkIndex, chunk in enumerate(self.chunks):
+            self.app.memoryTracker.allocate("Voxels", chunk, self.voxels[chunkIndex].nbytes)
+            self.app.memoryTracker.allocate("Light", chunk, self.lightEngine.light[chunkIndex].nbytes)
+            self.app.memoryTracker.allocate("Solidity", chunk, self.solidityGrid.bits[chunkIndex].nbytes)
+
+        # Heights are stored per chunk column, so they are counted against the bottom chunk of each column
+        for columnIndex in range(WORLD_AREA):
+            self.app.memoryTracker.allocate("Heightmap", self.chunks[columnIndex], self.surfaceHeightmap.heights[columnIndex].nbytes)
+
+
+    def get_voxels(self, positions: np.array) -> np.array:
+        """
+        Gets the IDs of many voxels at once
+
+        :param np.array positions: An (N, 3) integer array of world voxel positions
+
+        :returns: An (N,) array of voxel IDs, with VOXEL_OUT_OF_WORLD for positions outside of the world
+        """
+
+        positions = np.ascontiguousarray(positions, dtype='int32').reshape(-1, 3)
+        voxelIDs = np.empty(len(positions), dtype='int16')
+
+        get_voxels_batch(positions, self.voxels, voxelIDs)
+
+        return voxelIDs
+
+
+    def set_voxels(self, positions: np.array, voxelIDs: np.array, simulate: bool = True) -> set[Chunk]:
+        """
+        Sets many voxels at once, updating the collision and light data around them and waking nearby fluids and
+        block updates. Positions outside of the world are ignored and meshes are not rebuilt, so the caller decides
+        when to rebuild the returned chunks
+
+        :param np.array positions: An (N, 3) integer array of world voxel positions
+        :param np.array voxelIDs: An (N,) array of voxel IDs, or a single ID to write to every position
+        :param bool simulate: Whether to wake the fluids and block updates around the voxels, which is turned off for
+        edits from a world server as the simulations only run on the server
+
+        :returns: The set of chunks whose meshes need rebuilding
+
+        :raises: Exception when a voxel ID does not fit in the 8 bit world voxels
+        """
+
+        positions = np.ascontiguousarray(positions, dtype='int32').reshape(-1, 3)
+        voxelIDs = np.broadcast_to(voxelIDs, len(positions))
+
+        # The vertex layout can carry 16 bit voxel IDs but the world stores 8 bit IDs, so larger IDs would wrap around
+        isOutOfRange = (voxelIDs < 0) | (voxelIDs > 255)
+        if np.any(isOutOfRange):
+            raise Exception(f"Voxel IDs must be between 0 and 255 to be stored in the world: {voxelIDs[isOutOfRange][0]}")
+
+        voxelIDs = voxelIDs.astype('uint8')
+        dirtyChunks = np.zeros(WORLD_VOLUME, dtype='bool')
+        changed = np.zeros(len(positions), dtype='bool')
+
+        set_voxels_batch(positions, voxelIDs, self.voxels, dirtyChunks, changed)
+
+        changedPositions = positions[changed]
+        if self.editLog is not None and len(changedPositions):
+            self.editLog.append((changedPositions, voxelIDs[changed]))
+
+        self.solidityGrid.update_voxels(changedPositions)
+        self.surfaceHeightmap.update_voxels(changedPositions)
+        self.lightEngine.update_voxels(changedPositions, dirtyChunks)
+        if self.voxelSnapshots:
+            self.voxelSnapshots.publish(np.flatnonzero(dirtyChunks))
+
+        if simulate:
+            self.fluidSimulator.wake(changedPositions)
+            self.tickScheduler.on_voxels_changed(changedPositions)
+
+        # Chunks without a mesh yet will be built with the new voxels by the chunk loader
+        chunks = {self.chunks[chunkIndex] for chunkIndex in np.flatnonzero(dirtyChunks) if self.chunks[chunkIndex].mesh}
+
+        # Marks empty chunks that have been written to as not empty so they get rendered
+        for chunk in chunks:
+            if chunk.isEmpty and np.any(chunk.voxels):
+                chunk.isEmpty = False
 
-        for chunk in self.chunks:
-            chunk.build_mesh()
+        return chunks
+
+
+    def ray_cast(self, origins: np.array, directions: np.array, maxDistance: float = MAX_PLAYER_REACH) -> tuple[np.array, np.array, np.array, np.array]:
+        """
+        Casts a batch of rays into the world in parallel and returns information about the first voxel each ray hits
+
+        :param np.array origins: An (N, 3) array of ray start positions in world space
+        :param np.array directions: An (N, 3) array of ray directions
+        :param float maxDistance: The maximum distance each ray can travel
+
+        :returns: hitPositions (N, 3), hitNormals (N, 3), voxelIDs (N,) and distances (N,). Rays that miss have a voxelID of 0 and a distance of infinity
+        """
+
+        origins = np.ascontiguousarray(origins, dtype='float32').reshape(-1, 3)
+        directions = np.ascontiguousarray(directions, dtype='float32').reshape(-1, 3)
+
+        if origins.shape != directions.shape:
+            raise Exception(f"Ray origins and directions must have the same shape: {origins.shape} != {directions.shape}")
+
+        rayCount = len(origins)
+        hitPositions = np.empty((rayCount, 3), dtype='int32')
+        hitNormals = np.empty((rayCount, 3), dtype='int8')
+        voxelIDs = np.empty(rayCount, dtype='uint8')
+        distances = np.empty(rayCount, dtype='float32')
+
+        ray_cast_batch(origins, directions, float(maxDistance), self.voxels, hitPositions, hitNormals, voxelIDs, distances)
+
+        return hitPositions, hitNormals, voxelIDs, distances
+
+
+    def update_frame(self) -> None:
+        """
+        Streams in more of the world within the per frame loading budget and mesh upload limit. When connected to a
+        server, the chunks and edits it has sent are applied first
+        """
+
+        if self.app.worldClient:
+            with self.app.tracer.span("World client"):
+                self.app.worldClient.update_position(self.app.player.pos)
+                self.app.worldClient.apply_received(self)
+
+        with self.app.tracer.span("Chunk loading"):
+            self.chunkLoader.update(uploadLimit=self.app.qualityController.meshUploadLimit)
+
+        if self.meshWorker:
+            with self.app.tracer.span("Mesh worker uploads"):
+                self.meshWorker.upload_finished()
 
 
     def update(self) -> None:
-        "Updates the world"
+        "Updates the world. When connected to a server the simulations run there, and their edits are sent to the world"
 
         self.voxelHandler.update()
 
+        if not self.app.worldClient:
+            self.fluidSimulator.update()
+            self.tickScheduler.update()
+
+        self.rebuild_dirty_chunks()
+
+
+    def rebuild_dirty_chunks(self) -> None:
+        """
+        Rebuilds the mesh of every chunk changed by the simulations this frame, so each chunk is rebuilt at most once.
+        With background meshing they are queued on the mesh worker instead
+        """
+
+        for chunk in self.dirtyChunks:
+            if self.meshWorker:
+                self.meshWorker.submit(chunk.index)
+            else:
+                chunk.mesh.rebuild_mesh()
+
+        self.dirtyChunks.clear()
+
 
     def render(self) -> None:
-        "Renders all of the chunks in the world"
+        "Renders the chunks in view within the render distance of the player, nearest first"
+
+        self.drawCallCount = 0
+        player = self.app.player
+
+        with self.app.tracer.span("World.render"):
+            drawOrder = self.chunkRegistry.get_draw_order(player.pos, player.projectionMatrix * player.viewMatrix,
+                                                          self.app.qualityController.renderDistance)
 
-        for chunk in self.chunks:
-            chunk.render()
\ No newline at end of file
+            for chunkIndex in drawOrder:
+                self.drawCallCount += self.chunks[chunkIndex].render()
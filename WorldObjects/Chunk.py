@@ -6,9 +6,12 @@ import World
 
 
 class Chunk:
+    __slots__ = ("world", "app", "registry", "index", "voxels", "mesh")
+
     def __init__(self, world: 'World.World', position: tuple[int, int, int]) -> None:
         """
-        Class that stores all of the data for a chunk
+        Class for a chunk, whose position, flags and mesh sizes are kept in the world's chunk registry so they can
+        be processed for every chunk at once
 
         :param World world: The world that the chunk is in
         :param tuple position: The (x, y, z) position of the chunk in the world
@@ -16,11 +19,38 @@ class Chunk:
 
         self.world = world
         self.app = world.app
-        self.position = position
-        self.modelMatrix = self.get_model_matrix()
+        self.registry = world.chunkRegistry
+        self.index = position[0] + WORLD_WIDTH * position[2] + WORLD_AREA * position[1]
         self.voxels: np.array = None
         self.mesh: ChunkMesh = None
-        self.isEmpty = True
+
+        self.registry.set_position(self.index, position)
+
+
+    @property
+    def position(self) -> tuple[int, int, int]:
+        "The (x, y, z) position of the chunk in the world"
+
+        return tuple(self.registry.positions[self.index].tolist())
+
+
+    @property
+    def modelMatrix(self) -> np.array:
+        "The model matrix of the chunk, stored column major"
+
+        return self.registry.modelMatrices[self.index]
+
+
+    @property
+    def isEmpty(self) -> bool:
+        "Whether the chunk has no solid voxels"
+
+        return bool(self.registry.isEmpty[self.index])
+
+
+    @isEmpty.setter
+    def isEmpty(self, isEmpty: bool) -> None:
+        self.registry.isEmpty[self.index] = isEmpty
 
     
     def build_voxels(self) -> np.array:
@@ -30,23 +60,15 @@ class Chunk:
         :returns: A numpy array of block types stored as 8-bit integers
         """
 
-        # Empty Chunk for now
-        voxels = np.zeros(CHUNK_VOLUME, dtype='uint8')
-
-        # fill chunk
-        chunkX, chunkY, chunkZ = glm.ivec3(self.position) * CHUNK_SIZE
+        chunkX, chunkY, chunkZ = self.position
         chunkBlockType = random.randrange(1, 100)
 
-        for x in range(CHUNK_SIZE):
-            for z in range(CHUNK_SIZE):
-                worldX = x + chunkX
-                worldZ = z + chunkZ
-                worldHeight = int(glm.simplex(glm.vec2(worldX, worldZ) * 0.01) * 32 + 32)
-                localHeight = min(worldHeight - chunkY, CHUNK_SIZE)
+        # The heights are shared by every chunk in the column, and are indexed [z, x] to match the voxel layout
+        localHeights = self.world.heightmapCache.get_tile(chunkX, chunkZ) - chunkY * CHUNK_SIZE
 
-                for y in range(localHeight):
-                    worldY = y + chunkY
-                    voxels[x + CHUNK_SIZE * z + CHUNK_AREA * y] = chunkBlockType
+        # Fills every voxel below the terrain height, with voxels laid out as [y, z, x]
+        isSolid = np.arange(CHUNK_SIZE).reshape(-1, 1, 1) < localHeights
+        voxels = (isSolid * np.uint8(chunkBlockType)).ravel()
 
         if np.any(voxels):
             self.isEmpty = False
@@ -60,27 +82,22 @@ class Chunk:
         self.mesh = ChunkMesh(self)
 
 
-    def get_model_matrix(self) -> np.array:
-        """
-        Gets the model matrix for the current chunk
-        
-        :returns: A numpy array representing the model matrix
-        """
-
-        modelMatrix = glm.translate(glm.mat4(), glm.vec3(self.position) * CHUNK_SIZE)
-        
-        return modelMatrix
-    
-
     def set_uniform(self) -> None:
         "Sets the uniforms for the chunk mesh"
 
         self.mesh.shaderProgram['modelMatrix'].write(self.modelMatrix)
 
 
-    def render(self) -> None:
-        "Renders the current chunk"
+    def render(self) -> bool:
+        """
+        Renders the current chunk
+
+        :returns: True if the chunk was drawn, otherwise False
+        """
         
-        if not self.isEmpty:
+        if not self.isEmpty and self.mesh:
             self.set_uniform()
-            self.mesh.render()
\ No newline at end of file
+            self.mesh.render()
+            return True
+
+        return False
\ No newline at end of file
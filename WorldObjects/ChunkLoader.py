@@ -0,0 +1,335 @@
+import time
+from collections import deque
+
+from settings import *
+import World
+
+
+class ChunkLoader:
+    def __init__(self, world: 'World.World') -> None:
+        """
+        Class that generates, lights and meshes the world progressively, one chunk column at a time starting with
+        the columns nearest to the player. A column is only meshed once the columns around it have been generated,
+        so its border faces and light are correct the first time it is built. When connected to a server, columns
+        are received from it instead of being generated, and are meshed in the order they arrive
+
+        :param World world: The world to load
+        """
+
+        self.world = world
+        self.startupProfiler = world.app.startupProfiler
+        self.startTime = time.perf_counter()
+        self.loadTime: float = None
+
+        # Chunk columns ordered by distance from the player's starting position
+        playerColumn = glm.vec2(PLAYER_POS.x, PLAYER_POS.z) / CHUNK_SIZE
+        self.columns = sorted(
+            ((x, z) for x in range(WORLD_WIDTH) for z in range(WORLD_DEPTH)),
+            key=lambda column: glm.distance(glm.vec2(column) + 0.5, playerColumn))
+
+        self.isGenerated = np.zeros((WORLD_WIDTH, WORLD_DEPTH), dtype='bool')
+        self.isMeshed = np.zeros((WORLD_WIDTH, WORLD_DEPTH), dtype='bool')
+
+        # The chunks received from the server and the columns that have been received in full but not meshed yet
+        self.isRemote = world.app.worldClient is not None
+        self.isReceived = np.zeros(WORLD_VOLUME, dtype='bool')
+        self.receivedColumns: deque[tuple[int, int]] = deque()
+
+        self.steps = self.receive_steps() if self.isRemote else self.load_steps()
+        self.isLoaded = False
+
+        # The number of meshes built or rebuilt by the loader since the start of the frame
+        self.uploadCount = 0
+
+
+    def load_steps(self):
+        "Generator that does one small piece of loading work each time it is advanced"
+
+        for columnX, columnZ in self.columns:
+            # Columns around the player may have been generated ahead of time by generate_initial
+            if not self.isGenerated[columnX, columnZ]:
+                yield from self.generate_column(columnX, columnZ)
+
+            yield from self.mesh_ready_columns(columnX, columnZ)
+
+
+    def receive_steps(self):
+        """
+        Generator that meshes the columns received from the server one piece at a time, yielding False while it is
+        waiting for the server to send more of the world. It finishes once every column in view has been meshed
+        """
+
+        while self.receivedColumns or not np.all(self.isMeshed[self.get_load_area()]):
+            if not self.receivedColumns:
+                yield False
+                continue
+
+            yield from self.mesh_ready_columns(*self.receivedColumns.popleft())
+
+
+    def mesh_ready_columns(self, columnX: int, columnZ: int):
+        """
+        Generator that meshes a chunk at a time every column around a newly generated column that is now ready
+
+        :param int columnX: The x position of the chunk column that was generated
+        :param int columnZ: The z position of the chunk column that was generated
+        """
+
+        for adjX in range(columnX - 1, columnX + 2):
+            for adjZ in range(columnZ - 1, columnZ + 2):
+                if self.is_column_ready(adjX, adjZ):
+                    self.isMeshed[adjX, adjZ] = True
+
+                    for chunkY in range(WORLD_HEIGHT):
+                        with self.startupProfiler.phase("Meshing and upload"):
+                            self.world.chunks[adjX + WORLD_WIDTH * adjZ + WORLD_AREA * chunkY].build_mesh()
+                        self.uploadCount += 1
+                        yield
+
+
+    def generate_column(self, columnX: int, columnZ: int):
+        """
+        Generator that generates and lights a chunk column a piece at a time
+
+        :param int columnX: The x position of the chunk column
+        :param int columnZ: The z position of the chunk column
+        """
+
+        for chunkY in range(WORLD_HEIGHT):
+            self.generate_chunk(columnX + WORLD_WIDTH * columnZ + WORLD_AREA * chunkY)
+            yield
+
+        with self.startupProfiler.phase("Generation"):
+            self.world.surfaceHeightmap.update_column(columnX, columnZ)
+
+        dirtyChunks = np.zeros(WORLD_VOLUME, dtype='bool')
+        with self.startupProfiler.phase("Lighting"):
+            self.world.lightEngine.light_column(columnX, columnZ, dirtyChunks)
+        self.isGenerated[columnX, columnZ] = True
+
+        # The new column's voxels are published along with every chunk whose light changed
+        dirtyChunks[columnX + WORLD_WIDTH * columnZ + WORLD_AREA * np.arange(WORLD_HEIGHT)] = True
+        if self.world.voxelSnapshots:
+            self.world.voxelSnapshots.publish(np.flatnonzero(dirtyChunks))
+        yield
+
+        # Chunks that were already meshed are rebuilt if the new column changed their light
+        for chunkIndex in np.flatnonzero(dirtyChunks):
+            chunk = self.world.chunks[chunkIndex]
+            if chunk.mesh:
+                with self.startupProfiler.phase("Meshing and upload"):
+                    chunk.mesh.rebuild_mesh()
+                self.uploadCount += 1
+                yield
+
+
+    def generate_chunk(self, chunkIndex: int) -> None:
+        """
+        Generates the voxels of a chunk and updates the collision data for it
+
+        :param int chunkIndex: The index of the chunk to generate
+        """
+
+        with self.startupProfiler.phase("Generation"):
+            self.world.voxels[chunkIndex] = self.world.chunks[chunkIndex].build_voxels()
+            self.world.solidityGrid.update_chunk(chunkIndex)
+
+
+    def receive_chunk(self, chunkIndex: int, voxels: np.array, light: np.array) -> None:
+        """
+        Stores a chunk sent by the server in place of generating it. Its column is queued to be meshed once every
+        chunk in it has arrived, and a chunk that is sent again after it has been meshed is rebuilt
+
+        :param int chunkIndex: The index of the chunk
+        :param np.array voxels: The voxels of the chunk
+        :param np.array light: The packed light levels of the chunk
+        """
+
+        chunk = self.world.chunks[chunkIndex]
+        self.world.voxels[chunkIndex] = voxels
+        self.world.lightEngine.light[chunkIndex] = light
+        self.world.solidityGrid.update_chunk(chunkIndex)
+        if self.world.voxelSnapshots:
+            self.world.voxelSnapshots.publish(np.array([chunkIndex]))
+        chunk.isEmpty = not np.any(voxels)
+        self.isReceived[chunkIndex] = True
+
+        if chunk.mesh:
+            self.world.dirtyChunks.add(chunk)
+
+        columnX, columnZ = chunkIndex % WORLD_WIDTH, chunkIndex // WORLD_WIDTH % WORLD_DEPTH
+        columnIndices = columnX + WORLD_WIDTH * columnZ + WORLD_AREA * np.arange(WORLD_HEIGHT)
+
+        if not self.isGenerated[columnX, columnZ] and np.all(self.isReceived[columnIndices]):
+            self.world.surfaceHeightmap.update_column(columnX, columnZ)
+            self.isGenerated[columnX, columnZ] = True
+            self.receivedColumns.append((columnX, columnZ))
+
+            # Columns that come into view after the loader finished are meshed by starting it again
+            if self.isLoaded:
+                self.steps = self.receive_steps()
+                self.isLoaded = False
+
+
+    def is_column_ready(self, columnX: int, columnZ: int) -> bool:
+        """
+        Checks whether a chunk column can be meshed, which is when it and all of its neighbours have been generated
+
+        :param int columnX: The x position of the chunk column
+        :param int columnZ: The z position of the chunk column
+
+        :returns: True if the column is ready to mesh and has not been meshed yet, otherwise False
+        """
+
+        if not (0 <= columnX < WORLD_WIDTH and 0 <= columnZ < WORLD_DEPTH) or self.isMeshed[columnX, columnZ]:
+            return False
+
+        return bool(np.all(self.isGenerated[max(columnX - 1, 0):columnX + 2, max(columnZ - 1, 0):columnZ + 2]))
+
+
+    def get_load_area(self) -> tuple[slice, slice]:
+        """
+        Gets the chunk columns the loader meshes, which is every column unless the world comes from a server, where
+        it is the columns within the client's view distance
+
+        :returns: The x and z ranges of the columns as slices
+        """
+
+        if self.isRemote:
+            return self.world.app.worldClient.get_view_area()
+
+        return slice(None), slice(None)
+
+
+    def get_pending_mesh_count(self) -> int:
+        """
+        Counts the chunks that are still waiting to be meshed for the first time
+
+        :returns: The number of chunks
+        """
+
+        return int(np.count_nonzero(~self.isMeshed[self.get_load_area()])) * WORLD_HEIGHT
+
+
+    def run_step(self) -> bool:
+        """
+        Does the next piece of loading work
+
+        :returns: True if there is more work left, otherwise False
+        """
+
+        if self.isLoaded:
+            return False
+
+        try:
+            return next(self.steps) is not False
+
+        except StopIteration:
+            self.isLoaded = True
+
+            # Only the first load is timed, as the loader restarts whenever more of the world comes into view
+            if self.loadTime is None:
+                self.loadTime = time.perf_counter() - self.startTime
+                self.startupProfiler.report("World fully loaded")
+
+            return False
+
+
+    def wait_for_step(self) -> bool:
+        """
+        Does the next piece of loading work, waiting for the server to send more of the world if there is none yet
+
+        :returns: True if there is more work left, otherwise False
+        """
+
+        while not self.run_step():
+            if self.isLoaded:
+                return False
+
+            self.world.app.worldClient.apply_received(self.world, wait=True)
+
+        return True
+
+
+    def load_all(self) -> None:
+        "Loads the rest of the world straight away"
+
+        while self.wait_for_step():
+            pass
+
+
+    def generate_all(self) -> None:
+        "Generates and lights every column without meshing any of them, for worlds that are never drawn"
+
+        for columnX, columnZ in self.columns:
+            if not self.isGenerated[columnX, columnZ]:
+                for _ in self.generate_column(columnX, columnZ):
+                    pass
+
+
+    def get_initial_area(self, radius: int) -> tuple[slice, slice]:
+        """
+        Gets the chunk columns within a radius of the player's starting column
+
+        :param int radius: The number of chunk columns around the player's column
+
+        :returns: The x and z ranges of the columns as slices
+        """
+
+        playerX, playerZ = int(PLAYER_POS.x // CHUNK_SIZE), int(PLAYER_POS.z // CHUNK_SIZE)
+
+        return (slice(max(playerX - radius, 0), min(playerX + radius + 1, WORLD_WIDTH)),
+                slice(max(playerZ - radius, 0), min(playerZ + radius + 1, WORLD_DEPTH)))
+
+
+    def generate_initial(self, radius: int = INITIAL_LOAD_RADIUS) -> None:
+        """
+        Generates every column that load_initial needs, which is the columns within the radius and the columns
+        around them, without meshing any of them. Nothing is drawn with OpenGL, so this can run on another thread
+        while the window opens, as long as nothing has been meshed yet. Columns are generated in the same order as
+        the loader would, so the world is the same either way
+
+        :param int radius: The number of chunk columns around the player's column that load_initial will load
+        """
+
+        # Columns are received from the server rather than generated
+        if self.isRemote:
+            return
+
+        area = self.get_initial_area(radius + 1)
+
+        for columnX, columnZ in self.columns:
+            if np.all(self.isGenerated[area]):
+                return
+
+            if not self.isGenerated[columnX, columnZ]:
+                for _ in self.generate_column(columnX, columnZ):
+                    pass
+
+
+    def load_initial(self, radius: int = INITIAL_LOAD_RADIUS) -> None:
+        """
+        Loads the columns within a radius of the player straight away, so there is terrain to stand on in the first frame
+
+        :param int radius: The number of chunk columns around the player's column to load
+        """
+
+        area = self.get_initial_area(radius)
+
+        while not np.all(self.isMeshed[area]) and self.wait_for_step():
+            pass
+
+
+    def update(self, budget: float = WORLD_LOAD_BUDGET, uploadLimit: int = None) -> None:
+        """
+        Loads as much of the world as fits in the time budget and the limit on meshes uploaded
+
+        :param float budget: The time that can be spent loading in milliseconds
+        :param int uploadLimit: The most meshes that can be built or rebuilt, or None for no limit
+        """
+
+        deadline = time.perf_counter() + budget * 0.001
+        self.uploadCount = 0
+
+        while time.perf_counter() < deadline and (uploadLimit is None or self.uploadCount < uploadLimit) and self.run_step():
+            pass
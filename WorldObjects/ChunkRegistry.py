@@ -0,0 +1,144 @@
+from settings import *
+
+
+class ChunkRegistry:
+    def __init__(self, chunkCount: int = WORLD_VOLUME) -> None:
+        """
+        Class that keeps the per chunk data used every frame in contiguous arrays indexed by chunk index, so passes
+        over every chunk such as visibility and draw order are single vectorized calls instead of Python loops over
+        Chunk objects. Chunks read and write their data through it
+
+        :param int chunkCount: The number of chunks in the world
+        """
+
+        self.chunkCount = chunkCount
+
+        # The (x, y, z) position of each chunk in chunks, and its model matrix in the column major layout OpenGL uses
+        self.positions = np.zeros((chunkCount, 3), dtype='int32')
+        self.modelMatrices = np.tile(np.identity(4, dtype='float32'), (chunkCount, 1, 1))
+
+        # The world space bounding box of each chunk
+        self.boundsMin = np.zeros((chunkCount, 3), dtype='float32')
+        self.boundsMax = np.zeros((chunkCount, 3), dtype='float32')
+
+        self.isEmpty = np.ones(chunkCount, dtype='bool')
+        self.hasMesh = np.zeros(chunkCount, dtype='bool')
+
+        # The vertices in each chunk's mesh and the size of its vertex buffer in bytes
+        self.vertexCounts = np.zeros(chunkCount, dtype='int32')
+        self.bufferSizes = np.zeros(chunkCount, dtype='int64')
+
+
+    def set_position(self, chunkIndex: int, position: tuple[int, int, int]) -> None:
+        """
+        Sets the position of a chunk, along with the model matrix and bounding box that follow from it
+
+        :param int chunkIndex: The index of the chunk
+        :param tuple position: The (x, y, z) position of the chunk in chunks
+        """
+
+        self.positions[chunkIndex] = position
+        self.boundsMin[chunkIndex] = self.positions[chunkIndex] * CHUNK_SIZE
+        self.boundsMax[chunkIndex] = self.boundsMin[chunkIndex] + CHUNK_SIZE
+
+        # The translation is the last column of the matrix, which is its last row when stored column major
+        self.modelMatrices[chunkIndex, 3, :3] = self.boundsMin[chunkIndex]
+
+
+    def set_mesh(self, chunkIndex: int, vertexCount: int, bufferSize: int) -> None:
+        """
+        Records that a chunk's mesh has been uploaded
+
+        :param int chunkIndex: The index of the chunk
+        :param int vertexCount: The number of vertices in the mesh
+        :param int bufferSize: The size of the mesh's vertex buffer in bytes
+        """
+
+        self.hasMesh[chunkIndex] = True
+        self.vertexCounts[chunkIndex] = vertexCount
+        self.bufferSizes[chunkIndex] = bufferSize
+
+
+    def get_drawable(self) -> np.array:
+        """
+        Gets which chunks have something to draw
+
+        :returns: A boolean array with an element for each chunk
+        """
+
+        return ~self.isEmpty & self.hasMesh & (self.vertexCounts > 0)
+
+
+    def get_in_render_distance(self, position: glm.vec3, renderDistance: int = None) -> np.array:
+        """
+        Gets which chunks are within the render distance of a position, measured in whole chunk columns along each
+        axis so the area is a square around the position's column
+
+        :param glm.vec3 position: The position in the world, usually the player's
+        :param int renderDistance: The render distance in chunk columns, or None for no limit
+
+        :returns: A boolean array with an element for each chunk
+        """
+
+        if renderDistance is None:
+            return np.ones(self.chunkCount, dtype='bool')
+
+        columnX, columnZ = int(position.x // CHUNK_SIZE), int(position.z // CHUNK_SIZE)
+
+        columnDistances = np.maximum(np.abs(self.positions[:, 0] - columnX), np.abs(self.positions[:, 2] - columnZ))
+
+        return columnDistances <= renderDistance
+
+
+    def get_in_frustum(self, viewProjectionMatrix: glm.mat4) -> np.array:
+        """
+        Gets which chunks' bounding boxes are at least partly inside the view frustum. Each box is tested against the
+        six planes of the frustum using its corner furthest along the plane's normal
+
+        :param glm.mat4 viewProjectionMatrix: The projection matrix multiplied by the view matrix
+
+        :returns: A boolean array with an element for each chunk
+        """
+
+        # Each plane is the last row of the matrix plus or minus one of the others, and glm converts to numpy by row
+        matrix = np.array(viewProjectionMatrix, dtype='float32')
+        planes = np.concatenate((matrix[3] + matrix[:3], matrix[3] - matrix[:3]))
+
+        furthestCorners = np.where(planes[:, None, :3] >= 0, self.boundsMax, self.boundsMin)
+        distances = np.einsum('pck,pk->pc', furthestCorners, planes[:, :3]) + planes[:, 3:]
+
+        return np.all(distances >= 0, axis=0)
+
+
+    def get_sort_keys(self, position: glm.vec3) -> np.array:
+        """
+        Gets the squared distance from a position to the centre of each chunk, which sorts chunks front to back
+
+        :param glm.vec3 position: The position in the world, usually the camera's
+
+        :returns: An array with a key for each chunk
+        """
+
+        centres = (self.boundsMin + self.boundsMax) * 0.5 - np.array(position, dtype='float32')
+
+        return np.einsum('ck,ck->c', centres, centres)
+
+
+    def get_draw_order(self, position: glm.vec3, viewProjectionMatrix: glm.mat4, renderDistance: int = None) -> np.array:
+        """
+        Gets the chunks to draw this frame, nearest first so nearer chunks hide the fragments of those behind them
+        before they are shaded
+
+        :param glm.vec3 position: The position of the camera in the world
+        :param glm.mat4 viewProjectionMatrix: The projection matrix multiplied by the view matrix
+        :param int renderDistance: The render distance in chunk columns, or None for no limit
+
+        :returns: The indices of the chunks to draw in the order to draw them
+        """
+
+        isVisible = self.get_drawable() & self.get_in_render_distance(position, renderDistance)
+        isVisible &= self.get_in_frustum(viewProjectionMatrix)
+
+        chunkIndices = np.flatnonzero(isVisible)
+
+        return chunkIndices[np.argsort(self.get_sort_keys(position)[chunkIndices], kind='stable')]
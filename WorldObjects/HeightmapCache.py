@@ -0,0 +1,75 @@
+from collections import OrderedDict
+
+from settings import *
+from WorldObjects.simplexNoise import add_noise_layer
+
+
+class HeightmapCache:
+    def __init__(self, capacity: int = HEIGHTMAP_CACHE_SIZE) -> None:
+        """
+        Class that computes the terrain height of a chunk column once and keeps the most recently used columns, so
+        every chunk stacked in a column slices its heights from the same tile instead of sampling the noise again.
+        The least recently used tile is evicted once the cache is full, which keeps streaming worlds bounded
+
+        :param int capacity: The number of tiles kept
+        """
+
+        self.capacity = capacity
+        self.tiles: OrderedDict[tuple[int, int], np.array] = OrderedDict()
+
+        self.hitCount = 0
+        self.missCount = 0
+
+
+    def get_tile(self, columnX: int, columnZ: int) -> np.array:
+        """
+        Gets the heightmap of a chunk column, computing it if it is not cached
+
+        :param int columnX: The x position of the chunk column
+        :param int columnZ: The z position of the chunk column
+
+        :returns: A (CHUNK_SIZE, CHUNK_SIZE) numpy array of terrain heights in world voxels indexed by [z, x], the
+        same order as chunk voxels
+        """
+
+        column = (columnX, columnZ)
+        tile = self.tiles.get(column)
+
+        if tile is not None:
+            self.tiles.move_to_end(column)
+            self.hitCount += 1
+            return tile
+
+        self.missCount += 1
+        tile = self.tiles[column] = self.compute_tile(columnX, columnZ)
+
+        if len(self.tiles) > self.capacity:
+            self.tiles.popitem(last=False)
+
+        return tile
+
+
+    def compute_tile(self, columnX: int, columnZ: int) -> np.array:
+        """
+        Samples every layer of TERRAIN_NOISE_LAYERS across a chunk column and adds them onto TERRAIN_BASE_HEIGHT.
+        Each layer is sampled across the whole column in one kernel call
+
+        :param int columnX: The x position of the chunk column
+        :param int columnZ: The z position of the chunk column
+
+        :returns: A (CHUNK_SIZE, CHUNK_SIZE) numpy array of terrain heights indexed by [z, x]
+        """
+
+        startX, startZ = columnX * CHUNK_SIZE, columnZ * CHUNK_SIZE
+        heights = np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype='float64')
+
+        for frequency, amplitude in TERRAIN_NOISE_LAYERS:
+            add_noise_layer(heights, startX, startZ, frequency, amplitude)
+
+        return (heights + TERRAIN_BASE_HEIGHT).astype('int32')
+
+
+    def clear(self) -> None:
+        "Removes every cached tile"
+
+        self.tiles.clear()
@@ -0,0 +1,73 @@
+from settings import *
+from WorldObjects.surfaceHeights import build_column_heights, update_heights
+
+
+class SurfaceHeightmap:
+    def __init__(self, worldVoxels: np.array) -> None:
+        """
+        Class that keeps the height of the highest voxel that is not air in every column of the world, for spawn
+        placement, sky light, precipitation and the minimap. Heights are stored as one compact array per chunk column,
+        built when the column is generated and kept up to date as voxels are edited
+
+        :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+        """
+
+        self.worldVoxels = worldVoxels
+
+        # Indexed [chunk column index, localX + CHUNK_SIZE * localZ], columns that have not been generated are -1
+        self.heights = np.full([WORLD_AREA, CHUNK_AREA], -1, dtype='int16')
+
+
+    def update_column(self, columnX: int, columnZ: int) -> None:
+        """
+        Builds the heights of a chunk column once all of its chunks have been generated
+
+        :param int columnX: The x position of the chunk column
+        :param int columnZ: The z position of the chunk column
+        """
+
+        build_column_heights(columnX, columnZ, self.worldVoxels, self.heights)
+
+
+    def update_voxels(self, positions: np.array) -> None:
+        """
+        Updates the heights after voxels have been edited
+
+        :param np.array positions: An (N, 3) integer array of world voxel positions that have changed
+        """
+
+        update_heights(positions, self.worldVoxels, self.heights)
+
+
+    def get_heights(self, worldX: np.array, worldZ: np.array) -> np.array:
+        """
+        Gets the surface height of many columns at once
+
+        :param np.array worldX: The world x coordinates of the columns
+        :param np.array worldZ: The world z coordinates of the columns, in the same shape as worldX
+
+        :returns: An array of the y coordinate of the highest voxel that is not air in each column, or -1 for columns
+        with no voxels, outside of the world or not generated yet
+        """
+
+        worldX, worldZ = np.broadcast_arrays(np.asarray(worldX, dtype='int64'), np.asarray(worldZ, dtype='int64'))
+        isInside = (0 <= worldX) & (worldX < WORLD_SIZE_X) & (0 <= worldZ) & (worldZ < WORLD_SIZE_Z)
+
+        # Positions outside of the world are clamped to read something, then replaced with -1
+        x, z = np.clip(worldX, 0, WORLD_SIZE_X - 1), np.clip(worldZ, 0, WORLD_SIZE_Z - 1)
+        heights = self.heights[x // CHUNK_SIZE + WORLD_WIDTH * (z // CHUNK_SIZE), x % CHUNK_SIZE + CHUNK_SIZE * (z % CHUNK_SIZE)]
+
+        return np.where(isInside, heights, -1)
+
+
+    def get_height(self, worldX: int, worldZ: int) -> int:
+        """
+        Gets the surface height of a single column
+
+        :param int worldX: The world x coordinate of the column
+        :param int worldZ: The world z coordinate of the column
+
+        :returns: The y coordinate of the highest voxel that is not air, or -1 if there is none
+        """
+
+        return int(self.get_heights(worldX, worldZ))
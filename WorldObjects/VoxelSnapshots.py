@@ -0,0 +1,149 @@
+from settings import *
+import World
+
+
+class ChunkSnapshot:
+    def __init__(self, chunkIndex: int, chunkIndices: np.array, versions: np.array, voxels: list[np.array],
+                 light: list[np.array]) -> None:
+        """
+        Class for an immutable view of a chunk and the chunks around it at the versions it was taken at, which is
+        everything needed to mesh the chunk. The arrays are read only and are never written to again, so it can be
+        read from any thread while the world keeps changing
+
+        :param int chunkIndex: The index of the chunk
+        :param np.array chunkIndices: The indices of the chunk and the chunks around it
+        :param np.array versions: The version of each chunk in chunkIndices
+        :param list voxels: The voxels of each chunk in chunkIndices
+        :param list light: The packed light levels of each chunk in chunkIndices
+        """
+
+        self.chunkIndex = chunkIndex
+        self.chunkIndices = chunkIndices
+        self.versions = versions
+        self.voxels = voxels
+        self.light = light
+
+
+    def copy_into(self, worldVoxels: np.array, worldLight: np.array, heldVersions: np.array) -> int:
+        """
+        Copies the chunks in the snapshot into world sized arrays owned by the reader, so the meshing kernels can
+        read them like the world's own arrays. Chunks the arrays already hold at the same version are not copied
+
+        :param np.array worldVoxels: The reader's copy of the world's voxels
+        :param np.array worldLight: The reader's copy of the world's packed light levels
+        :param np.array heldVersions: The version of each chunk the reader's arrays hold, which is updated
+
+        :returns: The number of chunks copied
+        """
+
+        copyCount = 0
+
+        for chunkIndex, version, voxels, light in zip(self.chunkIndices, self.versions, self.voxels, self.light):
+            if heldVersions[chunkIndex] != version:
+                worldVoxels[chunkIndex] = voxels
+                worldLight[chunkIndex] = light
+                heldVersions[chunkIndex] = version
+                copyCount += 1
+
+        return copyCount
+
+
+class VoxelSnapshots:
+    def __init__(self, world: 'World.World') -> None:
+        """
+        Class that publishes a read only copy of each chunk's voxels and light, with a version that goes up every
+        time the chunk changes. Only the chunks a write touched are copied, and every other chunk keeps sharing its
+        last copy, so taking a snapshot never copies anything and writers never wait for readers. All of the
+        published state is swapped in at once, so a reader on another thread sees either all or none of a publish
+
+        :param World world: The world whose chunks are published
+        """
+
+        self.world = world
+
+        # Nothing has been generated yet, so every chunk shares the same copy until it is first written to
+        unloadedVoxels = np.full(CHUNK_VOLUME, UNLOADED_VOXEL_ID, dtype='uint8')
+        unloadedLight = np.zeros(CHUNK_VOLUME, dtype='uint8')
+        unloadedVoxels.flags.writeable = unloadedLight.flags.writeable = False
+
+        # The (versions, voxels, light) of every chunk, which is only ever replaced and never changed in place
+        self.published = (np.zeros(WORLD_VOLUME, dtype='int64'), [unloadedVoxels] * WORLD_VOLUME, [unloadedLight] * WORLD_VOLUME)
+
+        # The chunks around each chunk, including itself, that meshing it reads from
+        self.neighbourhoods = [self.get_neighbourhood(chunkIndex) for chunkIndex in range(WORLD_VOLUME)]
+
+
+    def get_neighbourhood(self, chunkIndex: int) -> np.array:
+        """
+        Gets the indices of a chunk and every chunk touching it, including along edges and at corners
+
+        :param int chunkIndex: The index of the chunk
+
+        :returns: An array of chunk indices
+        """
+
+        chunkX, chunkY, chunkZ = chunkIndex % WORLD_WIDTH, chunkIndex // WORLD_AREA, chunkIndex // WORLD_WIDTH % WORLD_DEPTH
+
+        chunkIndices = [
+            x + WORLD_WIDTH * z + WORLD_AREA * y
+            for x in range(max(chunkX - 1, 0), min(chunkX + 2, WORLD_WIDTH))
+            for y in range(max(chunkY - 1, 0), min(chunkY + 2, WORLD_HEIGHT))
+            for z in range(max(chunkZ - 1, 0), min(chunkZ + 2, WORLD_DEPTH))]
+
+        return np.array(chunkIndices, dtype='int64')
+
+
+    def publish(self, chunkIndices: np.array) -> None:
+        """
+        Copies the chunks that have changed out of the world and publishes them at a new version. This has to be
+        called from the thread writing to the world after every write, before anything reads a snapshot
+
+        :param np.array chunkIndices: The indices of the chunks whose voxels or light changed
+        """
+
+        if not len(chunkIndices):
+            return
+
+        versions, voxels, light = self.published
+        versions, voxels, light = versions.copy(), voxels.copy(), light.copy()
+
+        for chunkIndex in chunkIndices:
+            # Each later publish replaces the chunk's copy, so only the first one adds to the memory used
+            if not versions[chunkIndex]:
+                self.world.app.memoryTracker.allocate("Voxel snapshots", self.world.chunks[chunkIndex], CHUNK_VOLUME * 2)
+
+            voxels[chunkIndex] = self.world.voxels[chunkIndex].copy()
+            light[chunkIndex] = self.world.lightEngine.light[chunkIndex].copy()
+            voxels[chunkIndex].flags.writeable = light[chunkIndex].flags.writeable = False
+
+        versions[chunkIndices] += 1
+
+        self.published = (versions, voxels, light)
+
+
+    def get_snapshot(self, chunkIndex: int) -> ChunkSnapshot:
+        """
+        Takes a snapshot of a chunk and the chunks around it at their latest published versions
+
+        :param int chunkIndex: The index of the chunk
+
+        :returns: The snapshot
+        """
+
+        versions, voxels, light = self.published
+        chunkIndices = self.neighbourhoods[chunkIndex]
+
+        return ChunkSnapshot(chunkIndex, chunkIndices, versions[chunkIndices],
+                             [voxels[index] for index in chunkIndices], [light[index] for index in chunkIndices])
+
+
+    def is_current(self, snapshot: ChunkSnapshot) -> bool:
+        """
+        Checks whether any chunk in a snapshot has changed since it was taken, so work done from it is out of date
+
+        :param ChunkSnapshot snapshot: The snapshot to check
+
+        :returns: True if every chunk is still at the version in the snapshot, otherwise False
+        """
+
+        return bool(np.array_equal(self.published[0][snapshot.chunkIndices], snapshot.versions))
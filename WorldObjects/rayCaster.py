@@ -0,0 +1,121 @@
+from settings import *
+from numba import prange
+from WorldObjects.voxelAccess import get_world_voxel_id
+
+
+# Distance used in place of infinity for axes the ray never crosses
+NO_CROSSING = 10000000.0
+
+
+@njit
+def get_axis_start(origin: float, direction: float, voxel: int) -> tuple[int, float, float]:
+    """
+    Calculates the DDA stepping values for a single axis of a ray
+
+    :param float origin: The start position of the ray on this axis
+    :param float direction: The normalised direction of the ray on this axis
+    :param int voxel: The voxel coordinate the ray starts in on this axis
+
+    :returns: The step direction, the distance between voxel boundaries and the distance to the first boundary
+    """
+
+    if direction > 0:
+        delta = 1.0 / direction
+        return 1, delta, (voxel + 1 - origin) * delta
+
+    if direction < 0:
+        delta = -1.0 / direction
+        return -1, delta, (origin - voxel) * delta
+
+    return 0, NO_CROSSING, NO_CROSSING
+
+
+@njit(parallel=True)
+def ray_cast_batch(origins: np.array, directions: np.array, maxDistance: float, worldVoxels: np.array,
+                   hitPositions: np.array, hitNormals: np.array, hitVoxelIDs: np.array, hitDistances: np.array) -> None:
+    """
+    Casts many rays through the world at once using a voxel DDA, with each ray traversed on its own thread.
+    Results are written into the provided output arrays, and rays that miss are given a voxelID of 0 and a
+    distance of infinity. Voxels in chunks that have not been loaded yet are treated as empty
+
+    :param np.array origins: An (N, 3) array of ray start positions in world space
+    :param np.array directions: An (N, 3) array of ray directions (they do not need to be normalised)
+    :param float maxDistance: The maximum distance a ray can travel before it is treated as a miss
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+    :param np.array hitPositions: An (N, 3) output array for the world position of each hit voxel
+    :param np.array hitNormals: An (N, 3) output array for the normal of the face each ray entered through
+    :param np.array hitVoxelIDs: An (N,) output array for the ID of each hit voxel
+    :param np.array hitDistances: An (N,) output array for the distance from the origin to each hit
+    """
+
+    for i in prange(origins.shape[0]):
+        hitVoxelIDs[i] = 0
+        hitDistances[i] = np.inf
+        for axis in range(3):
+            hitPositions[i, axis] = 0
+            hitNormals[i, axis] = 0
+
+        originX, originY, originZ = origins[i, 0], origins[i, 1], origins[i, 2]
+        dirX, dirY, dirZ = directions[i, 0], directions[i, 1], directions[i, 2]
+
+        length = np.sqrt(dirX * dirX + dirY * dirY + dirZ * dirZ)
+        if length == 0:
+            continue
+
+        dirX, dirY, dirZ = dirX / length, dirY / length, dirZ / length
+
+        x = int(np.floor(originX))
+        y = int(np.floor(originY))
+        z = int(np.floor(originZ))
+
+        stepX, deltaX, maxX = get_axis_start(originX, dirX, x)
+        stepY, deltaY, maxY = get_axis_start(originY, dirY, y)
+        stepZ, deltaZ, maxZ = get_axis_start(originZ, dirZ, z)
+
+        distance = 0.0
+        stepDirection = -1
+
+        while distance <= maxDistance:
+            voxelID = get_world_voxel_id(x, y, z, worldVoxels)
+
+            # Chunks that have not been loaded yet are not drawn, so rays pass through them
+            if voxelID and voxelID != UNLOADED_VOXEL_ID:
+                hitVoxelIDs[i] = voxelID
+                hitDistances[i] = distance
+                hitPositions[i, 0] = x
+                hitPositions[i, 1] = y
+                hitPositions[i, 2] = z
+
+                # The normal faces back along the last step that was taken
+                if stepDirection == 0:
+                    hitNormals[i, 0] = -stepX
+                elif stepDirection == 1:
+                    hitNormals[i, 1] = -stepY
+                elif stepDirection == 2:
+                    hitNormals[i, 2] = -stepZ
+
+                break
+
+            if maxX < maxY:
+                if maxX < maxZ:
+                    x += stepX
+                    distance = maxX
+                    maxX += deltaX
+                    stepDirection = 0
+                else:
+                    z += stepZ
+                    distance = maxZ
+                    maxZ += deltaZ
+                    stepDirection = 2
+
+            else:
+                if maxY < maxZ:
+                    y += stepY
+                    distance = maxY
+                    maxY += deltaY
+                    stepDirection = 1
+                else:
+                    z += stepZ
+                    distance = maxZ
+                    maxZ += deltaZ
+                    stepDirection = 2
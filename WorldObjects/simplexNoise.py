@@ -0,0 +1,116 @@
+from settings import *
+
+
+# The skew factors between the simplex grid and the square grid, and the spacing of the 41 gradients
+SKEW = np.float32(0.366025403784439)
+UNSKEW = np.float32(0.211324865405187)
+UNSKEW_2 = np.float32(-0.577350269189626)
+GRADIENT_STEP = np.float32(0.024390243902439)
+INVERSE_289 = np.float32(1) / np.float32(289)
+
+
+@njit
+def mod289(value: np.float32) -> np.float32:
+    """
+    Wraps a value into the range of the permutation polynomial
+
+    :param np.float32 value: The value to wrap
+
+    :returns: The value modulo 289
+    """
+
+    return value - np.floor(value * INVERSE_289) * np.float32(289)
+
+
+@njit
+def permute(value: np.float32) -> np.float32:
+    """
+    Hashes a lattice coordinate with the permutation polynomial (34x^2 + x) mod 289
+
+    :param np.float32 value: The value to hash
+
+    :returns: The hashed value
+    """
+
+    return mod289((value * np.float32(34) + np.float32(1)) * value)
+
+
+@njit
+def get_corner(x: np.float32, y: np.float32, hash: np.float32) -> np.float32:
+    """
+    Gets the contribution of one corner of a simplex to the noise at a point
+
+    :param np.float32 x: The x offset of the point from the corner
+    :param np.float32 y: The y offset of the point from the corner
+    :param np.float32 hash: The permuted hash of the corner, which picks its gradient
+
+    :returns: The contribution of the corner, before it is scaled by 130
+    """
+
+    falloff = max(np.float32(0.5) - (x * x + y * y), np.float32(0))
+    falloff = falloff * falloff
+    falloff = falloff * falloff
+
+    gradientX = np.float32(2) * (hash * GRADIENT_STEP - np.floor(hash * GRADIENT_STEP)) - np.float32(1)
+    gradientY = abs(gradientX) - np.float32(0.5)
+    gradientX = gradientX - np.floor(gradientX + np.float32(0.5))
+
+    # Normalises the gradient by scaling the falloff with an approximation of its inverse length
+    falloff *= np.float32(1.79284291400159) - np.float32(0.85373472095314) * (gradientX * gradientX + gradientY * gradientY)
+
+    return falloff * (gradientX * x + gradientY * y)
+
+
+@njit
+def simplex(x: np.float32, y: np.float32) -> np.float32:
+    """
+    Samples 2D simplex noise in single precision, giving the same values as glm.simplex
+
+    :param np.float32 x: The x coordinate to sample at
+    :param np.float32 y: The y coordinate to sample at
+
+    :returns: The noise value, between -1 and 1
+    """
+
+    # The simplex cell the point is in and the point's offset from its first corner
+    skew = x * SKEW + y * SKEW
+    cellX = np.floor(x + skew)
+    cellY = np.floor(y + skew)
+    unskew = cellX * UNSKEW + cellY * UNSKEW
+    x0 = x - cellX + unskew
+    y0 = y - cellY + unskew
+
+    # The middle corner is along whichever axis the point is further along
+    middleX, middleY = (np.float32(1), np.float32(0)) if x0 > y0 else (np.float32(0), np.float32(1))
+    x1 = x0 + UNSKEW - middleX
+    y1 = y0 + UNSKEW - middleY
+    x2 = x0 + UNSKEW_2
+    y2 = y0 + UNSKEW_2
+
+    cellX = cellX - np.float32(289) * np.floor(cellX / np.float32(289))
+    cellY = cellY - np.float32(289) * np.floor(cellY / np.float32(289))
+
+    noise = (get_corner(x0, y0, permute(permute(cellY) + cellX))
+             + get_corner(x1, y1, permute(permute(cellY + middleY) + cellX + middleX))
+             + get_corner(x2, y2, permute(permute(cellY + np.float32(1)) + cellX + np.float32(1))))
+
+    return np.float32(130) * noise
+
+
+@njit
+def add_noise_layer(heights: np.array, startX: int, startZ: int, frequency: float, amplitude: float) -> None:
+    """
+    Adds one layer of simplex noise across a chunk column's heightmap
+
+    :param np.array heights: A (CHUNK_SIZE, CHUNK_SIZE) float64 array of heights indexed by [z, x], updated in place
+    :param int startX: The world x coordinate of the column's first voxel
+    :param int startZ: The world z coordinate of the column's first voxel
+    :param float frequency: How many times the noise repeats per voxel
+    :param float amplitude: The height the noise is scaled to
+    """
+
+    frequency = np.float32(frequency)
+
+    for z in range(CHUNK_SIZE):
+        for x in range(CHUNK_SIZE):
+            heights[z, x] += simplex(np.float32(startX + x) * frequency, np.float32(startZ + z) * frequency) * amplitude
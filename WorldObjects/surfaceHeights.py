@@ -0,0 +1,71 @@
+from settings import *
+from Meshes.chunkMeshBuilder import get_chunk_index
+from WorldObjects.voxelAccess import get_voxel_index
+
+
+@njit
+def scan_down(worldX: int, startY: int, worldZ: int, worldVoxels: np.array) -> int:
+    """
+    Scans down a column of voxels for the highest voxel that is not air
+
+    :param int worldX: The world x coordinate of the column
+    :param int startY: The world y coordinate to start scanning from
+    :param int worldZ: The world z coordinate of the column
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+
+    :returns: The y coordinate of the highest voxel at or below startY that is not air, or -1 if there is none
+    """
+
+    y = startY
+    while y >= 0 and not worldVoxels[get_chunk_index((worldX, y, worldZ)), get_voxel_index(worldX, y, worldZ)]:
+        y -= 1
+
+    return y
+
+
+@njit
+def build_column_heights(columnX: int, columnZ: int, worldVoxels: np.array, heights: np.array) -> None:
+    """
+    Finds the surface height of every voxel column in a chunk column from scratch
+
+    :param int columnX: The x position of the chunk column
+    :param int columnZ: The z position of the chunk column
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+    :param np.array heights: The (WORLD_AREA, CHUNK_AREA) surface heights of every chunk column
+    """
+
+    columnIndex = columnX + WORLD_WIDTH * columnZ
+
+    for localX in range(CHUNK_SIZE):
+        for localZ in range(CHUNK_SIZE):
+            heights[columnIndex, localX + CHUNK_SIZE * localZ] = scan_down(
+                columnX * CHUNK_SIZE + localX, WORLD_SIZE_Y - 1, columnZ * CHUNK_SIZE + localZ, worldVoxels)
+
+
+@njit
+def update_heights(positions: np.array, worldVoxels: np.array, heights: np.array) -> None:
+    """
+    Updates the surface heights after voxels have been edited. Placing a voxel above the surface raises it straight
+    away, and removing the surface voxel only scans down the one column it was in
+
+    :param np.array positions: An (N, 3) array of world voxel positions that have changed
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+    :param np.array heights: The (WORLD_AREA, CHUNK_AREA) surface heights of every chunk column
+    """
+
+    for i in range(positions.shape[0]):
+        x, y, z = positions[i, 0], positions[i, 1], positions[i, 2]
+
+        chunkIndex = get_chunk_index((x, y, z))
+        if chunkIndex == -1:
+            continue
+
+        columnIndex = chunkIndex % WORLD_AREA
+        localIndex = x % CHUNK_SIZE + CHUNK_SIZE * (z % CHUNK_SIZE)
+
+        if worldVoxels[chunkIndex, get_voxel_index(x, y, z)]:
+            if y > heights[columnIndex, localIndex]:
+                heights[columnIndex, localIndex] = y
+
+        elif y == heights[columnIndex, localIndex]:
+            heights[columnIndex, localIndex] = scan_down(x, y - 1, z, worldVoxels)
@@ -0,0 +1,205 @@
+from settings import *
+from numba import prange
+from Meshes.chunkMeshBuilder import get_chunk_index
+
+
+@njit
+def get_voxel_index(worldX: int, worldY: int, worldZ: int) -> int:
+    """
+    Calculates the index of a voxel within its chunk's voxel array
+
+    :param int worldX: The world x coordinate of the voxel
+    :param int worldY: The world y coordinate of the voxel
+    :param int worldZ: The world z coordinate of the voxel
+
+    :returns: The index of the voxel in the chunk's voxel array
+    """
+
+    return worldX % CHUNK_SIZE + worldZ % CHUNK_SIZE * CHUNK_SIZE + worldY % CHUNK_SIZE * CHUNK_AREA
+
+
+@njit
+def get_world_voxel_id(worldX: int, worldY: int, worldZ: int, worldVoxels: np.array) -> int:
+    """
+    Gets the ID of the voxel at a world position straight from the world voxel array
+
+    :param int worldX: The world x coordinate of the voxel
+    :param int worldY: The world y coordinate of the voxel
+    :param int worldZ: The world z coordinate of the voxel
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+
+    :returns: The ID of the voxel (0 if the position is empty or outside of the world)
+    """
+
+    chunkIndex = get_chunk_index((worldX, worldY, worldZ))
+    if chunkIndex == -1:
+        return 0
+
+    return worldVoxels[chunkIndex, get_voxel_index(worldX, worldY, worldZ)]
+
+
+@njit(parallel=True)
+def get_voxels_batch(positions: np.array, worldVoxels: np.array, voxelIDs: np.array) -> None:
+    """
+    Looks up the IDs of many voxels at once
+
+    :param np.array positions: An (N, 3) array of world voxel positions
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+    :param np.array voxelIDs: An (N,) output array for the voxel IDs (VOXEL_OUT_OF_WORLD for positions outside the world)
+    """
+
+    for i in prange(positions.shape[0]):
+        worldX, worldY, worldZ = positions[i, 0], positions[i, 1], positions[i, 2]
+
+        chunkIndex = get_chunk_index((worldX, worldY, worldZ))
+        if chunkIndex == -1:
+            voxelIDs[i] = VOXEL_OUT_OF_WORLD
+        else:
+            voxelIDs[i] = worldVoxels[chunkIndex, get_voxel_index(worldX, worldY, worldZ)]
+
+
+@njit
+def mark_adjacent_dirty(adjX: int, adjY: int, adjZ: int, dirtyChunks: np.array) -> None:
+    """
+    Marks the chunk containing an adjacent voxel as dirty if it is inside the world
+
+    :param int adjX: The world x coordinate of the adjacent voxel
+    :param int adjY: The world y coordinate of the adjacent voxel
+    :param int adjZ: The world z coordinate of the adjacent voxel
+    :param np.array dirtyChunks: A boolean array with one flag per chunk in the world
+    """
+
+    adjChunkIndex = get_chunk_index((adjX, adjY, adjZ))
+    if adjChunkIndex != -1:
+        dirtyChunks[adjChunkIndex] = True
+
+
+@njit
+def mark_dirty(worldX: int, worldY: int, worldZ: int, dirtyChunks: np.array) -> None:
+    """
+    Marks the chunk containing a voxel as dirty, along with any neighbouring chunk whose mesh touches the voxel
+
+    :param int worldX: The world x coordinate of the changed voxel
+    :param int worldY: The world y coordinate of the changed voxel
+    :param int worldZ: The world z coordinate of the changed voxel
+    :param np.array dirtyChunks: A boolean array with one flag per chunk in the world
+    """
+
+    dirtyChunks[get_chunk_index((worldX, worldY, worldZ))] = True
+
+    localX = worldX % CHUNK_SIZE
+    localY = worldY % CHUNK_SIZE
+    localZ = worldZ % CHUNK_SIZE
+
+    if localX == 0:
+        mark_adjacent_dirty(worldX - 1, worldY, worldZ, dirtyChunks)
+    elif localX == CHUNK_SIZE - 1:
+        mark_adjacent_dirty(worldX + 1, worldY, worldZ, dirtyChunks)
+
+    if localY == 0:
+        mark_adjacent_dirty(worldX, worldY - 1, worldZ, dirtyChunks)
+    elif localY == CHUNK_SIZE - 1:
+        mark_adjacent_dirty(worldX, worldY + 1, worldZ, dirtyChunks)
+
+    if localZ == 0:
+        mark_adjacent_dirty(worldX, worldY, worldZ - 1, dirtyChunks)
+    elif localZ == CHUNK_SIZE - 1:
+        mark_adjacent_dirty(worldX, worldY, worldZ + 1, dirtyChunks)
+
+
+@njit
+def set_voxels_batch(positions: np.array, voxelIDs: np.array, worldVoxels: np.array, dirtyChunks: np.array, changed: np.array) -> int:
+    """
+    Writes many voxels at once, ignoring any positions outside of the world. Writes are applied in order so the
+    last write to a position wins
+
+    :param np.array positions: An (N, 3) array of world voxel positions
+    :param np.array voxelIDs: An (N,) array of voxel IDs to write
+    :param np.array worldVoxels: A numpy array storing all of the voxels present in the world
+    :param np.array dirtyChunks: A boolean array with one flag per chunk, set for every chunk needing a mesh rebuild
+    :param np.array changed: An (N,) boolean output array, set for every position whose voxel was changed
+
+    :returns: The number of voxels that were changed
+    """
+
+    changedCount = 0
+
+    for i in range(positions.shape[0]):
+        worldX, worldY, worldZ = positions[i, 0], positions[i, 1], positions[i, 2]
+
+        chunkIndex = get_chunk_index((worldX, worldY, worldZ))
+        if chunkIndex == -1:
+            continue
+
+        voxelIndex = get_voxel_index(worldX, worldY, worldZ)
+        if worldVoxels[chunkIndex, voxelIndex] == voxelIDs[i]:
+            continue
+
+        worldVoxels[chunkIndex, voxelIndex] = voxelIDs[i]
+        mark_dirty(worldX, worldY, worldZ, dirtyChunks)
+        changed[i] = True
+        changedCount += 1
+
+    return changedCount
+
+
+# Offsets to a voxel and its six neighbours
+NEIGHBOURHOOD_OFFSETS = np.array([
+    (0, 0, 0),
+    (1, 0, 0), (-1, 0, 0),
+    (0, 1, 0), (0, -1, 0),
+    (0, 0, 1), (0, 0, -1),
+], dtype='int32')
+
+
+def get_neighbourhood(positions: np.array) -> np.array:
+    """
+    Gets the positions of a batch of voxels and their six neighbours, leaving out any outside of the world
+
+    :param np.array positions: An (N, 3) integer array of world voxel positions
+
+    :returns: An (M, 3) array of world voxel positions (which may contain duplicates)
+    """
+
+    neighbours = (positions[:, None, :] + NEIGHBOURHOOD_OFFSETS).reshape(-1, 3)
+    isInWorld = np.all((neighbours >= 0) & (neighbours < (WORLD_SIZE_X, WORLD_SIZE_Y, WORLD_SIZE_Z)), axis=1)
+
+    return neighbours[isInWorld]
+
+
+def get_voxel_keys(positions: np.array) -> np.array:
+    """
+    Encodes world voxel positions inside the world as single integers (chunkIndex * CHUNK_VOLUME + voxelIndex), so
+    sorting the keys groups voxels by chunk
+
+    :param np.array positions: An (N, 3) integer array of world voxel positions
+
+    :returns: An (N,) int64 array of keys
+    """
+
+    positions = positions.astype('int64')
+    chunkX, chunkY, chunkZ = (positions // CHUNK_SIZE).T
+    localX, localY, localZ = (positions % CHUNK_SIZE).T
+
+    chunkIndices = chunkX + WORLD_WIDTH * chunkZ + WORLD_AREA * chunkY
+    voxelIndices = localX + CHUNK_SIZE * localZ + CHUNK_AREA * localY
+
+    return chunkIndices * CHUNK_VOLUME + voxelIndices
+
+
+def get_key_positions(keys: np.array) -> np.array:
+    """
+    Decodes keys made by get_voxel_keys back into world voxel positions
+
+    :param np.array keys: An (N,) array of keys
+
+    :returns: An (N, 3) int32 array of world voxel positions
+    """
+
+    chunkIndices, voxelIndices = np.divmod(keys, CHUNK_VOLUME)
+
+    x = chunkIndices % WORLD_WIDTH * CHUNK_SIZE + voxelIndices % CHUNK_SIZE
+    y = chunkIndices // WORLD_AREA * CHUNK_SIZE + voxelIndices // CHUNK_AREA
+    z = chunkIndices // WORLD_WIDTH % WORLD_DEPTH * CHUNK_SIZE + voxelIndices // CHUNK_SIZE % CHUNK_SIZE
+
+    return np.stack([x, y, z], axis=1).astype('int32')
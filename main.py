@@ -1,6 +1,81 @@
-from Engine import Engine
+import argparse
+
+from Profiling.StartupProfiler import StartupProfiler
+
+startupProfiler = StartupProfiler()
+
+with startupProfiler.phase("Imports"):
+    from Engine import Engine
+
+
+def parse_arguments() -> argparse.Namespace:
+    "Reads the command line options"
+
+    parser = argparse.ArgumentParser(description="MinecraftPython")
+    parser.add_argument("--headless", action="store_true", help="render offscreen without a window and report frame times")
+    parser.add_argument("--frames", type=int, help="number of frames to render in headless mode")
+    parser.add_argument("--camera-path", help="JSON file of camera keyframes for headless mode, orbits the world if not given")
+    parser.add_argument("--dump-dir", help="folder to save rendered frames to in headless mode")
+    parser.add_argument("--dump-every", type=int, default=0, help="save every Nth frame in headless mode")
+    parser.add_argument("--record", help="record the session to a replay file")
+    parser.add_argument("--replay", help="play a replay file back headlessly and report frame times")
+    parser.add_argument("--seed", type=int, help="seed for world generation, 0 when recording if not given")
+    parser.add_argument("--trace", action="store_true", help="record a trace of the last frames, saved with F3 and on exit")
+    parser.add_argument("--server", action="store_true", help="host the world for clients without a window or OpenGL context")
+    parser.add_argument("--port", type=int, help="port for the world server to listen on")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="play on a world server instead of a local world")
+
+    arguments = parser.parse_args()
+
+    if arguments.dump_every and not arguments.dump_dir:
+        parser.error("--dump-every requires --dump-dir")
+
+    return arguments
 
 
 if __name__ == "__main__":
-    minecraftEngine = Engine()
-    minecraftEngine.run()
\ No newline at end of file
+    arguments = parse_arguments()
+
+    serverAddress = None
+    if arguments.connect:
+        host, port = arguments.connect.rsplit(":", 1)
+        serverAddress = (host, int(port))
+
+    if arguments.server:
+        import asyncio
+        from Network.WorldServer import WorldServer
+        from settings import SERVER_HOST, SERVER_PORT
+
+        worldServer = WorldServer(SERVER_HOST, arguments.port or SERVER_PORT, arguments.seed or 0, startupProfiler)
+        asyncio.run(worldServer.serve())
+
+    elif arguments.replay:
+        from Replay.ReplayEngine import ReplayEngine
+
+        dumpInterval = arguments.dump_every or (1 if arguments.dump_dir else 0)
+
+        minecraftEngine = ReplayEngine(arguments.replay, startupProfiler, dumpDirectory=arguments.dump_dir, dumpInterval=dumpInterval)
+        minecraftEngine.tracer.enabled |= arguments.trace
+        minecraftEngine.run_replay()
+
+    elif arguments.headless:
+        from HeadlessEngine import HeadlessEngine
+        from CameraPath import CameraPath
+        from settings import HEADLESS_FRAMES
+
+        cameraPath = CameraPath.load(arguments.camera_path) if arguments.camera_path else None
+        dumpInterval = arguments.dump_every or (1 if arguments.dump_dir else 0)
+
+        minecraftEngine = HeadlessEngine(startupProfiler, cameraPath, arguments.seed or 0, arguments.dump_dir, dumpInterval, serverAddress)
+        minecraftEngine.tracer.enabled |= arguments.trace
+        minecraftEngine.run_frames(arguments.frames or HEADLESS_FRAMES)
+
+    else:
+        seed = 0 if arguments.record and arguments.seed is None else arguments.seed
+        minecraftEngine = Engine(startupProfiler, seed, serverAddress)
+        minecraftEngine.tracer.enabled |= arguments.trace
+
+        if arguments.record:
+            minecraftEngine.start_recording(arguments.record)
+
+        minecraftEngine.run()
\ No newline at end of file
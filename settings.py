@@ -1,7 +1,18 @@
-from numba import njit
+import numba
 import numpy as np
 import glm
 import math
+import hashlib
+import os
+
+
+def njit(*args, **kwargs):
+    "Numba's njit with the on-disk kernel cache turned on, so kernels are only compiled once rather than every run"
+
+    kwargs.setdefault('cache', True)
+
+    return numba.njit(*args, **kwargs)
+
 
 # Definition of window resolution
 WINDOW_RES = glm.vec2(1280, 720)
@@ -9,22 +20,137 @@ WINDOW_RES = glm.vec2(1280, 720)
 # Definition of OpenGL window depth
 WINDOW_DEPTH = 24
 
-# Chunk Settings
-CHUNK_SIZE = 32
+# Engine loop settings (times are in milliseconds, a MAX_FPS of 0 leaves the frame rate uncapped)
+SIMULATION_TICK_RATE = 60
+SIMULATION_TICK_TIME = 1000 / SIMULATION_TICK_RATE
+MAX_FRAME_TIME = 250
+MAX_FPS = 144
+VSYNC = True
+
+# Headless mode settings, frames are spaced a fixed time apart in milliseconds so runs are repeatable
+HEADLESS_FRAMES = 600
+HEADLESS_FRAME_TIME = 1000 / 60
+
+# Chunk Settings (the size can be set from the environment, which the benchmarks use to sweep chunk sizes)
+CHUNK_SIZE = int(os.environ.get("CHUNK_SIZE", 32))
 HALF_CHUNK_SIZE = CHUNK_SIZE // 2
 CHUNK_AREA = CHUNK_SIZE ** 2
 CHUNK_VOLUME = CHUNK_AREA * CHUNK_SIZE
 
-# World Settings
-WORLD_WIDTH, WORLD_HEIGHT = 4, 4
+# Meshing settings, the binary mesher builds the same meshes from bitmasks of whole rows of voxels and is used when
+# the chunk size allows it
+BINARY_MESHING = True
+
+# Background meshing settings, chunks changed by the simulations are rebuilt on a worker thread from snapshots of their
+# voxels and uploaded when they finish. It only helps with a spare core, so it is off by default
+BACKGROUND_MESHING = False
+
+# Vertex layout settings. Layout 1 packs everything but the light into the first 32 bit value of each vertex, with 6
+# bits per coordinate and 8 bit voxel IDs, so it fits chunks up to 63 voxels wide. Layout 2 moves the voxel ID into the
+# second value next to the light, giving 8 bits per coordinate and 16 bit voxel IDs
+VERTEX_LAYOUT = int(os.environ.get("VERTEX_LAYOUT", 1 if CHUNK_SIZE < 64 else 2))
+
+# World Settings (the size can be set from the environment, which the benchmarks use to try other world sizes)
+WORLD_WIDTH, WORLD_HEIGHT = int(os.environ.get("WORLD_WIDTH", 4)), int(os.environ.get("WORLD_HEIGHT", 4))
 WORLD_DEPTH = WORLD_WIDTH
 WORLD_AREA = WORLD_WIDTH * WORLD_DEPTH
 WORLD_VOLUME = WORLD_AREA * WORLD_HEIGHT
 
+# World loading settings, the initial radius is in chunk columns and the budget is in milliseconds per frame
+INITIAL_LOAD_RADIUS = 0
+WORLD_LOAD_BUDGET = 8
+
+# Adaptive quality settings, frame times are in milliseconds and render distance is in chunk columns. Once the last
+# FRAME_TIME_WINDOW frames average more than FRAME_TIME_HYSTERESIS (a fraction) away from TARGET_FRAME_TIME, the
+# render distance or the number of meshes uploaded per frame is moved one step within its range. Quality is only raised
+# QUALITY_RAISE_DELAY frames after it was last lowered, and every change is logged to ADAPTIVE_QUALITY_LOG_DIRECTORY
+ADAPTIVE_QUALITY = True
+TARGET_FRAME_TIME = 1000 / 60
+FRAME_TIME_WINDOW = 30
+FRAME_TIME_HYSTERESIS = 0.2
+QUALITY_RAISE_DELAY = 300
+RENDER_DISTANCE_RANGE = (2, max(WORLD_WIDTH, WORLD_DEPTH))
+MESH_UPLOAD_RANGE = (1, 16)
+ADAPTIVE_QUALITY_LOG_DIRECTORY = "Logs"
+
+# Terrain generation settings, the height is the base height plus the sum of each (frequency, amplitude) layer of
+# simplex noise. Heightmaps are computed once per chunk column and the most recently used HEIGHTMAP_CACHE_SIZE are kept
+TERRAIN_BASE_HEIGHT = 32
+TERRAIN_NOISE_LAYERS = ((0.01, 32),)
+HEIGHTMAP_CACHE_SIZE = 256
+
 # World Centre
 CENTRE_XZ = WORLD_WIDTH * HALF_CHUNK_SIZE
 CENTRE_Y = WORLD_HEIGHT * HALF_CHUNK_SIZE
 
+# World size in voxels
+WORLD_SIZE_X = WORLD_WIDTH * CHUNK_SIZE
+WORLD_SIZE_Y = WORLD_HEIGHT * CHUNK_SIZE
+WORLD_SIZE_Z = WORLD_DEPTH * CHUNK_SIZE
+
+# Voxel ID returned by batched voxel queries for positions outside of the world
+VOXEL_OUT_OF_WORLD = -1
+
+# Voxel ID that fills chunks that have not been generated yet, so they are solid and block light
+UNLOADED_VOXEL_ID = 254
+
+# Lighting settings
+MAX_LIGHT = 15
+LIGHT_VOXEL_ID = 255
+
+# Fluid settings, each fluid uses a run of voxel IDs starting with its source block followed by each flowing level
+WATER, LAVA = 1, 2
+WATER_VOXEL_ID = 240
+LAVA_VOXEL_ID = 248
+FLUID_BASE_IDS = np.array([0, WATER_VOXEL_ID, LAVA_VOXEL_ID])
+FLUID_MAX_LEVELS = np.array([0, 7, 3])
+FLUID_TICK_TIME = 200
+FLUID_MAX_UPDATES_PER_TICK = 65536
+
+# Fluid type and level of each voxel ID
+VOXEL_FLUID_TYPE = np.zeros(256, dtype='uint8')
+VOXEL_FLUID_TYPE[WATER_VOXEL_ID:WATER_VOXEL_ID + FLUID_MAX_LEVELS[WATER] + 1] = WATER
+VOXEL_FLUID_TYPE[LAVA_VOXEL_ID:LAVA_VOXEL_ID + FLUID_MAX_LEVELS[LAVA] + 1] = LAVA
+VOXEL_FLUID_LEVEL = ((np.arange(256) - FLUID_BASE_IDS[VOXEL_FLUID_TYPE]) * (VOXEL_FLUID_TYPE != 0)).astype('uint8')
+
+# Block light level emitted by each voxel ID
+VOXEL_EMISSION = np.zeros(256, dtype='uint8')
+VOXEL_EMISSION[LIGHT_VOXEL_ID] = MAX_LIGHT
+VOXEL_EMISSION[VOXEL_FLUID_TYPE == LAVA] = MAX_LIGHT
+
+# Whether each voxel ID blocks movement (fluids can be moved through)
+VOXEL_SOLID = (np.arange(256) != 0) & (VOXEL_FLUID_TYPE == 0)
+
+# Block update settings (times are in ticks unless stated)
+GAME_TICK_TIME = 50
+TICK_WHEEL_SIZE = 256
+RANDOM_TICKS_PER_CHUNK = 3
+FALL_DELAY = 2
+SAND_VOXEL_ID = 236
+CROP_VOXEL_ID = 232
+CROP_STAGES = 4
+
+# Whether each voxel ID falls when there is nothing below it
+VOXEL_FALLS = np.zeros(256, dtype='bool')
+VOXEL_FALLS[SAND_VOXEL_ID] = True
+
+# Whether each voxel ID reacts to random ticks (crops grow into the next voxel ID)
+VOXEL_RANDOM_TICKS = np.zeros(256, dtype='bool')
+VOXEL_RANDOM_TICKS[CROP_VOXEL_ID:CROP_VOXEL_ID + CROP_STAGES - 1] = True
+
+# Voxel IDs that can be selected with the number keys
+HOTBAR_VOXEL_IDS = (1, WATER_VOXEL_ID, LAVA_VOXEL_ID, LIGHT_VOXEL_ID, SAND_VOXEL_ID, CROP_VOXEL_ID)
+
+# Whether clients can ask the world server to set voxels to each voxel ID, which is the hotbar and 0 to remove voxels
+VOXEL_PLACEABLE = np.zeros(256, dtype='bool')
+VOXEL_PLACEABLE[[0, *HOTBAR_VOXEL_IDS]] = True
+
+# Block texture settings, each texture is a layer of the block texture array and VOXEL_TEXTURE_LAYER is the layer each
+# voxel ID is drawn with (each voxel ID is also tinted its own colour)
+BLOCK_TEXTURES = ("DirtTexture.png",)
+VOXEL_TEXTURE_LAYER = np.zeros(256, dtype='int32')
+BLOCK_TEXTURE_UNIT = 0
+
 # Camera settings
 ASPECT_RATIO = WINDOW_RES.x / WINDOW_RES.y
 FOV_DEGREES = 50
@@ -41,5 +167,78 @@ PLAYER_POS = glm.vec3(CENTRE_XZ, WORLD_HEIGHT * CHUNK_SIZE, CENTRE_XZ)
 MOUSE_SENITIVITY = 0.002
 MAX_PLAYER_REACH = 6
 
+# Physics settings (distances are in voxels and times are in milliseconds)
+PLAYER_COLLISION = True
+PLAYER_SIZE = glm.vec3(0.6, 1.8, 0.6)
+PLAYER_EYE_HEIGHT = 1.6
+PLAYER_JUMP_SPEED = 0.009
+GRAVITY = 0.000032
+MAX_FALL_SPEED = 0.078
+# Bodies walk up ledges as tall as STEP_HEIGHT without jumping, which has to cover a whole voxel to be of any use
+STEP_HEIGHT = 1.0
+MAX_PHYSICS_STEP = 50
+
 # Definition of colours
-BG_COLOUR = glm.vec3(0.1, 0.1, 0.3)
\ No newline at end of file
+BG_COLOUR = glm.vec3(0.1, 0.1, 0.3)
+
+# Performance overlay settings, shown with F1. Values are averaged over OVERLAY_AVERAGE_FRAMES frames and the text
+# is redrawn every OVERLAY_REFRESH_TIME milliseconds
+SHOW_OVERLAY = False
+OVERLAY_SIZE = (280, 196)
+OVERLAY_FONT_SIZE = 20
+OVERLAY_AVERAGE_FRAMES = 60
+OVERLAY_REFRESH_TIME = 250
+OVERLAY_TEXTURE_UNIT = 1
+OVERLAY_BACKGROUND = (0, 0, 0, 160)
+OVERLAY_TEXT_COLOUR = (255, 255, 255)
+
+# Memory accounting settings, the number of allocation and free events kept
+MEMORY_EVENT_LIMIT = 10000
+
+# Tracing settings, spans are kept for the last TRACE_FRAMES frames and saved to TRACE_DIRECTORY with F3 or on exit
+TRACING = False
+TRACE_FRAMES = 300
+TRACE_DIRECTORY = "Traces"
+
+# Startup settings, the warm-up compiles the kernels that are not compiled on import on a background thread, and
+# startup tasks that do not use OpenGL run on a pool of STARTUP_WORKERS threads
+WARM_UP_KERNELS = True
+STARTUP_WORKERS = 4
+
+# Network settings, the server ticks SERVER_TICK_RATE times a second and sends chunks compressed with CHUNK_COMPRESSION,
+# either "palette" or "zlib". Clients are sent the chunks and voxel edits within NETWORK_VIEW_DISTANCE chunk columns,
+# and the server disconnects clients that send a message larger than MAX_MESSAGE_SIZE bytes
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 25565
+SERVER_TICK_RATE = 20
+SERVER_TICK_TIME = 1000 / SERVER_TICK_RATE
+CHUNK_COMPRESSION = "zlib"
+CHUNK_ZLIB_LEVEL = 1
+NETWORK_VIEW_DISTANCE = max(WORLD_WIDTH, WORLD_DEPTH)
+MAX_MESSAGE_SIZE = 2 ** 20
+
+
+def get_settings_hash() -> str:
+    """
+    Hashes every setting, used to key the kernel cache because numba bakes global settings into compiled kernels
+    and only invalidates its cache when the kernel's own file changes
+
+    :returns: A short hex digest of the settings
+    """
+
+    settingsHash = hashlib.sha1()
+
+    for name, value in sorted(globals().items()):
+        if name.isupper():
+            settingsHash.update(name.encode())
+            settingsHash.update(value.tobytes() if isinstance(value, np.ndarray) else repr(value).encode())
+
+    return settingsHash.hexdigest()[:12]
+
+
+# Compiled kernels are cached per combination of settings
+KERNEL_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__', 'kernels', get_settings_hash())
+numba.config.CACHE_DIR = KERNEL_CACHE_DIR
+
+# Decoded textures are cached too, keyed by the contents of the texture files
+TEXTURE_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__', 'textures')
\ No newline at end of file